@@ -70,7 +70,13 @@ SESSION_SAVE_EVERY_REQUEST = True
 
 CELERY_TASK_QUEUES = (
     Queue("celery"),
+    Queue("analysis"),
+    Queue("analysis_light"),
+    Queue("analysis_heavy"),
     Queue("gitstats"),
+    Queue("gitstats_light"),
+    Queue("gitstats_heavy"),
+    Queue("email"),
 )
 
 CELERY_TASK_ROUTES = {
@@ -83,6 +89,75 @@ GITSTATS_SERVE_DIR = os.getenv(
     "GITSTATS_SERVE_DIR", str(BASE_DIR / "data" / "gitstats")
 )
 
+# Size-aware routing of analysis jobs (see api.utils.routing). Repositories at or
+# above ANALYSIS_HEAVY_REPO_BYTES go to the heavy queues, which run on their own
+# workers so small jobs never wait behind a monorepo.
+ANALYSIS_HEAVY_REPO_BYTES = int(
+    os.getenv("ANALYSIS_HEAVY_REPO_BYTES", 500 * 1024 * 1024)
+)
+ANALYSIS_UNKNOWN_SIZE_TIER = os.getenv("ANALYSIS_UNKNOWN_SIZE_TIER", "heavy")
+ANALYSIS_TIER_QUEUES = {
+    "light": {"analysis": "analysis_light", "gitstats": "gitstats_light"},
+    "heavy": {"analysis": "analysis_heavy", "gitstats": "gitstats_heavy"},
+}
+# soft_time_limit = base + per_gb * size, capped at max; unknown sizes get max
+ANALYSIS_TIME_LIMITS = {
+    "analysis": {"base": 60 * 10, "per_gb": 60 * 20, "max": 60 * 60 * 2},
+    "gitstats": {"base": 60 * 30, "per_gb": 60 * 60 * 3, "max": 60 * 60 * 8},
+}
+ANALYSIS_HARD_TIME_LIMIT_GRACE = 60 * 30
+# Cap on libraries of one domain being analysed at once when a whole domain is
+# queued; the rest are dispatched as running ones finish. 0 disables the cap.
+ANALYSIS_DOMAIN_MAX_IN_FLIGHT = (
+    int(os.getenv("ANALYSIS_DOMAIN_MAX_IN_FLIGHT", 0)) or None
+)
+# Lifetime of an in-flight reservation (api.utils.coalesce) when the task never
+# releases it, e.g. because its worker was killed
+ANALYSIS_COALESCE_TTL = int(os.getenv("ANALYSIS_COALESCE_TTL", 60 * 60 * 24))
+# How long a repository analysis is reused by other libraries of the same repo
+REPOSITORY_CACHE_TTL = int(os.getenv("REPOSITORY_CACHE_TTL", 60 * 60 * 24))
+# AnalysisRun records older than this are deleted by
+# api.tasks.purge_analysis_runs_task
+ANALYSIS_RUN_RETENTION_DAYS = int(os.getenv("ANALYSIS_RUN_RETENTION_DAYS", 90))
+# Upper bound on how long unused chart series stay cached; entries are keyed
+# by the domain data version, so edits never serve stale series
+DOMAIN_CHARTS_CACHE_TTL = int(os.getenv("DOMAIN_CHARTS_CACHE_TTL", 60 * 60 * 24))
+
+# Disk budgets enforced by api.tasks.enforce_gitstats_disk_budget_task
+GITSTATS_WORK_DIR_MAX_BYTES = int(
+    os.getenv("GITSTATS_WORK_DIR_MAX_BYTES", 50 * 1024**3)
+)
+GITSTATS_SERVE_DIR_MAX_BYTES = int(
+    os.getenv("GITSTATS_SERVE_DIR_MAX_BYTES", 20 * 1024**3)
+)
+# Must stay above the GitStats hard time limit so live clones are never swept
+GITSTATS_ORPHAN_MAX_AGE = int(os.getenv("GITSTATS_ORPHAN_MAX_AGE", 60 * 60 * 12))
+# Clones younger than this are kept even if their library is not marked
+# running yet (the task may have claimed the directory a moment ago)
+GITSTATS_ORPHAN_GRACE = int(os.getenv("GITSTATS_ORPHAN_GRACE", 60 * 15))
+
+# Server-Timing header and rolling per-endpoint latency histograms
+# (api.utils.server_timing); cheap enough to leave on in production
+SERVER_TIMING_ENABLED = env_bool("SERVER_TIMING_ENABLED", default=False)
+SERVER_TIMING_WINDOW = int(os.getenv("SERVER_TIMING_WINDOW", 60 * 10))
+
+# Prometheus metrics at /metrics (api.utils.prometheus). Multi-process
+# services also need PROMETHEUS_MULTIPROC_DIR; see docker-compose.yml
+PROMETHEUS_ENABLED = env_bool("PROMETHEUS_ENABLED", default=False)
+PROMETHEUS_METRICS_TOKEN = os.getenv("PROMETHEUS_METRICS_TOKEN", "")
+
+# Sampling profiler for slow requests and long Celery tasks
+# (api.utils.profiling). Profiles are folded stacks, newest
+# PROFILING_MAX_PROFILES kept in PROFILING_DIR
+PROFILING_ENABLED = env_bool("PROFILING_ENABLED", default=False)
+PROFILING_DIR = os.getenv("PROFILING_DIR", str(BASE_DIR / "tmp" / "profiles"))
+PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", 10))
+PROFILING_REQUEST_THRESHOLD_MS = float(
+    os.getenv("PROFILING_REQUEST_THRESHOLD_MS", 1000)
+)
+PROFILING_TASK_THRESHOLD_S = float(os.getenv("PROFILING_TASK_THRESHOLD_S", 60))
+PROFILING_MAX_PROFILES = int(os.getenv("PROFILING_MAX_PROFILES", 200))
+
 # Application definition
 pymysql.install_as_MySQLdb()
 INSTALLED_APPS = [
@@ -104,6 +179,8 @@ INSTALLED_APPS = [
     "django_extensions",
     "api.database.edit_history.apps.EditHistoryConfig",
     "api.database.backup_logs.apps.BackupLogsConfig",
+    "api.database.repository_cache.apps.RepositoryCacheConfig",
+    "api.database.analysis_runs.apps.AnalysisRunsConfig",
 ]
 AUTH_USER_MODEL = "users.CustomUser"
 REST_FRAMEWORK = {
@@ -111,6 +188,10 @@ REST_FRAMEWORK = {
         "users.auth.CookieJWTAuthentication",
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "api.utils.server_timing.TimedJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
 }
 
 AUTHENTICATION_BACKENDS = [
@@ -119,6 +200,9 @@ AUTHENTICATION_BACKENDS = [
 ]
 
 MIDDLEWARE = [
+    "api.utils.server_timing.ServerTimingMiddleware",
+    "api.utils.prometheus.PrometheusMiddleware",
+    "api.utils.profiling.ProfilingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -183,6 +267,29 @@ else:
         }
     }
 
+# Shared cache for cross-process locks and version counters (analysis
+# coalescing, the metric catalog, validators, chart data). Web and workers must
+# see the same keys, so it is required outside DEBUG; the local-memory
+# fallback only holds within a single process.
+DJANGO_CACHE_URL = os.getenv("DJANGO_CACHE_URL")
+if not DJANGO_CACHE_URL and not DEBUG:
+    raise RuntimeError(
+        "DJANGO_CACHE_URL is not set; point it at Redis or set DJANGO_DEBUG=true"
+    )
+if DJANGO_CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": DJANGO_CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL")
 if not CELERY_BROKER_URL:
     raise RuntimeError("CELERY_BROKER_URL is not set")
@@ -197,6 +304,29 @@ CELERY_TASK_TIME_LIMIT = 60 * 60 * 24
 CELERY_TASK_ACKS_LATE = True
 CELERY_WORKER_PREFETCH_MULTIPLIER = 1
 CELERY_BROKER_TRANSPORT_OPTIONS = {"visibility_timeout": 60 * 60 * 24}
+CELERY_BEAT_SCHEDULE = {
+    "enforce-gitstats-disk-budget": {
+        "task": "api.tasks.enforce_gitstats_disk_budget_task",
+        "schedule": timedelta(hours=1),
+    },
+    "purge-repository-cache": {
+        "task": "api.tasks.purge_repository_cache_task",
+        "schedule": timedelta(days=1),
+    },
+    "purge-analysis-runs": {
+        "task": "api.tasks.purge_analysis_runs_task",
+        "schedule": timedelta(days=1),
+    },
+    "dispatch-deferred-analysis": {
+        "task": "api.tasks.dispatch_deferred_analysis_task",
+        "schedule": timedelta(minutes=5),
+    },
+    # Cheap when rules.json is unchanged: one version comparison
+    "rescore-metric-values": {
+        "task": "api.tasks.rescore_metric_values_task",
+        "schedule": timedelta(minutes=5),
+    },
+}
 
 
 # Password validation
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api"
+
+    def ready(self):
+        from .utils import profiling, prometheus
+
+        prometheus.connect_celery_signals()
+        profiling.connect_celery_signals()
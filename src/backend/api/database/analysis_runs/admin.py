@@ -0,0 +1,27 @@
+from django.contrib import admin
+
+from .models import AnalysisRun, AnalysisRunStage
+
+
+class AnalysisRunStageInline(admin.TabularInline):
+    model = AnalysisRunStage
+    extra = 0
+    readonly_fields = ("name", "duration_ms", "count")
+    can_delete = False
+
+
+@admin.register(AnalysisRun)
+class AnalysisRunAdmin(admin.ModelAdmin):
+    list_display = (
+        "repo_slug",
+        "kind",
+        "outcome",
+        "duration_ms",
+        "api_calls",
+        "worker",
+        "started_at",
+    )
+    list_filter = ("kind", "outcome", "worker")
+    search_fields = ("repo_slug", "task_id")
+    ordering = ("-started_at",)
+    inlines = [AnalysisRunStageInline]
@@ -0,0 +1,6 @@
+from django.apps import AppConfig
+
+
+class AnalysisRunsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "api.database.analysis_runs"
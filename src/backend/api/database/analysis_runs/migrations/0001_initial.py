@@ -0,0 +1,122 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("libraries", "0009_library_repo_size_kb"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnalysisRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("analysis", "Analysis"), ("gitstats", "GitStats")],
+                        max_length=16,
+                    ),
+                ),
+                ("task_id", models.CharField(blank=True, max_length=255, null=True)),
+                ("repo_slug", models.CharField(blank=True, default="", max_length=255)),
+                ("worker", models.CharField(blank=True, default="", max_length=255)),
+                (
+                    "outcome",
+                    models.CharField(
+                        choices=[
+                            ("success", "Success"),
+                            ("cached", "Served from the repository cache"),
+                            ("skipped", "Skipped, report already present"),
+                            ("failed", "Failed"),
+                            ("timeout", "Timed out"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                ("error", models.TextField(blank=True, null=True)),
+                ("started_at", models.DateTimeField()),
+                ("duration_ms", models.PositiveBigIntegerField()),
+                ("api_calls", models.PositiveIntegerField(default=0)),
+                ("rate_limit_remaining", models.IntegerField(blank=True, null=True)),
+                ("bytes_cloned", models.BigIntegerField(blank=True, null=True)),
+                (
+                    "library",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="analysis_runs",
+                        to="libraries.library",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "analysis_run",
+            },
+        ),
+        migrations.CreateModel(
+            name="AnalysisRunStage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=64)),
+                ("duration_ms", models.FloatField()),
+                ("count", models.PositiveIntegerField(default=1)),
+                (
+                    "run",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stages",
+                        to="analysis_runs.analysisrun",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "analysis_run_stage",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="analysisrun",
+            index=models.Index(
+                fields=["kind", "started_at"], name="analysis_run_kind_started"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="analysisrun",
+            index=models.Index(
+                fields=["repo_slug", "started_at"], name="analysis_run_repo_started"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="analysisrunstage",
+            index=models.Index(fields=["name"], name="analysis_run_stage_name"),
+        ),
+        migrations.AddConstraint(
+            model_name="analysisrunstage",
+            constraint=models.UniqueConstraint(
+                fields=("run", "name"), name="unique_analysis_run_stage"
+            ),
+        ),
+    ]
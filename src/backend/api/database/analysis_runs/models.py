@@ -0,0 +1,88 @@
+from django.db import models
+
+from ..libraries.models import Library
+
+
+class AnalysisRun(models.Model):
+    """
+    One execution of an analysis or GitStats task: its outcome, where it
+    ran, and the GitHub API and clone figures behind its duration. Stage
+    timings are stored as AnalysisRunStage rows so they can be aggregated
+    in the database.
+    """
+
+    KIND_ANALYSIS = "analysis"
+    KIND_GITSTATS = "gitstats"
+    KIND_CHOICES = [(KIND_ANALYSIS, "Analysis"), (KIND_GITSTATS, "GitStats")]
+
+    OUTCOME_SUCCESS = "success"
+    OUTCOME_CACHED = "cached"
+    OUTCOME_SKIPPED = "skipped"
+    OUTCOME_FAILED = "failed"
+    OUTCOME_TIMEOUT = "timeout"
+    OUTCOME_CHOICES = [
+        (OUTCOME_SUCCESS, "Success"),
+        (OUTCOME_CACHED, "Served from the repository cache"),
+        (OUTCOME_SKIPPED, "Skipped, report already present"),
+        (OUTCOME_FAILED, "Failed"),
+        (OUTCOME_TIMEOUT, "Timed out"),
+    ]
+
+    library = models.ForeignKey(
+        Library,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="analysis_runs",
+    )
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    task_id = models.CharField(max_length=255, null=True, blank=True)
+    repo_slug = models.CharField(max_length=255, blank=True, default="")
+    worker = models.CharField(max_length=255, blank=True, default="")
+    outcome = models.CharField(max_length=16, choices=OUTCOME_CHOICES)
+    error = models.TextField(null=True, blank=True)
+    started_at = models.DateTimeField()
+    duration_ms = models.PositiveBigIntegerField()
+    api_calls = models.PositiveIntegerField(default=0)
+    rate_limit_remaining = models.IntegerField(null=True, blank=True)
+    bytes_cloned = models.BigIntegerField(null=True, blank=True)
+
+    class Meta:
+        db_table = "analysis_run"
+        indexes = [
+            models.Index(
+                fields=["kind", "started_at"], name="analysis_run_kind_started"
+            ),
+            models.Index(
+                fields=["repo_slug", "started_at"], name="analysis_run_repo_started"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.repo_slug} {self.outcome} ({self.duration_ms} ms)"
+
+
+class AnalysisRunStage(models.Model):
+    """
+    Wall time of one stage of a run (an API endpoint, clone, scc, gitstats,
+    copy, database write), summed over ``count`` occurrences.
+    """
+
+    run = models.ForeignKey(
+        AnalysisRun, on_delete=models.CASCADE, related_name="stages"
+    )
+    name = models.CharField(max_length=64)
+    duration_ms = models.FloatField()
+    count = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        db_table = "analysis_run_stage"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["run", "name"], name="unique_analysis_run_stage"
+            )
+        ]
+        indexes = [models.Index(fields=["name"], name="analysis_run_stage_name")]
+
+    def __str__(self):
+        return f"{self.name}: {self.duration_ms:.0f} ms"
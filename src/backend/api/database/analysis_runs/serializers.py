@@ -0,0 +1,32 @@
+from rest_framework import serializers
+
+from .models import AnalysisRun, AnalysisRunStage
+
+
+class AnalysisRunStageSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AnalysisRunStage
+        fields = ["name", "duration_ms", "count"]
+
+
+class AnalysisRunSerializer(serializers.ModelSerializer):
+    stages = AnalysisRunStageSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = AnalysisRun
+        fields = [
+            "id",
+            "library",
+            "kind",
+            "task_id",
+            "repo_slug",
+            "worker",
+            "outcome",
+            "error",
+            "started_at",
+            "duration_ms",
+            "api_calls",
+            "rate_limit_remaining",
+            "bytes_cloned",
+            "stages",
+        ]
@@ -0,0 +1,158 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Avg, Count, Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from api.utils.repos import repo_slug
+
+from ..libraries.models import Library
+from .models import AnalysisRun, AnalysisRunStage
+
+logger = logging.getLogger("api.database.analysis_runs")
+
+FAILED_OUTCOMES = [AnalysisRun.OUTCOME_FAILED, AnalysisRun.OUTCOME_TIMEOUT]
+SORT_FIELDS = {"total": "-total_ms", "mean": "-mean_ms", "max": "-max_ms"}
+
+
+def record_run(
+    kind: str,
+    library_id,
+    repo_url: str,
+    recorder,
+    *,
+    task_id=None,
+    worker="",
+    outcome: str,
+    error=None,
+    started_at,
+    duration_ms: int,
+) -> AnalysisRun | None:
+    """
+    Persist one task execution and the stages its StageRecorder timed.
+    Never raises: losing a run record must not fail the task it describes.
+    """
+    try:
+        # The library may have been deleted while the task ran
+        if not Library.objects.filter(pk=library_id).exists():
+            library_id = None
+        run = AnalysisRun.objects.create(
+            library_id=library_id,
+            kind=kind,
+            task_id=task_id,
+            repo_slug=repo_slug(repo_url),
+            worker=worker or "",
+            outcome=outcome,
+            error=error,
+            started_at=started_at,
+            duration_ms=duration_ms,
+            api_calls=recorder.api_calls,
+            rate_limit_remaining=recorder.rate_limit_remaining,
+            bytes_cloned=recorder.bytes_cloned,
+        )
+        AnalysisRunStage.objects.bulk_create(
+            AnalysisRunStage(
+                run=run, name=name, duration_ms=entry["ms"], count=entry["count"]
+            )
+            for name, entry in recorder.stages.items()
+        )
+        return run
+    except Exception:
+        logger.error(
+            "Recording the analysis run failed",
+            exc_info=True,
+            extra={"library_id": library_id, "task_id": task_id, "kind": kind},
+        )
+        return None
+
+
+def purge_old_runs() -> int:
+    """
+    Delete runs (and their stages) older than ANALYSIS_RUN_RETENTION_DAYS.
+    Returns the number of runs deleted.
+    """
+    cutoff = timezone.now() - timedelta(days=settings.ANALYSIS_RUN_RETENTION_DAYS)
+    # Listing the kinds lets the (kind, started_at) index serve the range
+    kinds = [kind for kind, _ in AnalysisRun.KIND_CHOICES]
+    _, deleted = AnalysisRun.objects.filter(
+        kind__in=kinds, started_at__lt=cutoff
+    ).delete()
+    return deleted.get(AnalysisRun._meta.label, 0)
+
+
+def _window(days: int, kind: str | None):
+    runs = AnalysisRun.objects.filter(
+        started_at__gte=timezone.now() - timedelta(days=days)
+    )
+    return runs.filter(kind=kind) if kind else runs
+
+
+def run_stats(days: int = 30, kind: str | None = None, limit: int = 10, sort="total"):
+    """
+    Where the analysis hours went over the last ``days`` days: overall
+    totals, the repositories with the most (or slowest) run time, time per
+    stage across all runs, and a per-day trend. Aggregated in the database.
+    """
+    runs = _window(days, kind)
+    failed = Count("id", filter=Q(outcome__in=FAILED_OUTCOMES))
+
+    totals = runs.aggregate(
+        runs=Count("id"),
+        failures=failed,
+        total_ms=Sum("duration_ms"),
+        mean_ms=Avg("duration_ms"),
+        api_calls=Sum("api_calls"),
+    )
+
+    slowest = list(
+        runs.values("repo_slug")
+        .annotate(
+            runs=Count("id"),
+            failures=failed,
+            total_ms=Sum("duration_ms"),
+            mean_ms=Avg("duration_ms"),
+            max_ms=Max("duration_ms"),
+            bytes_cloned=Max("bytes_cloned"),
+        )
+        .order_by(SORT_FIELDS[sort], "repo_slug")[:limit]
+    )
+
+    stages = list(
+        AnalysisRunStage.objects.filter(run__in=runs)
+        .values("name")
+        .annotate(
+            runs=Count("id"),
+            calls=Sum("count"),
+            total_ms=Sum("duration_ms"),
+            mean_ms=Avg("duration_ms"),
+            max_ms=Max("duration_ms"),
+        )
+        .order_by("-total_ms", "name")
+    )
+    stage_total = sum(s["total_ms"] for s in stages) or 1
+    for s in stages:
+        s["share"] = round(s["total_ms"] / stage_total, 4)
+
+    trend = list(
+        runs.annotate(day=TruncDate("started_at"))
+        .values("day")
+        .annotate(
+            runs=Count("id"),
+            failures=failed,
+            total_ms=Sum("duration_ms"),
+            mean_ms=Avg("duration_ms"),
+            api_calls=Sum("api_calls"),
+        )
+        .order_by("day")
+    )
+
+    return {
+        "days": days,
+        "kind": kind,
+        "totals": totals,
+        "slowest": slowest,
+        "stages": stages,
+        "trend": trend,
+    }
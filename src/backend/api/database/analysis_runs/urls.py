@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .views import AnalysisRunListView, analysis_run_stats
+
+urlpatterns = [
+    path("", AnalysisRunListView.as_view(), name="analysis-run-list"),
+    path("stats/", analysis_run_stats, name="analysis-run-stats"),
+]
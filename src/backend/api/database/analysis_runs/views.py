@@ -0,0 +1,75 @@
+import uuid
+
+from rest_framework import generics, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from users.permissions import IsAdmin
+
+from .models import AnalysisRun
+from .serializers import AnalysisRunSerializer
+from .services import SORT_FIELDS, run_stats
+
+KINDS = {choice for choice, _ in AnalysisRun.KIND_CHOICES}
+MAX_RUNS = 200
+
+
+def _int_param(request, name, default, low, high):
+    raw = request.query_params.get(name)
+    if raw in (None, ""):
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer.")
+    if not low <= value <= high:
+        raise ValueError(f"'{name}' must be between {low} and {high}.")
+    return value
+
+
+@api_view(["GET"])
+@permission_classes([IsAdmin])
+def analysis_run_stats(request):
+    """
+    Slowest repositories, time per stage and a daily trend of analysis runs,
+    e.g. ``?kind=gitstats&days=7&limit=20&sort=max``.
+    """
+    kind = request.query_params.get("kind") or None
+    sort = request.query_params.get("sort") or "total"
+    try:
+        days = _int_param(request, "days", 30, 1, 366)
+        limit = _int_param(request, "limit", 10, 1, 100)
+        if kind is not None and kind not in KINDS:
+            raise ValueError(f"'kind' must be one of {', '.join(sorted(KINDS))}.")
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"'sort' must be one of {', '.join(SORT_FIELDS)}.")
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(
+        run_stats(days=days, kind=kind, limit=limit, sort=sort),
+        status=status.HTTP_200_OK,
+    )
+
+
+class AnalysisRunListView(generics.ListAPIView):
+    """Recent runs with their stages, filtered by library, repo, kind or outcome."""
+
+    serializer_class = AnalysisRunSerializer
+    permission_classes = [IsAdmin]
+
+    def get_queryset(self):
+        params = self.request.query_params
+        runs = AnalysisRun.objects.prefetch_related("stages").order_by("-started_at")
+        if params.get("library"):
+            try:
+                runs = runs.filter(library_id=uuid.UUID(params["library"]))
+            except ValueError:
+                return AnalysisRun.objects.none()
+        if params.get("repo"):
+            runs = runs.filter(repo_slug=params["repo"].lower())
+        if params.get("kind"):
+            runs = runs.filter(kind=params["kind"])
+        if params.get("outcome"):
+            runs = runs.filter(outcome=params["outcome"])
+        return runs[:MAX_RUNS]
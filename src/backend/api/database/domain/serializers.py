@@ -13,3 +13,13 @@ class DomainSerializer(serializers.ModelSerializer):
     class Meta:
         model = Domain
         fields = "__all__"
+
+
+class DomainSummarySerializer(serializers.ModelSerializer):
+    """Domain fields without the nested library list."""
+
+    creators = UserProfileSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Domain
+        fields = "__all__"
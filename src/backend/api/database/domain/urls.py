@@ -4,6 +4,7 @@ from .views import (
     DomainListCreateView,
     DomainRetrieveUpdateDestroyView,
     category_weights,
+    domain_dashboard,
 )
 
 urlpatterns = [
@@ -16,4 +17,5 @@ urlpatterns = [
     path(
         "<uuid:domain_id>/category-weights/", category_weights, name="category-weights"
     ),
+    path("<uuid:domain_id>/dashboard/", domain_dashboard, name="domain-dashboard"),
 ]
@@ -1,28 +1,23 @@
-import json
-import os
-
-from django.conf import settings
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 
+from ...utils.config import load_categories, load_config
+from ..libraries.models import Library
+from ..library_metric_values.comparison import ahp_summary, build_comparison
 from .models import Domain
-from .serializers import DomainSerializer
+from .serializers import DomainSerializer, DomainSummarySerializer
 
 
 class DomainListCreateView(generics.ListCreateAPIView):
-    queryset = Domain.objects.all()
+    queryset = Domain.objects.prefetch_related("libraries", "creators")
     serializer_class = DomainSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
     def perform_create(self, serializer):
-        path = os.path.join(settings.BASE_DIR, "api", "database", "categories.json")
-
-        categories = []
         try:
-            with open(path, "r") as f:
-                categories = json.load(f).get("Categories", [])
+            categories = load_categories()
         except Exception:
             categories = []
 
@@ -39,7 +34,7 @@ class DomainListCreateView(generics.ListCreateAPIView):
 
 
 class DomainRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Domain.objects.all()
+    queryset = Domain.objects.prefetch_related("libraries", "creators")
     serializer_class = DomainSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
@@ -87,3 +82,40 @@ def category_weights(request, domain_id):
         domain.save()
 
         return Response({"success": True}, status=status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+def domain_dashboard(request, domain_id):
+    """
+    Everything the Visualize, Comparison and Edit pages load for a domain in
+    one response: the domain, metrics in display order, categories, rules,
+    comparison rows and the last saved AHP results.
+    """
+    try:
+        domain = Domain.objects.prefetch_related("creators").get(pk=domain_id)
+    except Domain.DoesNotExist:
+        return Response({"error": "Domain not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        categories = load_categories()
+    except Exception:
+        categories = []
+    try:
+        rules = load_config("rules")
+    except Exception:
+        rules = {}
+
+    libraries = list(Library.objects.filter(domain=domain))
+    comparison = build_comparison(domain, libraries)
+
+    return Response(
+        {
+            "domain": DomainSummarySerializer(domain).data,
+            "metrics": comparison["metrics"],
+            "categories": categories,
+            "rules": rules,
+            "libraries": comparison["libraries"],
+            "ahp": ahp_summary(libraries),
+        },
+        status=status.HTTP_200_OK,
+    )
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("libraries", "0007_library_description"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="library",
+            name="disk_usage_measured_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="library",
+            name="gitstats_report_bytes",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="library",
+            name="repo_clone_bytes",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
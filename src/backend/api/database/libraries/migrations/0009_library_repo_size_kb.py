@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("libraries", "0008_library_disk_footprint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="library",
+            name="repo_size_kb",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
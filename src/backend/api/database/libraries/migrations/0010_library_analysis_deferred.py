@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("libraries", "0009_library_repo_size_kb"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="library",
+            name="analysis_deferred",
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+    ]
@@ -24,6 +24,14 @@ class Library(models.Model):
     url = models.URLField(max_length=500, blank=True, null=True)
     gitstats_report_path = models.CharField(max_length=1000, blank=True, null=True)
 
+    # Repository size as reported by the GitHub API ("size" is in KB)
+    repo_size_kb = models.BigIntegerField(blank=True, null=True)
+
+    # Disk footprint, refreshed by the GitStats task and the disk budget sweep
+    repo_clone_bytes = models.BigIntegerField(blank=True, null=True)
+    gitstats_report_bytes = models.BigIntegerField(blank=True, null=True)
+    disk_usage_measured_at = models.DateTimeField(blank=True, null=True)
+
     GITSTATS_PENDING = "pending"
     GITSTATS_RUNNING = "running"
     GITSTATS_SUCCESS = "success"
@@ -67,6 +75,8 @@ class Library(models.Model):
     analysis_error = models.TextField(blank=True, null=True)
     analysis_started_at = models.DateTimeField(blank=True, null=True)
     analysis_finished_at = models.DateTimeField(blank=True, null=True)
+    # Held back by ANALYSIS_DOMAIN_MAX_IN_FLIGHT until a slot frees up
+    analysis_deferred = models.BooleanField(default=False, db_index=True)
 
     class Meta:
         constraints = [
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class LibraryMetricValuesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api.database.library_metric_values"
+
+    def ready(self):
+        from . import signals  # noqa: F401
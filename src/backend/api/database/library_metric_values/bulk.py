@@ -0,0 +1,48 @@
+from django.db import connection
+
+from .models import LibraryMetricValue
+from .scores import load_rules
+from .signals import bump_domain_data, domain_ids_of
+
+
+def upsert_metric_values(
+    values: list[LibraryMetricValue], update_fields: list[str], batch_size: int = 500
+) -> int:
+    """
+    Insert or update ``values`` in one statement per batch, relying on the
+    (library, metric) unique constraint. Only ``update_fields`` (plus
+    ``last_modified`` and, with ``value``, its typed and score columns) are overwritten
+    on existing rows; new rows take every field from the instance. If a pair
+    appears more than once the last one wins.
+
+    bulk_create sends no signals, so the domain data version of every
+    affected domain is bumped here.
+    """
+    rules = load_rules()
+    unique = {}
+    for value in values:
+        value.sync_typed_values()
+        value.sync_score(*rules)
+        unique[(value.library_id, value.metric_id)] = value
+    if not unique:
+        return 0
+
+    if "value" in update_fields:
+        update_fields = [*update_fields, *LibraryMetricValue.DERIVED_FIELDS]
+    fields = list(dict.fromkeys([*update_fields, "last_modified"]))
+    # MySQL's ON DUPLICATE KEY UPDATE cannot name a conflict target
+    unique_fields = (
+        ["library", "metric"]
+        if connection.features.supports_update_conflicts_with_target
+        else None
+    )
+
+    LibraryMetricValue.objects.bulk_create(
+        list(unique.values()),
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=fields,
+    )
+    bump_domain_data(domain_ids_of(unique.values()))
+    return len(unique)
@@ -0,0 +1,203 @@
+import math
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from api.utils.prometheus import cache_lookup
+from api.utils.versions import get_version
+
+from ..libraries.models import Library
+from ..metrics.catalog import get_catalog
+from ..metrics.signals import METRIC_DEFINITIONS
+from .models import LibraryMetricValue
+from .signals import domain_data_version
+
+# Same exclusions as the Visualize page
+NON_CHART_VALUE_TYPES = {"bool", "text"}
+HISTOGRAM_BINS = 10
+UNCATEGORIZED = "Uncategorized"
+
+
+def chart_metrics(catalog) -> list:
+    return [
+        m
+        for m in catalog.metrics
+        if m.value_type not in NON_CHART_VALUE_TYPES
+        and m.metric_key != "gitstats_report"
+    ]
+
+
+def _number(value):
+    """Cell value as a float, None when blank, or NaN when not numeric."""
+    if value is None or value == "":
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return math.nan
+    return number if math.isfinite(number) else math.nan
+
+
+def _float(value):
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+def value_matrix(domain, metrics):
+    """
+    The domain's values as a ``libraries x metrics`` float matrix (NaN where
+    a library has no numeric value) plus the per-metric count of values that
+    could not be read as numbers.
+    """
+    libraries = list(
+        Library.objects.filter(domain=domain)
+        .order_by("library_name")
+        .values_list("library_ID", "library_name")
+    )
+    row_of = {library_id: i for i, (library_id, _) in enumerate(libraries)}
+    col_of = {m.metric_ID: j for j, m in enumerate(metrics)}
+
+    matrix = np.full((len(libraries), len(metrics)), np.nan)
+    invalid = np.zeros(len(metrics), dtype=int)
+
+    values = LibraryMetricValue.objects.filter(
+        library__domain=domain, metric_id__in=list(col_of)
+    ).values_list("library_id", "metric_id", "value")
+    for library_id, metric_id, value in values:
+        number = _number(value)
+        if number is None:
+            continue
+        j = col_of[metric_id]
+        if math.isnan(number):
+            invalid[j] += 1
+        else:
+            matrix[row_of[library_id], j] = number
+
+    return libraries, matrix, invalid
+
+
+def metric_series(metric, libraries, column, invalid: int) -> dict:
+    present = ~np.isnan(column)
+    values = column[present]
+    series = {
+        "metric_ID": str(metric.metric_ID),
+        "metric_name": metric.metric_name,
+        "category": metric.category,
+        "count": int(values.size),
+        "missing": int(column.size - values.size),
+        "invalid": int(invalid),
+        "bars": [],
+        "histogram": {"edges": [], "counts": []},
+        "stats": None,
+    }
+    if not values.size:
+        return series
+
+    rows = np.flatnonzero(present)
+    # Highest first; ties keep library name order
+    order = np.argsort(-values, kind="stable")
+    series["bars"] = [
+        {
+            "library_ID": str(libraries[rows[i]][0]),
+            "label": libraries[rows[i]][1],
+            "value": float(values[i]),
+        }
+        for i in order
+    ]
+
+    bins = min(HISTOGRAM_BINS, int(np.unique(values).size))
+    counts, edges = np.histogram(values, bins=bins)
+    series["histogram"] = {
+        "edges": [float(e) for e in edges],
+        "counts": [int(c) for c in counts],
+    }
+    series["stats"] = {
+        "min": float(values.min()),
+        "median": float(np.median(values)),
+        "max": float(values.max()),
+        "mean": float(values.mean()),
+    }
+    return series
+
+
+def category_series(metrics, libraries, matrix) -> list:
+    """
+    Per category, each library's mean over the category's metrics after
+    scaling every metric to 0..1 across libraries, so metrics with large
+    ranges do not dominate. Metrics where all libraries tie count as 1.
+    """
+    # fmin/fmax skip NaN; columns without values end up with spans <= 0
+    lows = np.fmin.reduce(matrix, axis=0, initial=np.inf)
+    highs = np.fmax.reduce(matrix, axis=0, initial=-np.inf)
+    spans = highs - lows
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scaled = np.where(spans > 0, (matrix - lows) / spans, 1.0)
+    scaled[np.isnan(matrix)] = np.nan
+
+    columns = {}
+    for j, metric in enumerate(metrics):
+        columns.setdefault(metric.category or UNCATEGORIZED, []).append(j)
+
+    categories = []
+    for category, cols in columns.items():
+        block = scaled[:, cols]
+        present = ~np.isnan(block)
+        counts = present.sum(axis=1)
+        sums = np.where(present, block, 0.0).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            averages = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+        rated = ~np.isnan(averages)
+        categories.append(
+            {
+                "category": category,
+                "metrics": [metrics[j].metric_name for j in cols],
+                "libraries": [
+                    {
+                        "library_ID": str(libraries[i][0]),
+                        "label": libraries[i][1],
+                        "value": _float(averages[i]),
+                    }
+                    for i in range(len(libraries))
+                ],
+                "average": float(averages[rated].mean()) if rated.any() else None,
+            }
+        )
+    return categories
+
+
+def build_charts(domain) -> dict:
+    catalog = get_catalog()
+    metrics = chart_metrics(catalog)
+    libraries, matrix, invalid = value_matrix(domain, metrics)
+
+    return {
+        "libraries": [
+            {"library_ID": str(library_id), "library_name": name}
+            for library_id, name in libraries
+        ],
+        "metrics": [
+            metric_series(metric, libraries, matrix[:, j], invalid[j])
+            for j, metric in enumerate(metrics)
+        ],
+        "categories": category_series(metrics, libraries, matrix),
+    }
+
+
+def get_charts(domain) -> dict:
+    """
+    Chart series for ``domain``, cached until its libraries, values or the
+    metric definitions change.
+    """
+    key = "charts:{}:{}:{}".format(
+        domain.pk,
+        domain_data_version(domain.pk),
+        get_version(METRIC_DEFINITIONS),
+    )
+    charts = cache.get(key)
+    cache_lookup("domain_charts", charts is not None)
+    if charts is None:
+        charts = build_charts(domain)
+        cache.set(key, charts, settings.DOMAIN_CHARTS_CACHE_TTL)
+    return charts
@@ -0,0 +1,301 @@
+from django.db.models import Case, F, IntegerField, OuterRef, Q, Subquery, Value, When
+
+from ..libraries.models import Library
+from ..metrics.catalog import get_catalog
+from .models import LibraryMetricValue
+from .scores import load_rules
+from .typed import (
+    DATE_TYPES,
+    NUMERIC_TYPES,
+    RANGE_TYPES,
+    date_value,
+    numeric_value,
+    option_key,
+)
+
+MAX_PAGE_SIZE = 500
+
+
+class ComparisonQueryError(ValueError):
+    """Invalid sort, filter or pagination parameters."""
+
+
+def metric_summary(metric) -> dict:
+    return {
+        "metric_ID": str(metric.metric_ID),
+        "metric_name": metric.metric_name,
+        "description": metric.description,
+        "metric_key": metric.metric_key,
+        "value_type": metric.value_type,
+        "source_type": metric.source_type,
+        "scoring_dict": metric.scoring_dict,
+        "category": metric.category,
+        "option_category": metric.option_category,
+        "rule": metric.rule,
+    }
+
+
+def library_row(lib: Library, metrics) -> dict:
+    return {
+        "library_ID": str(lib.library_ID),
+        "library_name": lib.library_name,
+        "github_url": lib.github_url,
+        "url": lib.url,
+        "programming_language": lib.programming_language,
+        "analysis_status": lib.analysis_status,
+        "analysis_task_id": lib.analysis_task_id,
+        "analysis_error": lib.analysis_error,
+        "analysis_finished_at": lib.analysis_finished_at,
+        "gitstats_status": getattr(lib, "gitstats_status", None),
+        "gitstats_task_id": getattr(lib, "gitstats_task_id", None),
+        "gitstats_error": getattr(lib, "gitstats_error", None),
+        "gitstats_finished_at": getattr(lib, "gitstats_finished_at", None),
+        "gitstats_report_url": (
+            f"/gitstats/{lib.library_ID}/git_stats/index.html"
+            if getattr(lib, "gitstats_status", None) == Library.GITSTATS_SUCCESS
+            else None
+        ),
+        "metrics": {m.metric_name: None for m in metrics},
+    }
+
+
+def _metric(catalog, ref: str):
+    metric = catalog.by_name.get(ref) or catalog.get(ref)
+    if metric is None:
+        raise ComparisonQueryError(f"Unknown metric: {ref}")
+    return metric
+
+
+def value_column(metric) -> str:
+    """The typed LibraryMetricValue column that orders values of ``metric``."""
+    if metric.value_type in NUMERIC_TYPES:
+        return "value_number"
+    if metric.value_type in DATE_TYPES:
+        return "value_date"
+    if metric.value_type in RANGE_TYPES:
+        return "value_option"
+    return "value_text"
+
+
+def range_options(metric) -> list:
+    """The option keys of a range metric, lowest band first, from rules.json."""
+    _, rules_data = load_rules()
+    rules = rules_data.get(metric.value_type, {}).get(metric.option_category or "")
+    options = rules.get("options") if isinstance(rules, dict) else None
+    return [option_key(option) for option in options or []]
+
+
+def _sort_expression(metric):
+    column = value_column(metric)
+    options = range_options(metric) if column == "value_option" else []
+    if not options:
+        return F(column)
+    # Bands compare by their position, not as text ("1000+" < "50-99")
+    return Case(
+        *[When(value_option=option, then=Value(i)) for i, option in enumerate(options)],
+        output_field=IntegerField(),
+    )
+
+
+def _bound(raw: str, metric, name: str):
+    if raw in ("", None):
+        return None
+    column = value_column(metric)
+    if column == "value_number":
+        try:
+            return float(raw)
+        except ValueError:
+            raise ComparisonQueryError(f"{name} must be a number.")
+    if column == "value_date":
+        bound = date_value(raw, metric.value_type)
+        if bound is None:
+            raise ComparisonQueryError(f"{name} must be an ISO date.")
+        return bound
+    if column == "value_option":
+        options = range_options(metric)
+        if option_key(raw) not in options:
+            raise ComparisonQueryError(
+                f"{name} must be one of the options of {metric.metric_name}: "
+                f"{', '.join(options) or 'none'}."
+            )
+        return options.index(option_key(raw))
+    if numeric_value(raw) is not None:
+        # Text compares character by character, so "9" > "10"
+        raise ComparisonQueryError(
+            f"{metric.metric_name} is not numeric; {name} cannot be a number."
+        )
+    return raw
+
+
+def _non_negative_int(raw, name: str):
+    if raw in ("", None):
+        return None
+    try:
+        number = int(raw)
+    except ValueError:
+        number = -1
+    if number < 0:
+        raise ComparisonQueryError(f"{name} must be a non-negative integer.")
+    return number
+
+
+def query_libraries(domain, params, catalog=None):
+    """
+    Libraries of ``domain`` filtered and ordered by the comparison query
+    parameters, all applied in the database:
+
+    - ``search``: text in the library name or description
+    - ``range=<metric>:<min>:<max>``: value bounds, either may be blank;
+      numbers, ISO dates, options of range metrics (compared by their
+      rules.json position) or text depending on the metric's value type;
+      repeat for several metrics
+    - ``sort=<metric>|library_name`` and ``order=asc|desc``; libraries
+      without a value for the metric sort last
+
+    ``<metric>`` is a metric name or ID.
+    """
+    catalog = catalog or get_catalog()
+    libraries = Library.objects.filter(domain=domain)
+
+    search = (params.get("search") or "").strip()
+    if search:
+        libraries = libraries.filter(
+            Q(library_name__icontains=search) | Q(description__icontains=search)
+        )
+
+    for spec in params.getlist("range"):
+        ref, sep, bounds = spec.partition(":")
+        low, _, high = bounds.partition(":")
+        if not sep:
+            raise ComparisonQueryError("range must be <metric>:<min>:<max>.")
+        metric = _metric(catalog, ref)
+        column = value_column(metric)
+        condition = {"metric": metric}
+        low = _bound(low, metric, "range minimum")
+        high = _bound(high, metric, "range maximum")
+        if column == "value_option":
+            # Bounds are positions in the metric's options
+            if low is not None or high is not None:
+                stop = None if high is None else high + 1
+                condition["value_option__in"] = range_options(metric)[low:stop]
+        else:
+            if low is not None:
+                condition[f"{column}__gte"] = low
+            if high is not None:
+                condition[f"{column}__lte"] = high
+        if len(condition) > 1:
+            libraries = libraries.filter(
+                pk__in=LibraryMetricValue.objects.filter(**condition).values(
+                    "library_id"
+                )
+            )
+
+    order = params.get("order") or "asc"
+    if order not in ("asc", "desc"):
+        raise ComparisonQueryError("order must be asc or desc.")
+    descending = order == "desc"
+
+    sort = params.get("sort") or "library_name"
+    if sort == "library_name":
+        sort_key = F("library_name")
+    else:
+        metric = _metric(catalog, sort)
+        libraries = libraries.annotate(
+            sort_value=Subquery(
+                LibraryMetricValue.objects.filter(library=OuterRef("pk"), metric=metric)
+                .annotate(sort_value=_sort_expression(metric))
+                .values("sort_value")[:1]
+            )
+        )
+        sort_key = F("sort_value")
+
+    if descending:
+        sort_key = sort_key.desc(nulls_last=True)
+    else:
+        sort_key = sort_key.asc(nulls_last=True)
+    return libraries.order_by(sort_key, "library_name")
+
+
+def comparison_page(domain, params) -> dict:
+    """
+    ``build_comparison`` for the libraries selected by ``query_libraries``,
+    optionally paginated with ``limit`` and ``offset``. ``count`` is the
+    number of matching libraries before pagination.
+    """
+    catalog = get_catalog()
+    libraries = query_libraries(domain, params, catalog)
+
+    limit = _non_negative_int(params.get("limit"), "limit")
+    offset = _non_negative_int(params.get("offset"), "offset") or 0
+    if limit is None and not offset:
+        libraries = list(libraries)
+        return {**build_comparison(domain, libraries), "count": len(libraries)}
+
+    limit = min(MAX_PAGE_SIZE if limit is None else limit, MAX_PAGE_SIZE)
+    count = libraries.count()
+    page = list(libraries[offset : offset + limit])
+    return {
+        **build_comparison(domain, page),
+        "count": count,
+        "limit": limit,
+        "offset": offset,
+    }
+
+
+def build_comparison(domain, libraries=None) -> dict:
+    """
+    Metrics in display order and one row per library (all of ``domain`` by
+    default) with its values, evidence and descriptions keyed by metric name.
+    """
+    if libraries is None:
+        libraries = list(Library.objects.filter(domain=domain))
+    catalog = get_catalog()
+    metrics = catalog.metrics
+
+    table = []
+    by_lib = {}
+
+    for lib in libraries:
+        row = library_row(lib, metrics)
+        table.append(row)
+        by_lib[row["library_ID"]] = row
+
+    values = LibraryMetricValue.objects.filter(library_id__in=list(by_lib))
+
+    for val in values:
+        metric = catalog.get(val.metric_id)
+        if metric is None:
+            continue
+        lib_id = str(val.library_id)
+        metric_name = metric.metric_name
+        metric_value = val.value
+        scoring_dict = metric.scoring_dict
+        # validate if the stored value aligns with any new metric type changes, if it does it'll set it to null
+        if metric_value and scoring_dict and metric_value not in scoring_dict:
+            LibraryMetricValue.objects.update_or_create(
+                library=lib_id,
+                metric=metric.metric_ID,
+                defaults={"value": None},
+            )
+            metric_value = None
+
+        if lib_id in by_lib:
+            by_lib[lib_id]["metrics"][metric_name] = metric_value
+            by_lib[lib_id]["metrics"][f"{metric_name}_evidence"] = val.evidence
+            by_lib[lib_id]["metrics"][f"{metric_name}_description"] = val.description
+
+    return {
+        "metrics": [metric_summary(m) for m in metrics],
+        "libraries": table,
+    }
+
+
+def ahp_summary(libraries) -> dict:
+    """The AHP results last saved on each library by AHPCalculations."""
+    global_ranking, category_scores = {}, {}
+    for lib in libraries:
+        if not lib.ahp_results:
+            continue
+        global_ranking[lib.library_name] = lib.ahp_results.get("overall_score", 0)
+        category_scores[lib.library_name] = lib.ahp_results.get("category_scores", {})
+    return {"global_ranking": global_ranking, "category_scores": category_scores}
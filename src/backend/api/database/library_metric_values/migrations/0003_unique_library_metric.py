@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:46
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def remove_duplicate_values(apps, schema_editor):
+    """Keep the most recently modified value of every (library, metric) pair."""
+    LibraryMetricValue = apps.get_model("library_metric_values", "LibraryMetricValue")
+
+    duplicated = (
+        LibraryMetricValue.objects.values("library_id", "metric_id")
+        .annotate(n=Count("value_ID"))
+        .filter(n__gt=1)
+    )
+    for pair in duplicated:
+        rows = LibraryMetricValue.objects.filter(
+            library_id=pair["library_id"], metric_id=pair["metric_id"]
+        ).order_by("-last_modified")
+        keep = rows.values_list("value_ID", flat=True).first()
+        rows.exclude(value_ID=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("libraries", "0009_library_repo_size_kb"),
+        ("library_metric_values", "0002_librarymetricvalue_description"),
+        ("metrics", "0009_metricorder"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_values, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="librarymetricvalue",
+            constraint=models.UniqueConstraint(
+                fields=("library", "metric"), name="unique_library_metric_value"
+            ),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:09
+
+import math
+
+from django.db import migrations, models
+
+
+def numeric_value(value):
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def populate_value_number(apps, schema_editor):
+    LibraryMetricValue = apps.get_model("library_metric_values", "LibraryMetricValue")
+
+    batch = []
+    for row in LibraryMetricValue.objects.only("value_ID", "value").iterator(
+        chunk_size=2000
+    ):
+        row.value_number = numeric_value(row.value)
+        if row.value_number is not None:
+            batch.append(row)
+        if len(batch) >= 500:
+            LibraryMetricValue.objects.bulk_update(batch, ["value_number"])
+            batch = []
+    LibraryMetricValue.objects.bulk_update(batch, ["value_number"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("libraries", "0009_library_repo_size_kb"),
+        ("library_metric_values", "0003_unique_library_metric"),
+        ("metrics", "0010_metric_display_position"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="librarymetricvalue",
+            name="value_number",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="librarymetricvalue",
+            index=models.Index(
+                fields=["metric", "value_number"], name="lmv_metric_number_idx"
+            ),
+        ),
+        migrations.RunPython(populate_value_number, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:12
+
+from django.db import migrations, models
+
+from api.database.library_metric_values.typed import typed_values
+
+TYPED_FIELDS = ["value_number", "value_text", "value_date", "value_option"]
+
+
+def populate_typed_values(apps, schema_editor):
+    LibraryMetricValue = apps.get_model("library_metric_values", "LibraryMetricValue")
+
+    rows = (
+        LibraryMetricValue.objects.select_related("metric")
+        .only("value_ID", "value", "metric__value_type")
+        .iterator(chunk_size=2000)
+    )
+    batch = []
+    for row in rows:
+        for field, typed in typed_values(row.value, row.metric.value_type).items():
+            setattr(row, field, typed)
+        batch.append(row)
+        if len(batch) >= 500:
+            LibraryMetricValue.objects.bulk_update(batch, TYPED_FIELDS)
+            batch = []
+    LibraryMetricValue.objects.bulk_update(batch, TYPED_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("libraries", "0009_library_repo_size_kb"),
+        ("library_metric_values", "0004_value_number"),
+        ("metrics", "0010_metric_display_position"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="librarymetricvalue",
+            name="value_date",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="librarymetricvalue",
+            name="value_option",
+            field=models.CharField(
+                blank=True, editable=False, max_length=255, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="librarymetricvalue",
+            name="value_text",
+            field=models.CharField(
+                blank=True, editable=False, max_length=255, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="librarymetricvalue",
+            index=models.Index(
+                fields=["metric", "value_text"], name="lmv_metric_text_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="librarymetricvalue",
+            index=models.Index(
+                fields=["metric", "value_date"], name="lmv_metric_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="librarymetricvalue",
+            index=models.Index(
+                fields=["metric", "value_option"], name="lmv_metric_option_idx"
+            ),
+        ),
+        migrations.RunPython(populate_typed_values, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("library_metric_values", "0005_typed_value_columns"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="librarymetricvalue",
+            name="score",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="librarymetricvalue",
+            name="scored_version",
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+def clear_range_value_number(apps, schema_editor):
+    # Range values are option bands ("10-49", "1000+") ordered by value_option
+    LibraryMetricValue = apps.get_model("library_metric_values", "LibraryMetricValue")
+    LibraryMetricValue.objects.filter(metric__value_type="range").exclude(
+        value_number=None
+    ).update(value_number=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("library_metric_values", "0006_value_scores"),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_range_value_number, migrations.RunPython.noop),
+    ]
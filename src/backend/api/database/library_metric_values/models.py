@@ -4,6 +4,8 @@ from django.db import models
 
 from ..libraries.models import Library
 from ..metrics.models import Metric
+from .scores import load_rules, scoring_version, value_score
+from .typed import typed_values
 
 
 class LibraryMetricValue(models.Model):
@@ -16,10 +18,62 @@ class LibraryMetricValue(models.Model):
     library = models.ForeignKey(Library, on_delete=models.CASCADE)
     metric = models.ForeignKey(Metric, on_delete=models.CASCADE)
     value = models.JSONField(null=True, blank=True)
+    # Derived from value and metric.value_type on every write (see typed.py)
+    value_number = models.FloatField(null=True, blank=True, editable=False)
+    value_text = models.CharField(max_length=255, null=True, blank=True, editable=False)
+    value_date = models.DateTimeField(null=True, blank=True, editable=False)
+    value_option = models.CharField(
+        max_length=255, null=True, blank=True, editable=False
+    )
+    # Rule points of the value (None when its metric is not scored) and the
+    # scoring_version they were computed for; see scores.py and rescoring.py
+    score = models.FloatField(null=True, blank=True, editable=False)
+    scored_version = models.PositiveBigIntegerField(
+        null=True, blank=True, editable=False
+    )
     evidence = models.TextField(blank=True, null=True)
     description = models.TextField(blank=True, null=True)
     collected_by = models.CharField(max_length=100, blank=True, null=True)
     last_modified = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["library", "metric"], name="unique_library_metric_value"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["metric", "value_number"], name="lmv_metric_number_idx"
+            ),
+            models.Index(fields=["metric", "value_text"], name="lmv_metric_text_idx"),
+            models.Index(fields=["metric", "value_date"], name="lmv_metric_date_idx"),
+            models.Index(
+                fields=["metric", "value_option"], name="lmv_metric_option_idx"
+            ),
+        ]
+
+    # Columns derived from ``value``; written whenever ``value`` is
+    TYPED_FIELDS = ["value_number", "value_text", "value_date", "value_option"]
+    SCORE_FIELDS = ["score", "scored_version"]
+    DERIVED_FIELDS = TYPED_FIELDS + SCORE_FIELDS
+
+    def sync_typed_values(self):
+        for field, typed in typed_values(self.value, self.metric.value_type).items():
+            setattr(self, field, typed)
+
+    def sync_score(self, rules_version, rules_data):
+        """Score ``value_option``; call after ``sync_typed_values``."""
+        self.score = value_score(self.metric, self.value_option, rules_data)
+        self.scored_version = scoring_version(self.metric, rules_version)
+
+    def save(self, *args, **kwargs):
+        self.sync_typed_values()
+        self.sync_score(*load_rules())
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "value" in update_fields:
+            kwargs["update_fields"] = {*update_fields, *self.DERIVED_FIELDS}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.library.library_name} - {self.metric.metric_name}: {self.value}"
@@ -0,0 +1,100 @@
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import Case, FloatField, Sum, Value, When
+
+from ..metrics.models import Metric
+from .models import LibraryMetricValue
+from .scores import load_rules, rule_points, scoring_version
+
+# rules.json version the last full rescore ran against
+RULES_SCORED_KEY = "scores:rules_version"
+_UNSET = object()
+
+
+def _score_expression(points):
+    if points is None:
+        return Value(None, output_field=FloatField())
+    return Case(
+        *[
+            When(value_option=option, then=Value(float(p)))
+            for option, p in points.items()
+        ],
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def rescore_values(metrics, values=None) -> int:
+    """
+    Recompute the score of every value of ``metrics`` (within ``values``,
+    all values by default) whose scored_version is stale, with one UPDATE
+    per metric. Returns the number of rows updated.
+    """
+    rules_version, rules_data = load_rules()
+    if values is None:
+        values = LibraryMetricValue.objects.all()
+
+    updated = 0
+    for metric in metrics:
+        version = scoring_version(metric, rules_version)
+        updated += (
+            values.filter(metric=metric)
+            .exclude(scored_version=version)
+            .update(
+                score=_score_expression(rule_points(metric, rules_data)),
+                scored_version=version,
+            )
+        )
+    return updated
+
+
+def stale_metrics(values, metrics) -> list:
+    """The ``metrics`` that have a value in ``values`` with a stale score."""
+    rules_version, _ = load_rules()
+    expected = {m.metric_ID: scoring_version(m, rules_version) for m in metrics}
+    seen = (
+        values.filter(metric_id__in=list(expected))
+        .values_list("metric_id", "scored_version")
+        .distinct()
+    )
+    stale = {metric_id for metric_id, version in seen if version != expected[metric_id]}
+    return [m for m in metrics if m.metric_ID in stale]
+
+
+def refresh_scores(values, metrics) -> int:
+    """
+    Bring the scores in ``values`` up to date before reading them. Costs one
+    query when nothing is stale, which is the usual case since writes score
+    values and the background rescorer follows rules changes.
+    """
+    stale = stale_metrics(values, metrics)
+    return rescore_values(stale, values) if stale else 0
+
+
+def rescore_if_rules_changed() -> int:
+    """Rescore all values if rules.json changed since the last run."""
+    rules_version, _ = load_rules()
+    if cache.get(RULES_SCORED_KEY, _UNSET) == rules_version:
+        return 0
+    updated = rescore_values(Metric.objects.all())
+    cache.set(RULES_SCORED_KEY, rules_version, timeout=None)
+    return updated
+
+
+def category_totals(values, categories) -> dict:
+    """
+    ``{category: {library_ID: summed score}}`` over ``values``, from a single
+    SUM ... GROUP BY library, category query. Values of unscored metrics
+    have no score and are left out of the sums.
+    """
+    rows = (
+        values.filter(metric__category__in=list(categories))
+        .values("library_id", "metric__category")
+        .annotate(total=Sum("score"))
+        .order_by()
+    )
+    totals = defaultdict(dict)
+    for row in rows:
+        totals[row["metric__category"]][row["library_id"]] = row["total"] or 0
+    return totals
@@ -0,0 +1,44 @@
+import zlib
+
+from api.utils.config import config_version, load_config
+
+
+def load_rules() -> tuple[int | None, dict]:
+    """rules.json and its version, or ``(None, {})`` when it cannot be read."""
+    try:
+        return config_version("rules"), load_config("rules")
+    except (OSError, ValueError):
+        return None, {}
+
+
+def rule_points(metric, rules_data: dict) -> dict | None:
+    """
+    The ``option -> points`` template ``metric`` is scored with, or None for
+    metrics without an option category, which do not contribute to AHP.
+    """
+    if not metric.option_category:
+        return None
+    return (
+        rules_data.get(metric.value_type, {})
+        .get(metric.option_category, {})
+        .get("templates", {})
+        .get(metric.rule, {})
+    )
+
+
+def value_score(metric, option, rules_data: dict) -> float | None:
+    """Points for a value of ``metric`` whose option key is ``option``."""
+    points = rule_points(metric, rules_data)
+    if points is None:
+        return None
+    return float(points.get(option, 0))
+
+
+def scoring_version(metric, rules_version: int | None) -> int:
+    """
+    Identifies what a stored score was computed from: the rules.json version
+    and the metric fields that select its template. A score whose version
+    differs from this is stale.
+    """
+    key = (rules_version, metric.value_type, metric.option_category, metric.rule)
+    return zlib.crc32(repr(key).encode())
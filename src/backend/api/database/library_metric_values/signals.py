@@ -0,0 +1,111 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from api.utils.versions import bump_version, get_version
+
+from ..libraries.models import Library
+from ..metrics.models import Metric
+from .models import LibraryMetricValue
+from .scores import load_rules, scoring_version
+
+
+def _domain_data(domain_id) -> str:
+    return f"domain_data:{domain_id}"
+
+
+def domain_data_version(domain_id) -> int:
+    """
+    Version of a domain's libraries and metric values; caches derived from
+    the comparison matrix key on it.
+    """
+    return get_version(_domain_data(domain_id))
+
+
+def _bump_domains(domain_ids):
+    for domain_id in domain_ids:
+        bump_version(_domain_data(domain_id))
+
+
+def bump_domain_data(domain_ids):
+    # Only after commit, like METRIC_DEFINITIONS: a request that sees the new
+    # version before the rows would cache the old data under it
+    domain_ids = {domain_id for domain_id in domain_ids if domain_id is not None}
+    if domain_ids:
+        transaction.on_commit(partial(_bump_domains, domain_ids))
+
+
+def domain_ids_of(values) -> set:
+    """Domains of the libraries of ``values``, querying only uncached ones."""
+    library_field = LibraryMetricValue._meta.get_field("library")
+    domain_ids, uncached = set(), set()
+    for value in values:
+        if library_field.is_cached(value):
+            domain_ids.add(value.library.domain_id)
+        else:
+            uncached.add(value.library_id)
+    if uncached:
+        domain_ids.update(
+            Library.objects.filter(pk__in=uncached).values_list("domain_id", flat=True)
+        )
+    return domain_ids
+
+
+@receiver(post_save, sender=LibraryMetricValue)
+@receiver(post_delete, sender=LibraryMetricValue)
+def metric_value_changed(sender, instance, **kwargs):
+    bump_domain_data(domain_ids_of([instance]))
+
+
+def _changes_domain_data(update_fields) -> bool:
+    # Analysis status updates save with update_fields and do not change data
+    return update_fields is None or bool(
+        {"library_name", "domain"} & set(update_fields)
+    )
+
+
+@receiver(pre_save, sender=Library)
+def library_saving(sender, instance, update_fields=None, **kwargs):
+    # A library moved to another domain must also invalidate the old one
+    instance._previous_domain_id = None
+    if not instance._state.adding and _changes_domain_data(update_fields):
+        instance._previous_domain_id = (
+            Library.objects.filter(pk=instance.pk)
+            .values_list("domain_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Library)
+def library_saved(sender, instance, update_fields=None, **kwargs):
+    if _changes_domain_data(update_fields):
+        bump_domain_data(
+            [instance.domain_id, getattr(instance, "_previous_domain_id", None)]
+        )
+
+
+@receiver(post_delete, sender=Library)
+def library_deleted(sender, instance, **kwargs):
+    bump_domain_data([instance.domain_id])
+
+
+def _enqueue_rescore(metric_id):
+    from api.tasks import rescore_metric_values_task
+
+    rescore_metric_values_task.delay([str(metric_id)])
+
+
+@receiver(post_save, sender=Metric)
+def metric_saved(sender, instance, **kwargs):
+    # Only a change to the metric's rule, option category or value type
+    # leaves its stored scores stale
+    rules_version, _ = load_rules()
+    stale = (
+        LibraryMetricValue.objects.filter(metric=instance)
+        .exclude(scored_version=scoring_version(instance, rules_version))
+        .exists()
+    )
+    if stale:
+        transaction.on_commit(lambda: _enqueue_rescore(instance.pk))
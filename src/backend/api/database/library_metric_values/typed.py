@@ -0,0 +1,89 @@
+import math
+from datetime import datetime, timezone
+
+TEXT_MAX_LENGTH = 255
+
+NUMERIC_TYPES = {"int", "float"}
+# Option bands such as "10-49" or "1000+", ordered by their rules.json position
+RANGE_TYPES = {"range"}
+
+
+def numeric_value(value):
+    """``value`` as a float if it is a finite number or numeric string."""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def option_key(value):
+    """
+    ``value`` as a rules.json / scoring_dict option key: trimmed, lower-case
+    text, with whole floats written as integers (2.0 -> "2"). Scores are
+    looked up by this key, so "Yes" scores as "yes".
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip().lower()[:TEXT_MAX_LENGTH] or None
+
+
+DATE_TYPES = {"date", "datetime"}
+
+# The formats the metric value validators accept, then ISO 8601 in general
+DATE_FORMATS = {"date": "%Y-%m-%d", "datetime": "%Y-%m-%dT%H:%M"}
+TIME_FORMATS = ("%H:%M:%S", "%H:%M")
+
+
+def date_value(value, value_type):
+    """
+    ``value`` as a UTC datetime if it parses as a date or date-time. Values
+    without an offset are wall-clock times and are stored as if in UTC.
+    """
+    if not isinstance(value, str) or not value.strip():
+        return None
+    raw = value.strip()
+    try:
+        parsed = datetime.strptime(raw, DATE_FORMATS[value_type])
+    except ValueError:
+        try:
+            parsed = datetime.fromisoformat(raw)
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def text_value(value, value_type):
+    """``value`` as text; times are zero-padded so they sort correctly."""
+    if value is None or value == "":
+        return None
+    raw = str(value).strip()
+    if value_type == "time":
+        for fmt in TIME_FORMATS:
+            try:
+                return datetime.strptime(raw, fmt).time().isoformat()
+            except ValueError:
+                continue
+    return raw[:TEXT_MAX_LENGTH] or None
+
+
+def typed_values(value, value_type) -> dict:
+    """
+    Typed copies of a JSON ``value`` for a metric of ``value_type``, stored
+    alongside it so the database can sort, filter and aggregate. Kept free of
+    model imports so migrations can use it.
+    """
+    return {
+        "value_number": (numeric_value(value) if value_type in NUMERIC_TYPES else None),
+        "value_text": text_value(value, value_type),
+        "value_date": (
+            date_value(value, value_type) if value_type in DATE_TYPES else None
+        ),
+        "value_option": option_key(value),
+    }
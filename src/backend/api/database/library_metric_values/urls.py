@@ -6,11 +6,13 @@ from .views import (
     MetricValueBulkUpdateView,
     analyze_domain_libraries,
     analyze_library,
+    domain_charts,
     domain_comparison,
 )
 
 urlpatterns = [
     path("comparison/<uuid:domain_id>/", domain_comparison, name="values-comparison"),
+    path("charts/<uuid:domain_id>/", domain_charts, name="values-charts"),
     path(
         "libraries/<uuid:library_id>/update-values/",
         LibraryMetricValueUpdateView.as_view(),
@@ -0,0 +1,171 @@
+import re
+from datetime import date
+
+from api.utils.config import config_version, load_config
+from api.utils.versions import get_version
+
+from ..metrics.signals import METRIC_DEFINITIONS
+
+READ_ONLY_ERROR = "This metric is read-only and cannot be edited manually."
+
+# Same fields and widths that datetime.strptime accepts for these formats
+_YEAR = r"(\d{4})"
+_MONTH = r"(1[0-2]|0[1-9]|[1-9])"
+_DAY = r"(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])"
+_HOUR = r"(2[0-3]|[0-1]\d|\d)"
+_MINUTE = r"([0-5]\d|\d)"
+_SECOND = r"([0-5]\d|\d)"
+
+DATE_RE = re.compile(rf"{_YEAR}-{_MONTH}-{_DAY}")
+TIME_RE = re.compile(rf"{_HOUR}:{_MINUTE}(?::{_SECOND})?")
+# strptime matches the literal "T" case-insensitively
+DATETIME_RE = re.compile(rf"{_YEAR}-{_MONTH}-{_DAY}[Tt]{_HOUR}:{_MINUTE}")
+
+_validators = {}
+
+
+def _is_real_date(match) -> bool:
+    try:
+        date(*(int(g) for g in match.groups()[:3]))
+    except ValueError:
+        return False
+    return True
+
+
+def _load_rules() -> tuple[int | None, dict]:
+    try:
+        return config_version("rules"), load_config("rules")
+    except (OSError, ValueError):
+        return None, {}
+
+
+def _skip_blank(check):
+    def validate(value):
+        if value in ("", None):
+            return None, None
+        return check(value)
+
+    return validate
+
+
+def compile_validator(metric, rules_data: dict):
+    """
+    Build the ``value -> (error, parsed)`` check for ``metric`` with its
+    bounds, allowed options and formats resolved up front.
+    """
+    name = metric.metric_name
+
+    if metric.metric_key == "gitstats_report":
+        return _skip_blank(lambda value: (READ_ONLY_ERROR, None))
+
+    if metric.scoring_dict and isinstance(metric.scoring_dict, dict):
+        allowed_values = [str(k) for k in metric.scoring_dict.keys()]
+        allowed = set(allowed_values)
+        message = f"{name} must be one of: {', '.join(allowed_values)}."
+
+        def check_option(value):
+            if str(value) not in allowed:
+                return message, None
+            return None, value
+
+        return _skip_blank(check_option)
+
+    if metric.value_type == "int":
+        min_value = max_value = None
+        if metric.option_category and metric.rule:
+            rule_config = (
+                rules_data.get("int", {})
+                .get(metric.option_category, {})
+                .get("templates", {})
+                .get(metric.rule, {})
+            )
+            min_value = rule_config.get("min")
+            max_value = rule_config.get("max")
+
+        def check_int(value):
+            try:
+                parsed = int(str(value).strip())
+            except (TypeError, ValueError):
+                return f"{name} must be a whole number.", None
+            if min_value is not None and parsed < min_value:
+                return f"{name} must be >= {min_value}.", None
+            if max_value is not None and parsed > max_value:
+                return f"{name} must be <= {max_value}.", None
+            return None, parsed
+
+        return _skip_blank(check_int)
+
+    if metric.value_type == "float":
+
+        def check_float(value):
+            try:
+                return None, float(str(value).strip())
+            except (TypeError, ValueError):
+                return f"{name} must be a valid number.", None
+
+        return _skip_blank(check_float)
+
+    if metric.value_type == "text":
+        return _skip_blank(lambda value: (None, str(value).strip()))
+
+    if metric.value_type == "date":
+        message = f"{name} must be a valid date in YYYY-MM-DD format."
+
+        def check_date(value):
+            raw = str(value).strip()
+            match = DATE_RE.fullmatch(raw)
+            if match and _is_real_date(match):
+                return None, raw
+            return message, None
+
+        return _skip_blank(check_date)
+
+    if metric.value_type == "time":
+        message = f"{name} must be a valid time in HH:MM or HH:MM:SS format."
+
+        def check_time(value):
+            raw = str(value).strip()
+            if TIME_RE.fullmatch(raw):
+                return None, raw
+            return message, None
+
+        return _skip_blank(check_time)
+
+    if metric.value_type == "datetime":
+        message = f"{name} must be a valid date and time in YYYY-MM-DDTHH:MM format."
+
+        def check_datetime(value):
+            raw = str(value).strip()
+            match = DATETIME_RE.fullmatch(raw)
+            if match and _is_real_date(match):
+                return None, raw
+            return message, None
+
+        return _skip_blank(check_datetime)
+
+    return _skip_blank(lambda value: (None, value))
+
+
+def definitions_version() -> int:
+    return get_version(METRIC_DEFINITIONS)
+
+
+def get_validator(metric, version: int | None = None):
+    """
+    Compiled validator for ``metric``, cached per metric ID. Entries are
+    rebuilt when a Metric is saved (see metrics.signals) or the rules.json
+    version changes. Pass ``version`` when validating many values in one request to
+    read the shared definitions version only once.
+    """
+    if version is None:
+        version = definitions_version()
+    rules_key, rules_data = _load_rules()
+
+    key = (version, rules_key)
+    cached = _validators.get(metric.metric_ID)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    validator = compile_validator(metric, rules_data)
+    _validators[metric.metric_ID] = (key, validator)
+    return validator
@@ -1,9 +1,7 @@
-import json
-import os
-from datetime import datetime
+import uuid
+from collections import defaultdict
 
 import numpy as np
-from django.conf import settings
 from django.db import transaction
 from django.shortcuts import get_object_or_404
 from rest_framework import status
@@ -12,105 +10,22 @@ from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from ...utils.analysis import enqueue_library_analysis
+from ...utils.analysis import enqueue_domain_analysis, enqueue_library_analysis
+from ...utils.config import load_categories
 from ..domain.models import Domain
 from ..libraries.models import Library
-from ..metrics.models import Metric, MetricOrder
+from ..metrics.catalog import get_catalog
+from ..metrics.models import Metric
+from .bulk import upsert_metric_values
+from .charts import get_charts
+from .comparison import ComparisonQueryError, comparison_page
 from .models import LibraryMetricValue
+from .rescoring import category_totals, refresh_scores
+from .validators import definitions_version, get_validator
 
 
-def validate_metric_value(metric, value):
-    if value in ("", None):
-        return None, None
-
-    if metric.metric_key == "gitstats_report":
-        return "This metric is read-only and cannot be edited manually.", None
-
-    if metric.scoring_dict and isinstance(metric.scoring_dict, dict):
-        allowed_values = [str(k) for k in metric.scoring_dict.keys()]
-        if str(value) not in allowed_values:
-            return (
-                f"{metric.metric_name} must be one of: {', '.join(allowed_values)}.",
-                None,
-            )
-        return None, value
-
-    raw = str(value).strip()
-
-    if metric.value_type == "int":
-        try:
-            parsed = int(raw)
-        except (TypeError, ValueError):
-            return f"{metric.metric_name} must be a whole number.", None
-
-        if metric.option_category and metric.rule:
-            rules_path = os.path.join(
-                settings.BASE_DIR, "api", "database", "rules.json"
-            )
-            with open(rules_path, "r") as f:
-                rules_data = json.load(f)
-
-            rule_config = (
-                rules_data.get("int", {})
-                .get(metric.option_category, {})
-                .get("templates", {})
-                .get(metric.rule, {})
-            )
-
-            min_value = rule_config.get("min")
-            max_value = rule_config.get("max")
-
-            if min_value is not None and parsed < min_value:
-                return f"{metric.metric_name} must be >= {min_value}.", None
-
-            if max_value is not None and parsed > max_value:
-                return f"{metric.metric_name} must be <= {max_value}.", None
-
-        return None, parsed
-
-    if metric.value_type == "float":
-        try:
-            parsed = float(raw)
-            return None, parsed
-        except (TypeError, ValueError):
-            return f"{metric.metric_name} must be a valid number.", None
-
-    if metric.value_type == "text":
-        return None, raw
-
-    if metric.value_type == "date":
-        try:
-            datetime.strptime(raw, "%Y-%m-%d")
-            return None, raw
-        except ValueError:
-            return (
-                f"{metric.metric_name} must be a valid date in YYYY-MM-DD format.",
-                None,
-            )
-
-    if metric.value_type == "time":
-        for fmt in ("%H:%M", "%H:%M:%S"):
-            try:
-                datetime.strptime(raw, fmt)
-                return None, raw
-            except ValueError:
-                continue
-        return (
-            f"{metric.metric_name} must be a valid time in HH:MM or HH:MM:SS format.",
-            None,
-        )
-
-    if metric.value_type == "datetime":
-        try:
-            datetime.strptime(raw, "%Y-%m-%dT%H:%M")
-            return None, raw
-        except ValueError:
-            return (
-                f"{metric.metric_name} must be a valid date and time in YYYY-MM-DDTHH:MM format.",
-                None,
-            )
-
-    return None, value
+def validate_metric_value(metric, value, version=None):
+    return get_validator(metric, version)(value)
 
 
 @api_view(["POST"])
@@ -145,38 +60,10 @@ def analyze_library(request, library_id):
 @permission_classes([IsAuthenticatedOrReadOnly])
 def analyze_domain_libraries(request, domain_id):
     domain = get_object_or_404(Domain, pk=domain_id)
-    libs = Library.objects.filter(domain=domain)
-
-    queued, failed = [], []
-
-    for lib in libs:
-        try:
-            result = enqueue_library_analysis(lib)
-            if result:
-                queued.append(
-                    {
-                        "library_id": str(lib.library_ID),
-                        "analysis_task_id": result.get("analysis_task_id"),
-                        "gitstats_task_id": result.get("gitstats_task_id"),
-                    }
-                )
-            else:
-                failed.append(
-                    {"library_id": str(lib.library_ID), "error": lib.analysis_error}
-                )
-        except Exception as e:
-            lib.analysis_status = Library.ANALYSIS_FAILED
-            lib.analysis_error = str(e)
-            lib.save(update_fields=["analysis_status", "analysis_error"])
-            failed.append({"library_id": str(lib.library_ID), "error": str(e)})
+    result = enqueue_domain_analysis(domain)
 
     return Response(
-        {
-            "message": "Analysis queued for domain libraries.",
-            "queued": queued,
-            "failed": failed,
-            "total": libs.count(),
-        },
+        {"message": "Analysis queued for domain libraries.", **result},
         status=status.HTTP_202_ACCEPTED,
     )
 
@@ -184,110 +71,19 @@ def analyze_domain_libraries(request, domain_id):
 @api_view(["GET"])
 def domain_comparison(request, domain_id):
     domain = get_object_or_404(Domain, pk=domain_id)
-    path = os.path.join(settings.BASE_DIR, "api", "database", "categories.json")
-
-    libraries = Library.objects.filter(domain=domain)
-    metrics = Metric.objects.all()
-
-    categories_order = []
-    with open(path, "r") as f:
-        categories_order = json.load(f).get("Categories", [])
-
-    # Sort metrics based on MetricOrder
-    metric_order_obj = MetricOrder.objects.first()
-    if metric_order_obj and metric_order_obj.category_order:
-        metrics_category = metric_order_obj.category_order
-        category_ordered = [
-            cat
-            for cat in categories_order
-            if cat in metrics_category and metrics_category[cat]
-        ]
-        ordered_metric_ids = []
-
-        for cat in category_ordered:
-            ordered_metric_ids.extend(metrics_category[cat])
-        # Create position dict
-        position = {mid: i for i, mid in enumerate(ordered_metric_ids)}
-        # Sort metrics
-        metrics = sorted(
-            metrics,
-            key=lambda m: position.get(str(m.metric_ID), len(ordered_metric_ids)),
-        )
-    else:
-        metrics = list(metrics)
-
-    table = []
-    by_lib = {}
-
-    for lib in libraries:
-        row = {
-            "library_ID": str(lib.library_ID),
-            "library_name": lib.library_name,
-            "github_url": lib.github_url,
-            "url": lib.url,
-            "programming_language": lib.programming_language,
-            "analysis_status": lib.analysis_status,
-            "analysis_task_id": lib.analysis_task_id,
-            "analysis_error": lib.analysis_error,
-            "analysis_finished_at": lib.analysis_finished_at,
-            "gitstats_status": getattr(lib, "gitstats_status", None),
-            "gitstats_task_id": getattr(lib, "gitstats_task_id", None),
-            "gitstats_error": getattr(lib, "gitstats_error", None),
-            "gitstats_finished_at": getattr(lib, "gitstats_finished_at", None),
-            "gitstats_report_url": (
-                f"/gitstats/{lib.library_ID}/git_stats/index.html"
-                if getattr(lib, "gitstats_status", None) == Library.GITSTATS_SUCCESS
-                else None
-            ),
-            "metrics": {m.metric_name: None for m in metrics},
-        }
-        table.append(row)
-        by_lib[row["library_ID"]] = row
-
-    values = LibraryMetricValue.objects.filter(library__in=libraries).select_related(
-        "library", "metric"
-    )
-
-    for val in values:
-        lib_id = str(val.library.library_ID)
-        metric_name = val.metric.metric_name
-        metric_value = val.value
-        scoring_dict = val.metric.scoring_dict
-        # validate if the stored value aligns with any new metric type changes, if it does it'll set it to null
-        if metric_value and scoring_dict and metric_value not in scoring_dict:
-            LibraryMetricValue.objects.update_or_create(
-                library=lib_id,
-                metric=val.metric.metric_ID,
-                defaults={"value": None},
-            )
-            metric_value = None
+    try:
+        body = comparison_page(domain, request.query_params)
+    except ComparisonQueryError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(body, status=status.HTTP_200_OK)
 
-        if lib_id in by_lib:
-            by_lib[lib_id]["metrics"][metric_name] = metric_value
-            by_lib[lib_id]["metrics"][f"{metric_name}_evidence"] = val.evidence
-            by_lib[lib_id]["metrics"][f"{metric_name}_description"] = val.description
 
-    return Response(
-        {
-            "metrics": [
-                {
-                    "metric_ID": str(m.metric_ID),
-                    "metric_name": m.metric_name,
-                    "description": m.description,
-                    "metric_key": m.metric_key,
-                    "value_type": m.value_type,
-                    "source_type": m.source_type,
-                    "scoring_dict": m.scoring_dict,
-                    "category": m.category,
-                    "option_category": m.option_category,
-                    "rule": m.rule,
-                }
-                for m in metrics
-            ],
-            "libraries": table,
-        },
-        status=status.HTTP_200_OK,
-    )
+@api_view(["GET"])
+def domain_charts(request, domain_id):
+    """Precomputed Visualize series: per metric bars, histogram and stats,
+    and per category library averages."""
+    domain = get_object_or_404(Domain, pk=domain_id)
+    return Response(get_charts(domain), status=status.HTTP_200_OK)
 
 
 class LibraryMetricValueUpdateView(APIView):
@@ -303,6 +99,7 @@ class LibraryMetricValueUpdateView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        fields_by_metric = {}
         for key, value in metrics_data.items():
             if key.endswith("_evidence"):
                 metric_name = key.replace("_evidence", "")
@@ -314,33 +111,60 @@ class LibraryMetricValueUpdateView(APIView):
                 metric_name = key
                 field_to_update = "value"
 
-            value_to_store = None if value in ("", None) else value
+            fields_by_metric.setdefault(metric_name, {})[field_to_update] = (
+                None if value in ("", None) else value
+            )
+
+        metrics = get_catalog().by_name
 
-            metric = Metric.objects.filter(metric_name=metric_name).first()
+        version = definitions_version()
+
+        # One upsert per distinct set of submitted fields; a full edit form
+        # submits the same fields for every metric, so that is one statement.
+        rows_by_fields = defaultdict(list)
+        for metric_name, fields in fields_by_metric.items():
+            metric = metrics.get(metric_name)
             if not metric or metric.metric_key == "gitstats_report":
                 continue
 
-            if field_to_update == "value":
+            if "value" in fields:
                 error_message, validated_value = validate_metric_value(
-                    metric, value_to_store
+                    metric, fields["value"], version
                 )
                 if error_message:
                     return Response(
                         {"error": f"{metric_name}: {error_message}"},
                         status=status.HTTP_400_BAD_REQUEST,
                     )
-                value_to_store = validated_value
+                fields["value"] = validated_value
 
-            LibraryMetricValue.objects.update_or_create(
-                library=library,
-                metric=metric,
-                defaults={field_to_update: value_to_store},
+            rows_by_fields[tuple(sorted(fields))].append(
+                LibraryMetricValue(library=library, metric=metric, **fields)
             )
 
+        with transaction.atomic():
+            for update_fields, rows in rows_by_fields.items():
+                upsert_metric_values(rows, list(update_fields))
+
         return Response({"success": True}, status=status.HTTP_200_OK)
 
 
+def _parse_uuid(value):
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
 class MetricValueBulkUpdateView(APIView):
+    """
+    Apply a batch of ``{library_id, metric_id, value}`` edits. Libraries and
+    metrics are fetched with one query each, every item is validated in
+    memory and the valid ones are written with a single bulk upsert. Each
+    item gets its own entry in ``results`` (``updated``, ``skipped`` or
+    ``error``); the response is 207 when only some items could be applied.
+    """
+
     permission_classes = [IsAuthenticatedOrReadOnly]
 
     def post(self, request):
@@ -356,49 +180,80 @@ class MetricValueBulkUpdateView(APIView):
                 {"status": "No data received to update."}, status=status.HTTP_200_OK
             )
 
-        try:
-            with transaction.atomic():
-                for item in updates:
-                    library_id = item.get("library_id")
-                    metric_id = item.get("metric_id")
-                    value = item.get("value")
+        items = [item if isinstance(item, dict) else {} for item in updates]
+        library_ids = [_parse_uuid(item.get("library_id")) for item in items]
+        metric_ids = [_parse_uuid(item.get("metric_id")) for item in items]
 
-                    if not library_id or not metric_id:
-                        continue
+        libraries = Library.objects.in_bulk({i for i in library_ids if i})
+        catalog = get_catalog()
 
-                    value_to_store = None if value in ("", None) else value
+        version = definitions_version()
 
-                    library = get_object_or_404(Library, pk=library_id)
-                    metric = get_object_or_404(Metric, pk=metric_id)
+        results, rows = [], []
+        for index, item in enumerate(items):
+            result = {
+                "index": index,
+                "library_id": item.get("library_id"),
+                "metric_id": item.get("metric_id"),
+            }
+            results.append(result)
 
-                    if metric.metric_key == "gitstats_report":
-                        continue
+            if not item.get("library_id") or not item.get("metric_id"):
+                result["status"] = "skipped"
+                continue
 
-                    error_message, validated_value = validate_metric_value(
-                        metric, value_to_store
-                    )
-                    if error_message:
-                        return Response(
-                            {"error": error_message}, status=status.HTTP_400_BAD_REQUEST
-                        )
-
-                    LibraryMetricValue.objects.update_or_create(
-                        library=library,
-                        metric=metric,
-                        defaults={"value": validated_value},
-                    )
+            library = libraries.get(library_ids[index])
+            metric = catalog.get(metric_ids[index])
+            if library is None:
+                result.update(status="error", error="Library not found.")
+                continue
+            if metric is None:
+                result.update(status="error", error="Metric not found.")
+                continue
+            if metric.metric_key == "gitstats_report":
+                result["status"] = "skipped"
+                continue
 
-            return Response(
-                {"status": f"Successfully updated {len(updates)} metric values."},
-                status=status.HTTP_200_OK,
+            value = item.get("value")
+            value_to_store = None if value in ("", None) else value
+            error_message, validated_value = validate_metric_value(
+                metric, value_to_store, version
             )
+            if error_message:
+                result.update(status="error", error=error_message)
+                continue
 
+            rows.append(
+                LibraryMetricValue(
+                    library=library, metric=metric, value=validated_value
+                )
+            )
+            result["status"] = "updated"
+
+        try:
+            with transaction.atomic():
+                updated = upsert_metric_values(rows, ["value"])
         except Exception as e:
             return Response(
                 {"error": f"Bulk update failed: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+        errors = [r for r in results if r["status"] == "error"]
+        body = {
+            "status": f"Successfully updated {updated} metric values.",
+            "updated": updated,
+            "failed": len(errors),
+            "results": results,
+        }
+        if not errors:
+            return Response(body, status=status.HTTP_200_OK)
+
+        body["error"] = errors[0]["error"]
+        if updated:
+            return Response(body, status=status.HTTP_207_MULTI_STATUS)
+        return Response(body, status=status.HTTP_400_BAD_REQUEST)
+
 
 class AHPCalculations(APIView):
     # The 9 qualities from the LBM paper
@@ -414,34 +269,17 @@ class AHPCalculations(APIView):
         "Visibility/Transparency",
     ]
 
-    def get_library_scores_for_category(self, libraries, category_name, rules_data):
+    def get_library_scores_for_category(self, libraries, category_name, totals):
         """
-        Calculate scores for all libraries in a category.
+        Calculate scores for all libraries in a category. ``totals`` maps
+        ``library_ID`` to the sum of its stored value scores in the category.
         """
-        metrics = Metric.objects.filter(category=category_name)
-        if not metrics.exists():
+        if not get_catalog().for_category(category_name):
             return {}
 
         library_scores = {}
         for lib in libraries:
-            total_score = 0
-            for met in metrics:
-                try:
-                    val_obj = LibraryMetricValue.objects.get(library=lib, metric=met)
-                    value = val_obj.value
-
-                    if met.option_category:
-                        # Use rules.json for scoring
-                        rule_set = (
-                            rules_data.get(met.value_type, {})
-                            .get(met.option_category, {})
-                            .get("templates", {})
-                            .get(met.rule, {})
-                        )
-                        total_score += rule_set.get(str(value), 0)
-
-                except (LibraryMetricValue.DoesNotExist, ValueError, TypeError):
-                    continue
+            total_score = totals.get(lib.library_ID, 0)
 
             # Ensure score is positive
             final_score = min(10.0, total_score) if total_score > 0 else 0.0001
@@ -498,18 +336,11 @@ class AHPCalculations(APIView):
         """
         domain = get_object_or_404(Domain, pk=domain_id)
 
-        # Load rules.json
-        rules_path = os.path.join(settings.BASE_DIR, "api", "database", "rules.json")
-        cat_path = os.path.join(settings.BASE_DIR, "api", "database", "categories.json")
-
-        with open(rules_path, "r") as f:
-            rules_data = json.load(f)
-        with open(cat_path, "r") as f:
-            all_categories = json.load(f).get("Categories", [])
+        all_categories = load_categories()
 
-        libraries = Library.objects.filter(domain=domain)
+        libraries = list(Library.objects.filter(domain=domain))
 
-        if not libraries.exists():
+        if not libraries:
             return Response(
                 {
                     "domain": domain.domain_name,
@@ -530,11 +361,19 @@ class AHPCalculations(APIView):
                 }
             )
 
+        values = LibraryMetricValue.objects.filter(library__domain=domain)
+        # Score against the committed metric rows; the cached catalog can lag
+        # behind a rule change saved by another process
+        refresh_scores(
+            values, list(Metric.objects.filter(category__in=categories_to_use))
+        )
+        totals = category_totals(values, categories_to_use)
+
         # Get raw scores for each category
         category_raw_scores = {}
         for category_name in categories_to_use:
             category_raw_scores[category_name] = self.get_library_scores_for_category(
-                libraries, category_name, rules_data
+                libraries, category_name, totals.get(category_name, {})
             )
 
         # Apply LBM paper's pairwise formula to get normalized scores
@@ -575,7 +414,7 @@ class AHPCalculations(APIView):
                 "category_scores": lib_cat_scores,
                 "overall_score": global_ranking.get(lib_name, 0),
             }
-            lib.save(update_fields=["ahp_results"])
+        Library.objects.bulk_update(libraries, ["ahp_results"])
 
         return Response(
             {
@@ -0,0 +1,59 @@
+import threading
+from collections import defaultdict
+
+from api.utils.prometheus import cache_lookup
+from api.utils.versions import get_version
+
+from .models import Metric
+from .signals import METRIC_DEFINITIONS
+
+
+class MetricCatalog:
+    """
+    Every metric in display order, with lookups by ID, name, ``metric_key``
+    and category. Instances are shared between requests and must be treated
+    as read-only.
+    """
+
+    def __init__(self, metrics):
+        self.metrics = list(metrics)
+        self.by_id = {str(m.metric_ID): m for m in self.metrics}
+        self.by_name = {m.metric_name: m for m in self.metrics}
+        self.by_key = {m.metric_key: m for m in self.metrics if m.metric_key}
+
+        self.by_category = defaultdict(list)
+        for metric in self.metrics:
+            self.by_category[metric.category].append(metric)
+
+    def for_category(self, category: str) -> list:
+        return self.by_category.get(category, [])
+
+    def get(self, metric_id):
+        return self.by_id.get(str(metric_id))
+
+    @classmethod
+    def load(cls):
+        return cls(Metric.objects.in_display_order())
+
+
+_catalog = {"key": None, "catalog": None}
+_lock = threading.Lock()
+
+
+def get_catalog() -> MetricCatalog:
+    """
+    Process-wide MetricCatalog. It is rebuilt when a Metric or MetricOrder is
+    saved or deleted in any process (see metrics.signals) or the display
+    order is rewritten; otherwise a lookup costs one shared-cache read.
+    """
+    key = get_version(METRIC_DEFINITIONS)
+    if _catalog["key"] == key:
+        cache_lookup("metric_catalog", True)
+        return _catalog["catalog"]
+    cache_lookup("metric_catalog", False)
+
+    with _lock:
+        if _catalog["key"] != key:
+            _catalog["catalog"] = MetricCatalog.load()
+            _catalog["key"] = key
+    return _catalog["catalog"]
@@ -1,12 +1,34 @@
 from django.core.management.base import BaseCommand
+from django.db import transaction
 
 from api.database.metrics.models import Metric, MetricOrder
+from api.database.metrics.ordering import apply_display_order
 
 
 class Command(BaseCommand):
     help = "Populate MetricOrder with current metrics organized by category"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--positions-only",
+            action="store_true",
+            help=(
+                "Keep the saved MetricOrder and only rewrite the metric display "
+                "position columns (e.g. after editing categories.json)"
+            ),
+        )
+
     def handle(self, *args, **options):
+        if options["positions_only"]:
+            metric_order = MetricOrder.objects.first()
+            placed = apply_display_order(
+                metric_order.category_order if metric_order else {}
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f"✓ Updated display positions of {placed} metrics")
+            )
+            return
+
         try:
             # Get all metrics grouped by category
             metrics = Metric.objects.all().order_by("category", "metric_name")
@@ -19,9 +41,11 @@ class Command(BaseCommand):
                 category_order[category].append(str(metric.metric_ID))
 
             # Get or create the MetricOrder instance
-            metric_order, created = MetricOrder.objects.get_or_create(pk=1)
-            metric_order.category_order = category_order
-            metric_order.save()
+            with transaction.atomic():
+                metric_order, created = MetricOrder.objects.get_or_create(pk=1)
+                metric_order.category_order = category_order
+                metric_order.save()
+                apply_display_order(category_order)
 
             if created:
                 self.stdout.write(
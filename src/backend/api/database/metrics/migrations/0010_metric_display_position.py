@@ -0,0 +1,66 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:01
+
+import json
+import os
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_display_position(apps, schema_editor):
+    """Copy the saved MetricOrder onto the new columns."""
+    Metric = apps.get_model("metrics", "Metric")
+    MetricOrder = apps.get_model("metrics", "MetricOrder")
+
+    metric_order = MetricOrder.objects.first()
+    if not metric_order or not metric_order.category_order:
+        return
+
+    path = os.path.join(settings.BASE_DIR, "api", "database", "categories.json")
+    try:
+        with open(path, "r") as f:
+            categories = json.load(f).get("Categories", [])
+    except (OSError, ValueError):
+        return
+
+    positions = {}
+    for rank, category in enumerate(categories):
+        for metric_id in metric_order.category_order.get(category) or []:
+            positions.setdefault(str(metric_id), (rank, len(positions)))
+
+    metrics = list(Metric.objects.all())
+    for metric in metrics:
+        metric.category_rank, metric.display_position = positions.get(
+            str(metric.metric_ID), (None, None)
+        )
+    Metric.objects.bulk_update(
+        metrics, ["category_rank", "display_position"], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("metrics", "0009_metricorder"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="metric",
+            name="category_rank",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="metric",
+            name="display_position",
+            field=models.PositiveIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="metric",
+            index=models.Index(
+                fields=["category_rank", "display_position"],
+                name="metric_category_rank_idx",
+            ),
+        ),
+        migrations.RunPython(populate_display_position, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,13 @@
 import uuid
 
 from django.db import models
+from django.db.models import F
+
+
+class MetricQuerySet(models.QuerySet):
+    def in_display_order(self):
+        """Saved display order; metrics that were never placed go last."""
+        return self.order_by(F("display_position").asc(nulls_last=True), "metric_name")
 
 
 class Metric(models.Model):
@@ -37,6 +44,20 @@ class Metric(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     scoring_dict = models.JSONField(default=dict, blank=True, null=True)
 
+    # Denormalised from MetricOrder by metrics.ordering.apply_display_order
+    category_rank = models.PositiveIntegerField(blank=True, null=True)
+    display_position = models.PositiveIntegerField(blank=True, null=True, db_index=True)
+
+    objects = MetricQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["category_rank", "display_position"],
+                name="metric_category_rank_idx",
+            )
+        ]
+
     def __str__(self):
         return self.metric_name
 
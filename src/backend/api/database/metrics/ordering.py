@@ -0,0 +1,52 @@
+from functools import partial
+
+from django.db import transaction
+
+from api.utils.config import load_categories
+from api.utils.versions import bump_version
+
+from .models import Metric
+from .signals import METRIC_DEFINITIONS
+
+
+def display_positions(category_order: dict, categories: list[str]) -> dict:
+    """
+    Map metric ID to ``(category_rank, display_position)``, walking the
+    categories in categories.json order and each category's saved list of
+    metric IDs. Categories that are not in categories.json are not placed.
+    """
+    positions = {}
+    for rank, category in enumerate(categories):
+        for metric_id in category_order.get(category) or []:
+            positions.setdefault(str(metric_id), (rank, len(positions)))
+    return positions
+
+
+def apply_display_order(category_order: dict, categories: list[str] | None = None):
+    """
+    Store the display order from ``category_order`` on the Metric rows so
+    consumers can ``order_by`` it. Returns the number of metrics placed.
+    """
+    if categories is None:
+        try:
+            categories = load_categories()
+        except (OSError, ValueError):
+            categories = []
+
+    positions = display_positions(category_order or {}, categories)
+
+    changed = []
+    for metric in Metric.objects.only("metric_ID", "category_rank", "display_position"):
+        rank, position = positions.get(str(metric.metric_ID), (None, None))
+        if (metric.category_rank, metric.display_position) != (rank, position):
+            metric.category_rank = rank
+            metric.display_position = position
+            changed.append(metric)
+
+    Metric.objects.bulk_update(
+        changed, ["category_rank", "display_position"], batch_size=500
+    )
+    if changed:
+        # bulk_update does not send post_save; bump once the new order commits
+        transaction.on_commit(partial(bump_version, METRIC_DEFINITIONS))
+    return len(positions)
@@ -1,18 +1,11 @@
 import json
-import os
 
-from django.conf import settings
 from rest_framework import serializers
 
+from ...utils.config import load_config
 from .models import Metric
 
 
-def load_auto_metric_definitions():
-    path = os.path.join(settings.BASE_DIR, "api", "database", "auto_metrics.json")
-    with open(path, "r") as f:
-        return json.load(f)
-
-
 class MetricSerializer(serializers.ModelSerializer):
     class Meta:
         model = Metric
@@ -42,7 +35,7 @@ class MetricSerializer(serializers.ModelSerializer):
             return attrs
 
         try:
-            definitions = load_auto_metric_definitions()
+            definitions = load_config("auto_metrics")
         except FileNotFoundError:
             raise serializers.ValidationError(
                 {"metric_key": "auto_metrics.json not found."}
@@ -0,0 +1,21 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.utils.versions import bump_version
+
+from .models import Metric, MetricOrder
+
+METRIC_DEFINITIONS = "metric_definitions"
+
+
+@receiver(post_save, sender=Metric)
+@receiver(post_delete, sender=Metric)
+@receiver(post_save, sender=MetricOrder)
+@receiver(post_delete, sender=MetricOrder)
+def metric_definitions_changed(sender, **kwargs):
+    # Only after commit: a process that sees the new version must also see
+    # the new rows, or it caches the old ones under the new version
+    transaction.on_commit(partial(bump_version, METRIC_DEFINITIONS))
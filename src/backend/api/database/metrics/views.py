@@ -1,24 +1,23 @@
 import json
 import logging
-import os
 
-from django.conf import settings
+from django.db import transaction
 from rest_framework import generics, status
 from rest_framework.decorators import permission_classes  # noqa: F401
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from ...utils.config import load_config, registry
 from .models import Metric, MetricOrder
+from .ordering import apply_display_order
 from .serializers import FlatMetricSerializer, MetricSerializer
 
 logger = logging.getLogger(__name__)
 
 
 def load_auto_metric_definitions():
-    path = os.path.join(settings.BASE_DIR, "api", "database", "auto_metrics.json")
-    with open(path, "r") as f:
-        return json.load(f)
+    return load_config("auto_metrics")
 
 
 class AutoMetricOptionsView(APIView):
@@ -54,11 +53,9 @@ class AutoMetricOptionsView(APIView):
 
 class MetricRulesView(APIView):
     def get(self, request):
-        path = os.path.join(settings.BASE_DIR, "api", "database", "rules.json")
+        path = registry.path("rules")
         try:
-            with open(path, "r") as f:
-                data = json.load(f)
-            return Response(data, status=status.HTTP_200_OK)
+            return Response(load_config("rules"), status=status.HTTP_200_OK)
         except FileNotFoundError:
             return Response(
                 {"error": f"rules.json not found at {path}"},
@@ -73,11 +70,9 @@ class MetricRulesView(APIView):
 
 class MetricCategoryView(APIView):
     def get(self, request):
-        path = os.path.join(settings.BASE_DIR, "api", "database", "categories.json")
+        path = registry.path("categories")
         try:
-            with open(path, "r") as f:
-                data = json.load(f)
-            return Response(data, status=status.HTTP_200_OK)
+            return Response(load_config("categories"), status=status.HTTP_200_OK)
         except FileNotFoundError:
             return Response(
                 {"error": f"categories.json not found at {path}"},
@@ -195,9 +190,11 @@ class MetricReorderView(APIView):
                 )
 
             # Get or create the single MetricOrder instance
-            metric_order, _ = MetricOrder.objects.get_or_create(pk=1)
-            metric_order.category_order = category_order
-            metric_order.save()
+            with transaction.atomic():
+                metric_order, _ = MetricOrder.objects.get_or_create(pk=1)
+                metric_order.category_order = category_order
+                metric_order.save()
+                apply_display_order(category_order)
 
             return Response(
                 {
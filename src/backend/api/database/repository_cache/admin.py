@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from .models import RepositoryAnalysis
+
+
+@admin.register(RepositoryAnalysis)
+class RepositoryAnalysisAdmin(admin.ModelAdmin):
+    list_display = ("repo_slug", "head_sha", "repo_size_kb", "created_at")
+    search_fields = ("repo_slug", "head_sha")
+    ordering = ("-created_at",)
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="RepositoryAnalysis",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("repo_slug", models.CharField(max_length=255)),
+                ("head_sha", models.CharField(max_length=40)),
+                ("metric_data", models.JSONField(default=dict)),
+                ("repo_size_kb", models.BigIntegerField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                "db_table": "repository_analysis_cache",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("repo_slug", "head_sha"),
+                        name="unique_repo_analysis_per_sha",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import models
+
+
+class RepositoryAnalysis(models.Model):
+    """
+    Raw output of one repository analysis, shared by every library that
+    points at the same repository. Keyed by normalised ``owner/repo`` and the
+    HEAD commit the analysis ran against.
+    """
+
+    repo_slug = models.CharField(max_length=255)
+    head_sha = models.CharField(max_length=40)
+    metric_data = models.JSONField(default=dict)
+    repo_size_kb = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        db_table = "repository_analysis_cache"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["repo_slug", "head_sha"], name="unique_repo_analysis_per_sha"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.repo_slug}@{self.head_sha[:7]}"
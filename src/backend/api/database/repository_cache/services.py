@@ -0,0 +1,57 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from api.services.github_http import github_get
+
+from .models import RepositoryAnalysis
+
+logger = logging.getLogger("api.database.repository_cache")
+
+
+def resolve_head_sha(repo_slug: str) -> str | None:
+    """
+    SHA of the default branch HEAD of ``owner/repo``, or None when GitHub
+    cannot tell us (empty repository, API error, no credentials), in which
+    case the cache is bypassed.
+    """
+    try:
+        resp = github_get(f"/repos/{repo_slug}/commits", params={"per_page": 1})
+        commits = resp.json()
+    except Exception as e:
+        logger.warning("Could not resolve HEAD of %s: %s", repo_slug, e)
+        return None
+
+    if not commits:
+        return None
+    return commits[0].get("sha")
+
+
+def _fresh():
+    cutoff = timezone.now() - timedelta(seconds=settings.REPOSITORY_CACHE_TTL)
+    return RepositoryAnalysis.objects.filter(created_at__gte=cutoff)
+
+
+def get_cached_analysis(repo_slug: str, head_sha: str) -> RepositoryAnalysis | None:
+    return _fresh().filter(repo_slug=repo_slug, head_sha=head_sha).first()
+
+
+def store_analysis(repo_slug: str, head_sha: str, results: dict) -> RepositoryAnalysis:
+    entry, _ = RepositoryAnalysis.objects.update_or_create(
+        repo_slug=repo_slug,
+        head_sha=head_sha,
+        defaults={
+            "metric_data": results.get("metric_data") or {},
+            "repo_size_kb": results.get("repo_size_kb"),
+            "created_at": timezone.now(),
+        },
+    )
+    return entry
+
+
+def purge_expired() -> int:
+    cutoff = timezone.now() - timedelta(seconds=settings.REPOSITORY_CACHE_TTL)
+    deleted, _ = RepositoryAnalysis.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
@@ -8,21 +8,25 @@ from datetime import datetime, timedelta
 from urllib.parse import parse_qs, urlparse
 
 import requests
-from django.conf import settings
 
 from api.services.github_http import github_get
+from api.utils import timing
+from api.utils.config import LiveConfig, registry
+from api.utils.disk_budget import directory_size
+from api.utils.prometheus import track_clone
 
 logger = logging.getLogger("api.services.repo_analyzer")
 
 
-def load_auto_metric_definitions():
-    path = os.path.join(settings.BASE_DIR, "api", "database", "auto_metrics.json")
-    with open(path, "r") as f:
-        return json.load(f)
+# All target numerical metrics that can be calculated automatically; follows
+# edits to auto_metrics.json without a worker restart
+TARGET_METRICS = LiveConfig(registry, "auto_metrics")
 
 
-# Define all target numerical metrics that can be calculated automatically
-TARGET_METRICS = load_auto_metric_definitions()
+def _note_clone_size(repo_dir: str):
+    recorder = timing.current()
+    if recorder is not None:
+        recorder.bytes_cloned = directory_size(repo_dir)
 
 
 class RepoAnalyzer:
@@ -30,9 +34,16 @@ class RepoAnalyzer:
     Handles cloning, analyzing, and returning metric data for a Git repository.
     """
 
+    # Overridden per job by the Celery tasks, based on the repository size tier
+    clone_timeout = 60 * 20
+    # Where repositories are cloned from; the benchmarks point it at local
+    # fixture repositories
+    clone_base = "https://github.com"
+
     def __init__(self, github_url):
         self.github_url = github_url
         self.repo_owner, self.repo_name = self._extract_repo_info(github_url)
+        self.repo_size_kb = None
 
     def _extract_repo_info(self, url: str):
         path = urlparse(url).path.strip("/")
@@ -188,6 +199,7 @@ class RepoAnalyzer:
             repo_resp.raise_for_status()
             data = repo_resp.json()
             default_branch = data.get("default_branch", "main")
+            self.repo_size_kb = data.get("size")
             text_files, binary_files = self._get_file_type_counts(default_branch)
             logger.debug(
                 "File counts for %s/%s: text=%d binary=%d",
@@ -218,19 +230,21 @@ class RepoAnalyzer:
         tmp_root = tempfile.mkdtemp(prefix="domainx_repo_")
         repo_dir = os.path.join(tmp_root, "repo")
 
-        clone_url = f"https://github.com/{self.repo_owner}/{self.repo_name}.git"
+        clone_url = f"{self.clone_base}/{self.repo_owner}/{self.repo_name}.git"
 
         cmd = ["git", "clone", clone_url, repo_dir]
 
         try:
-            subprocess.run(
-                cmd,
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                timeout=60 * 20,
-            )
+            with timing.stage("clone"), track_clone():
+                subprocess.run(
+                    cmd,
+                    check=True,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    timeout=self.clone_timeout,
+                )
+            _note_clone_size(repo_dir)
             return tmp_root, repo_dir
         except subprocess.TimeoutExpired:
             shutil.rmtree(tmp_root, ignore_errors=True)
@@ -242,14 +256,15 @@ class RepoAnalyzer:
     def _run_scc(self, repo_dir: str) -> dict[str, int]:
         cmd = ["scc", "--format", "json", repo_dir]
         try:
-            p = subprocess.run(
-                cmd,
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                timeout=60 * 20,
-            )
+            with timing.stage("scc"):
+                p = subprocess.run(
+                    cmd,
+                    check=True,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    timeout=60 * 20,
+                )
         except FileNotFoundError:
             raise Exception("scc is not installed or not on PATH.")
         except subprocess.TimeoutExpired:
@@ -350,6 +365,7 @@ class RepoAnalyzer:
             return {
                 "repo_name": self.repo_name,
                 "metric_data": metric_results,
+                "repo_size_kb": self.repo_size_kb,
             }
         except Exception as e:
             logger.exception(
@@ -365,38 +381,40 @@ class RepoAnalyzer:
         env["LC_ALL"] = "C"
         env["LANG"] = "C"
 
-        subprocess.run(
-            cmd,
-            cwd=repo_dir,
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=False,
-            timeout=60 * 60 * 10,
-            env=env,
-            start_new_session=True,
-        )
+        with timing.stage("gitstats"):
+            subprocess.run(
+                cmd,
+                cwd=repo_dir,
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=False,
+                timeout=60 * 60 * 10,
+                env=env,
+                start_new_session=True,
+            )
 
         generated = os.path.join(repo_dir, "git_stats")
         if not os.path.isdir(generated):
             raise Exception("git_stats output folder not found after running.")
 
         dest = os.path.join(out_dir, "git_stats")
-        if os.path.exists(dest):
-            shutil.rmtree(dest, ignore_errors=True)
-        shutil.copytree(generated, dest)
-
-        for root, dirs, files in os.walk(dest):
-            for d in dirs:
-                try:
-                    os.chmod(os.path.join(root, d), 0o755)
-                except Exception:
-                    pass
-            for f in files:
-                try:
-                    os.chmod(os.path.join(root, f), 0o644)
-                except Exception:
-                    pass
+        with timing.stage("copy"):
+            if os.path.exists(dest):
+                shutil.rmtree(dest, ignore_errors=True)
+            shutil.copytree(generated, dest)
+
+            for root, dirs, files in os.walk(dest):
+                for d in dirs:
+                    try:
+                        os.chmod(os.path.join(root, d), 0o755)
+                    except Exception:
+                        pass
+                for f in files:
+                    try:
+                        os.chmod(os.path.join(root, f), 0o644)
+                    except Exception:
+                        pass
 
         index_path = os.path.join(dest, "index.html")
         if not os.path.isfile(index_path):
@@ -419,10 +437,19 @@ class RepoAnalyzer:
 
         try:
             repo_dir = self._clone_repo_to_dir(work_dir)
+            clone_bytes = directory_size(repo_dir)
+            recorder = timing.current()
+            if recorder is not None:
+                recorder.bytes_cloned = clone_bytes
             gitstats_results = self._run_gitstats(
                 repo_dir, out_dir=serve_dir, library_id=library_id
             )
-            return {"repo_name": self.repo_name, "metric_data": gitstats_results}
+            return {
+                "repo_name": self.repo_name,
+                "metric_data": gitstats_results,
+                "clone_bytes": clone_bytes,
+                "report_bytes": directory_size(os.path.join(serve_dir, "git_stats")),
+            }
         finally:
             repo_path = os.path.join(work_dir, "repo")
             shutil.rmtree(repo_path, ignore_errors=True)
@@ -433,18 +460,19 @@ class RepoAnalyzer:
         if os.path.exists(repo_dir):
             shutil.rmtree(repo_dir, ignore_errors=True)
 
-        clone_url = f"https://github.com/{self.repo_owner}/{self.repo_name}.git"
+        clone_url = f"{self.clone_base}/{self.repo_owner}/{self.repo_name}.git"
         cmd = ["git", "clone", clone_url, repo_dir]
 
         try:
-            subprocess.run(
-                cmd,
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                timeout=60 * 20,
-            )
+            with timing.stage("clone"), track_clone():
+                subprocess.run(
+                    cmd,
+                    check=True,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    timeout=self.clone_timeout,
+                )
             return repo_dir
         except subprocess.TimeoutExpired:
             raise Exception("Clone timed out.")
@@ -5,4 +5,5 @@ urlpatterns = [
     path("metrics/", include("api.database.metrics.urls")),
     path("library_metric_values/", include("api.database.library_metric_values.urls")),
     path("domain/", include("api.database.domain.urls")),  # leave it alone for now
+    path("analysis_runs/", include("api.database.analysis_runs.urls")),
 ]
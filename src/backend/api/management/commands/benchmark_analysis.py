@@ -0,0 +1,120 @@
+import json
+import logging
+import platform
+import shutil
+import subprocess
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils.loadtest import git_commit
+from api.utils.repo_benchmark import FIXTURE_SIZES, STAGE_METHODS, run_benchmark
+
+
+def _tool_version(cmd: list[str]) -> str | None:
+    if not shutil.which(cmd[0]):
+        return None
+    try:
+        return subprocess.run(
+            cmd, capture_output=True, text=True, timeout=30
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Time each RepoAnalyzer stage (API, clone, scc, gitstats) against "
+        "locally built fixture repositories and a fake GitHub server, without "
+        "touching the network or the database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="small,medium",
+            help=f"Fixture sizes to run: {', '.join(FIXTURE_SIZES)}",
+        )
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument(
+            "--latency-ms",
+            type=float,
+            default=0.0,
+            help="Delay the fake GitHub server adds to every response",
+        )
+        parser.add_argument(
+            "--rate-limit",
+            type=int,
+            help="Requests per resource and window before the fake server answers 403",
+        )
+        parser.add_argument("--rate-window", type=float, default=60.0, help="Seconds")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write the report to this JSON file")
+
+    def handle(self, *args, **options):
+        sizes = [s.strip() for s in options["sizes"].split(",") if s.strip()]
+        unknown = [s for s in sizes if s not in FIXTURE_SIZES]
+        if unknown or not sizes:
+            raise CommandError(
+                f"Unknown sizes {unknown}; choose from {', '.join(FIXTURE_SIZES)}."
+            )
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1.")
+
+        if options["verbosity"] < 2:
+            # Failed stages are reported below, not as logged tracebacks
+            logging.getLogger("api.services.repo_analyzer").setLevel(logging.CRITICAL)
+
+        results = run_benchmark(
+            sizes=sizes,
+            repeat=options["repeat"],
+            latency_ms=options["latency_ms"],
+            rate_limit=options["rate_limit"],
+            rate_window=options["rate_window"],
+            seed=options["seed"],
+            stdout=self.stdout if options["verbosity"] > 1 else None,
+        )
+
+        report = {
+            "meta": {
+                "commit": git_commit(settings.BASE_DIR),
+                "started_at": datetime.now(timezone.utc).isoformat(),
+                "repeat": options["repeat"],
+                "latency_ms": options["latency_ms"],
+                "rate_limit": options["rate_limit"],
+                "rate_window_s": options["rate_window"],
+                "seed": options["seed"],
+                "git": _tool_version(["git", "--version"]),
+                "scc": _tool_version(["scc", "--version"]),
+                "git_stats": _tool_version(["git_stats", "--version"]),
+                "python": platform.python_version(),
+                "host": platform.node(),
+            },
+            "sizes": results,
+        }
+
+        for size, result in results.items():
+            fixture = result["fixture"]
+            self.stdout.write(
+                f"{size}: {fixture['commits']} commits, {fixture['files']} files, "
+                f"{fixture['size_kb']} KB, {result['api_requests']} API requests"
+                f" ({result['rate_limited']} rate limited)"
+            )
+            for stage in STAGE_METHODS:
+                summary = result["stages"].get(stage)
+                if summary is None:
+                    self.stdout.write(f"  {stage:<16}not reached")
+                    continue
+                line = (
+                    f"  {stage:<16}{summary['mean_ms']:>10.1f} ms mean"
+                    f"  [{summary['min_ms']:.1f}-{summary['max_ms']:.1f}]"
+                )
+                if summary["errors"]:
+                    line += f"  {summary['errors']} failed: {summary['last_error']}"
+                self.stdout.write(line)
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"✓ Wrote {options['output']}"))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from api.utils.disk_budget import enforce_disk_budget
+
+
+def _mb(num_bytes: int) -> str:
+    return f"{num_bytes / (1024 * 1024):.1f} MB"
+
+
+class Command(BaseCommand):
+    help = (
+        "Sweep orphaned GitStats clones, evict reports of deleted or least "
+        "recently viewed libraries and record per-library disk footprint"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be removed without deleting anything",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        summary = enforce_disk_budget(dry_run=dry_run)
+        verb = "Would remove" if dry_run else "Removed"
+
+        for item in summary["work_dirs_removed"]:
+            self.stdout.write(
+                f"  {verb} work dir {item['library_id']} "
+                f"({_mb(item['bytes'])}, {item['reason']})"
+            )
+        for item in summary["reports_evicted"]:
+            self.stdout.write(
+                f"  {verb} report {item['library_id']} "
+                f"({_mb(item['bytes'])}, {item['reason']})"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ Work dir: {_mb(summary['work_dir_bytes'])}, "
+                f"serve dir: {_mb(summary['serve_dir_bytes'])}, "
+                f"{summary['libraries_measured']} library footprints recorded"
+            )
+        )
@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils.synthetic import generate_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate reproducible synthetic domains, libraries, metrics and values "
+        "for performance and load testing"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--domains", type=int, default=1)
+        parser.add_argument("--libraries", type=int, default=100, help="Per domain")
+        parser.add_argument("--metrics", type=int, default=50)
+        parser.add_argument(
+            "--fill",
+            type=float,
+            default=1.0,
+            help="Share of library/metric pairs that get a value (0-1)",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="The same seed and sizes always produce the same rows and IDs",
+        )
+        parser.add_argument(
+            "--prefix",
+            default="Synthetic",
+            help="Prefix of generated domain, library and metric names",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--defer-indexes",
+            action="store_true",
+            help=(
+                "Drop the value indexes for the load and rebuild them at the end "
+                "(faster; only on a database no other client is reading)"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if not 0 <= options["fill"] <= 1:
+            raise CommandError("--fill must be between 0 and 1.")
+        for name in ("domains", "libraries", "metrics", "batch_size"):
+            if options[name] < 1:
+                raise CommandError(f"--{name.replace('_', '-')} must be at least 1.")
+
+        started = time.perf_counter()
+        try:
+            summary = generate_dataset(
+                domains=options["domains"],
+                libraries=options["libraries"],
+                metrics=options["metrics"],
+                fill=options["fill"],
+                seed=options["seed"],
+                prefix=options["prefix"],
+                batch_size=options["batch_size"],
+                defer_indexes=options["defer_indexes"],
+                stdout=self.stdout if options["verbosity"] > 1 else None,
+            )
+        except ValueError as e:
+            raise CommandError(f"{e} Use another --prefix.")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ Created {summary['domains']} domains, {summary['libraries']} "
+                f"libraries, {summary['metrics']} metrics and {summary['values']} "
+                f"values in {time.perf_counter() - started:.1f}s"
+            )
+        )
@@ -0,0 +1,216 @@
+import json
+import platform
+import secrets
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.database.domain.models import Domain
+from api.utils.loadtest import (
+    DEFAULT_MIX,
+    PERCENTILES,
+    SCENARIOS,
+    LoadContext,
+    compare,
+    free_port,
+    git_commit,
+    parse_mix,
+    run_load,
+    start_server,
+    wait_for_server,
+)
+
+LOADTEST_USER_PREFIX = "loadtest"
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive a concurrent request mix against the API and write latency "
+        "percentiles, histograms and throughput to JSON. Boots the app under "
+        "gunicorn against the configured database unless --url is given; "
+        "seed it first, e.g. with generate_synthetic_data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--mix",
+            default=DEFAULT_MIX,
+            help=(
+                "Weighted scenarios, e.g. comparison=4,ahp=1. "
+                f"Available: {', '.join(SCENARIOS)}"
+            ),
+        )
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--duration", type=float, default=30.0, help="Seconds")
+        parser.add_argument(
+            "--requests", type=int, help="Stop after this many requests"
+        )
+        parser.add_argument(
+            "--warmup", type=float, default=3.0, help="Unrecorded seconds first"
+        )
+        parser.add_argument(
+            "--domains",
+            type=int,
+            default=5,
+            help="Spread requests over the first N domains by name",
+        )
+        parser.add_argument("--url", help="Test a running server instead")
+        parser.add_argument("--server-workers", type=int, default=2)
+        parser.add_argument("--server-threads", type=int, default=4)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write the report to this JSON file")
+        parser.add_argument(
+            "--compare", help="Print the change from this earlier JSON report"
+        )
+        parser.add_argument(
+            "--keep-user",
+            action="store_true",
+            help="Leave the run's throwaway user in the database afterwards",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options["mix"])
+        except ValueError as e:
+            raise CommandError(str(e))
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency must be at least 1.")
+
+        domain_ids = list(
+            Domain.objects.order_by("domain_name").values_list("domain_ID", flat=True)[
+                : options["domains"]
+            ]
+        )
+        if not domain_ids:
+            raise CommandError(
+                "No domains to test; seed the database first, e.g. with "
+                "generate_synthetic_data."
+            )
+
+        user, password = self._user()
+        try:
+            self._run(options, mix, domain_ids, user, password)
+        finally:
+            if options["keep_user"]:
+                self.stdout.write(f"Kept user {user.username}")
+            else:
+                user.delete()
+
+    def _run(self, options, mix, domain_ids, user, password):
+        ctx = LoadContext(
+            domain_ids,
+            login=user.username,
+            password=password,
+            token=str(RefreshToken.for_user(user).access_token),
+            seed=options["seed"],
+        )
+
+        server = None
+        url = options["url"]
+        if not url:
+            port = free_port()
+            url = f"http://127.0.0.1:{port}"
+            server = start_server(
+                port,
+                workers=options["server_workers"],
+                threads=options["server_threads"],
+                cwd=settings.BASE_DIR,
+            )
+        try:
+            wait_for_server(url)
+            self.stdout.write(
+                f"Running {options['mix']} against {url} with "
+                f"{options['concurrency']} clients for {options['duration']}s"
+            )
+            result = run_load(
+                url,
+                ctx,
+                mix,
+                concurrency=options["concurrency"],
+                duration=options["duration"],
+                max_requests=options["requests"],
+                warmup=options["warmup"],
+            )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+
+        report = {
+            "meta": {
+                "commit": git_commit(settings.BASE_DIR),
+                "started_at": datetime.now(timezone.utc).isoformat(),
+                "database": connection.vendor,
+                "url": options["url"] or "gunicorn",
+                "server_workers": None if options["url"] else options["server_workers"],
+                "server_threads": None if options["url"] else options["server_threads"],
+                "concurrency": options["concurrency"],
+                "duration_s": options["duration"],
+                "warmup_s": options["warmup"],
+                "mix": mix,
+                "domains": [str(d) for d in domain_ids],
+                "seed": options["seed"],
+                "python": platform.python_version(),
+                "host": platform.node(),
+            },
+            **result,
+        }
+
+        self._print(report)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"✓ Wrote {options['output']}"))
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                self._print_comparison(json.load(f), report)
+
+    def _user(self):
+        """
+        A throwaway non-admin user for the login and authenticated scenarios,
+        with a unique name and a random password; existing accounts are never
+        touched.
+        """
+        name = f"{LOADTEST_USER_PREFIX}-{secrets.token_hex(8)}"
+        password = secrets.token_urlsafe()
+        user = get_user_model().objects.create_user(
+            username=name,
+            email=f"{name}@example.com",
+            password=password,
+            role="user",
+        )
+        return user, password
+
+    def _print(self, report):
+        header = f"{'scenario':<16}{'requests':>9}{'errors':>8}{'rps':>9}"
+        header += "".join(f"{f'p{p} ms':>10}" for p in PERCENTILES)
+        self.stdout.write(header)
+        rows = [("total", report["total"]), *report["endpoints"].items()]
+        for name, summary in rows:
+            latency = summary["latency_ms"] or {}
+            line = (
+                f"{name:<16}{summary['requests']:>9}{summary['errors']:>8}"
+                f"{summary['throughput_rps']:>9}"
+            )
+            line += "".join(f"{latency.get(f'p{p}', '-'):>10}" for p in PERCENTILES)
+            self.stdout.write(line)
+
+    def _print_comparison(self, baseline, report):
+        self.stdout.write(
+            f"\nChange from {baseline['meta'].get('commit') or 'baseline'} "
+            f"to {report['meta'].get('commit') or 'this run'}:"
+        )
+        for row in compare(baseline, report):
+            old_rps, new_rps = row["throughput_rps"]
+            parts = [f"{row['name']:<16}rps {old_rps} -> {new_rps}"]
+            for p in PERCENTILES:
+                old, new, change = row[f"p{p}"]
+                parts.append(
+                    f"p{p} {old} -> {new} ms"
+                    + (f" ({change:+.1f}%)" if change is not None else "")
+                )
+            self.stdout.write("  ".join(parts))
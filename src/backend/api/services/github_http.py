@@ -1,11 +1,15 @@
 import os
 import time
 from pathlib import Path
+from urllib.parse import urlparse
 
 import jwt
 import requests
 
-API_BASE = "https://api.github.com"
+from api.utils import timing
+
+# Overridable for GitHub Enterprise or a local stand-in (see repo_benchmark)
+API_BASE = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
 _APP_TOKEN_CACHE = {"token": None, "exp": 0}
 
 
@@ -98,6 +102,16 @@ def _get_auth_token() -> str:
     )
 
 
+def _api_stage(path: str) -> str:
+    """Stage name of a call: ``/repos/o/r/git/trees/main`` is ``trees``."""
+    parts = urlparse(path).path.strip("/").split("/")
+    if parts[0] == "repos":
+        if len(parts) <= 3:
+            return "repo"
+        return parts[4] if parts[3] == "git" and len(parts) > 4 else parts[3]
+    return parts[0] or "root"
+
+
 def github_get(path: str, *, params=None, timeout=20):
     token = _get_auth_token()
 
@@ -107,7 +121,13 @@ def github_get(path: str, *, params=None, timeout=20):
         "X-GitHub-Api-Version": "2022-11-28",
     }
     url = path if path.startswith("http") else f"{API_BASE}{path}"
+    started = time.perf_counter()
     resp = requests.get(url, headers=headers, params=params, timeout=timeout)
+    recorder = timing.current()
+    if recorder is not None:
+        recorder.note_api_call(
+            _api_stage(path), (time.perf_counter() - started) * 1000, resp.headers
+        )
 
     if resp.status_code >= 400:
         try:
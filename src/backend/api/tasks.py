@@ -1,21 +1,166 @@
 import os
+import socket
+import time
 
-from celery import shared_task
+from celery import Task, shared_task
 from celery.exceptions import SoftTimeLimitExceeded
 from celery.utils.log import get_task_logger
 from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
 
+from .database.analysis_runs.models import AnalysisRun
+from .database.analysis_runs.services import purge_old_runs, record_run
 from .database.libraries.models import Library
+from .database.library_metric_values.bulk import upsert_metric_values
 from .database.library_metric_values.models import LibraryMetricValue
+from .database.library_metric_values.rescoring import (
+    rescore_if_rules_changed,
+    rescore_values,
+)
+from .database.metrics.catalog import get_catalog
 from .database.metrics.models import Metric
+from .database.repository_cache.services import (
+    get_cached_analysis,
+    purge_expired,
+    resolve_head_sha,
+    store_analysis,
+)
 from .database.services import RepoAnalyzer
+from .utils import coalesce, timing
+from .utils.disk_budget import enforce_disk_budget
+from .utils.prometheus import cache_lookup
+from .utils.repos import repo_slug
 
 logger = get_task_logger("api.tasks.analyze_repo")
 
 
-@shared_task(bind=True, queue="analysis")
+def _apply_clone_timeout(analyzer, request):
+    """
+    Let clones run as long as the job's soft time limit, which enqueue sets
+    from the repository size, instead of the fixed RepoAnalyzer default.
+    """
+    _, soft_limit = getattr(request, "timelimit", None) or (None, None)
+    if soft_limit:
+        analyzer.clone_timeout = int(soft_limit)
+
+
+class LibraryAnalysisTask(Task):
+    """
+    Base for the per-library analysis tasks.
+
+    Jobs are coalesced per library and repository (see api.utils.coalesce): a
+    job that was superseded by a newer request, or duplicates one that is
+    already running, exits without doing any work. When a domain-wide run is
+    capped (ANALYSIS_DOMAIN_MAX_IN_FLIGHT), every finished job frees a slot
+    for the next deferred library of its domain. Every job that does work
+    is recorded as an AnalysisRun with its stage timings.
+    """
+
+    coalesce_kind = None
+
+    def __call__(self, library_id, repo_url, *args, **kwargs):
+        task_id = getattr(self.request, "id", None)
+        hard_limit, _ = getattr(self.request, "timelimit", None) or (None, None)
+        timeout = (
+            int(hard_limit) + settings.ANALYSIS_HARD_TIME_LIMIT_GRACE
+            if hard_limit
+            else None
+        )
+
+        if not coalesce.claim(
+            self.coalesce_kind, library_id, repo_url, task_id, timeout=timeout
+        ):
+            logger.info(
+                "Skipping superseded or duplicate job",
+                extra={
+                    "library_id": library_id,
+                    "task_id": task_id,
+                    "kind": self.coalesce_kind,
+                },
+            )
+            return {"ok": True, "skipped": True, "superseded": True}
+
+        started_at, started = timezone.now(), time.perf_counter()
+        outcome, error = AnalysisRun.OUTCOME_FAILED, None
+        try:
+            with timing.recording() as recorder:
+                # Task.__call__ would push a fresh request and lose the task ID;
+                # the worker has already set up the request context for us.
+                result = self.run(library_id, repo_url, *args, **kwargs)
+            outcome = self.run_outcome(result)
+            return result
+        except SoftTimeLimitExceeded:
+            outcome, error = AnalysisRun.OUTCOME_TIMEOUT, "Soft time limit exceeded."
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"[-2000:]
+            raise
+        finally:
+            coalesce.release(self.coalesce_kind, library_id, repo_url, task_id)
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            record_run(
+                self.coalesce_kind,
+                library_id,
+                repo_url,
+                recorder,
+                task_id=task_id,
+                worker=getattr(self.request, "hostname", None) or socket.gethostname(),
+                outcome=outcome,
+                error=error,
+                started_at=started_at,
+                duration_ms=duration_ms,
+            )
+            logger.info(
+                "Analysis run finished",
+                extra={
+                    "library_id": library_id,
+                    "task_id": task_id,
+                    "kind": self.coalesce_kind,
+                    "outcome": outcome,
+                    "duration_ms": duration_ms,
+                    "api_calls": recorder.api_calls,
+                    "stages_ms": {
+                        name: round(entry["ms"])
+                        for name, entry in recorder.stages.items()
+                    },
+                },
+            )
+
+    @staticmethod
+    def run_outcome(result) -> str:
+        result = result if isinstance(result, dict) else {}
+        if result.get("cached"):
+            return AnalysisRun.OUTCOME_CACHED
+        if (result.get("result") or {}).get("skipped"):
+            return AnalysisRun.OUTCOME_SKIPPED
+        return AnalysisRun.OUTCOME_SUCCESS
+
+    def after_return(self, status, retval, task_id, args, kwargs, einfo):
+        if not settings.ANALYSIS_DOMAIN_MAX_IN_FLIGHT or not args:
+            return
+
+        from .utils.analysis import dispatch_deferred_analysis
+
+        try:
+            domain_id = (
+                Library.objects.filter(library_ID=args[0])
+                .values_list("domain_id", flat=True)
+                .first()
+            )
+            if domain_id:
+                dispatch_deferred_analysis(domain_id)
+        except Exception:
+            logger.error(
+                "Dispatching deferred analysis failed",
+                exc_info=True,
+                extra={"library_id": args[0], "task_id": task_id},
+            )
+
+
+@shared_task(
+    bind=True, base=LibraryAnalysisTask, coalesce_kind="analysis", queue="analysis"
+)
 def analyze_repo_task(self, library_id: str, repo_url: str):
     task_id = getattr(self.request, "id", None)
 
@@ -41,71 +186,95 @@ def analyze_repo_task(self, library_id: str, repo_url: str):
     start = timezone.now()
 
     try:
-        analyzer = RepoAnalyzer(github_url=repo_url)
-        results = analyzer.run_analysis_and_get_data()
+        slug = repo_slug(repo_url)
+        head_sha = resolve_head_sha(slug)
+        with timing.stage("cache_lookup"):
+            cached = get_cached_analysis(slug, head_sha) if head_sha else None
+        cache_lookup("repository_analysis", cached is not None)
+        if cached:
+            results = {
+                "metric_data": cached.metric_data,
+                "repo_size_kb": cached.repo_size_kb,
+            }
+            analysed_at = cached.created_at
+        else:
+            analyzer = RepoAnalyzer(github_url=repo_url)
+            _apply_clone_timeout(analyzer, self.request)
+            results = analyzer.run_analysis_and_get_data()
+            analysed_at = timezone.now()
+            if head_sha:
+                store_analysis(slug, head_sha, results)
+
         metrics_data = results.get("metric_data", {}) or {}
 
-        metric_keys = list(metrics_data.keys())
-        metrics = Metric.objects.filter(metric_key__in=metric_keys)
-        metrics_by_key = {m.metric_key: m for m in metrics}
+        metrics_by_key = get_catalog().by_key
 
-        updated_count = 0
         skipped_count = 0
+        evidence = f"Auto-calculated via GitHub API/SCC on {analysed_at.isoformat()}"
+        rows = []
+
+        for metric_key, value in metrics_data.items():
+            metric_obj = metrics_by_key.get(metric_key)
+            if not metric_obj:
+                skipped_count += 1
+                logger.debug(
+                    "Metric not found in DB; skipping",
+                    extra={
+                        "library_id": library_id,
+                        "task_id": task_id,
+                        "metric_key": metric_key,
+                    },
+                )
+                continue
+
+            try:
+                if metric_obj.value_type == "int":
+                    stored_value = int(value)
+                elif metric_obj.value_type == "float":
+                    stored_value = float(value)
+                elif metric_obj.value_type == "bool":
+                    stored_value = bool(value)
+                else:
+                    stored_value = str(value)
+            except (TypeError, ValueError):
+                skipped_count += 1
+                logger.debug(
+                    "Metric value could not be converted; skipping",
+                    extra={
+                        "library_id": library_id,
+                        "task_id": task_id,
+                        "metric_key": metric_key,
+                        "value": value,
+                        "value_type": metric_obj.value_type,
+                    },
+                )
+                continue
 
-        with transaction.atomic():
-            for metric_key, value in metrics_data.items():
-                metric_obj = metrics_by_key.get(metric_key)
-                if not metric_obj:
-                    skipped_count += 1
-                    logger.debug(
-                        "Metric not found in DB; skipping",
-                        extra={
-                            "library_id": library_id,
-                            "task_id": task_id,
-                            "metric_key": metric_key,
-                        },
-                    )
-                    continue
-
-                try:
-                    if metric_obj.value_type == "int":
-                        stored_value = int(value)
-                    elif metric_obj.value_type == "float":
-                        stored_value = float(value)
-                    elif metric_obj.value_type == "bool":
-                        stored_value = bool(value)
-                    else:
-                        stored_value = str(value)
-                except (TypeError, ValueError):
-                    skipped_count += 1
-                    logger.debug(
-                        "Metric value could not be converted; skipping",
-                        extra={
-                            "library_id": library_id,
-                            "task_id": task_id,
-                            "metric_key": metric_key,
-                            "value": value,
-                            "value_type": metric_obj.value_type,
-                        },
-                    )
-                    continue
-
-                LibraryMetricValue.objects.update_or_create(
+            rows.append(
+                LibraryMetricValue(
                     library=lib,
                     metric=metric_obj,
-                    defaults={
-                        "value": stored_value,
-                        "evidence": f"Auto-calculated via GitHub API/SCC on {timezone.now().isoformat()}",
-                    },
+                    value=stored_value,
+                    evidence=evidence,
                 )
-                updated_count += 1
+            )
 
-        lib.analysis_status = Library.ANALYSIS_SUCCESS
-        lib.analysis_finished_at = timezone.now()
-        lib.analysis_error = None
-        lib.save(
-            update_fields=["analysis_status", "analysis_finished_at", "analysis_error"]
-        )
+        with timing.stage("db_write"):
+            with transaction.atomic():
+                updated_count = upsert_metric_values(rows, ["value", "evidence"])
+
+            lib.analysis_status = Library.ANALYSIS_SUCCESS
+            lib.analysis_finished_at = timezone.now()
+            lib.analysis_error = None
+            update_fields = [
+                "analysis_status",
+                "analysis_finished_at",
+                "analysis_error",
+            ]
+            if isinstance(results.get("repo_size_kb"), int):
+                lib.repo_size_kb = results["repo_size_kb"]
+                update_fields.append("repo_size_kb")
+            lib.save(update_fields=update_fields)
 
         duration_ms = int((timezone.now() - start).total_seconds() * 1000)
 
@@ -119,6 +288,7 @@ def analyze_repo_task(self, library_id: str, repo_url: str):
                 "skipped_count": skipped_count,
                 "duration_ms": duration_ms,
                 "status": "success",
+                "source": "repository_cache" if cached else "analysis",
             },
         )
 
@@ -126,6 +296,7 @@ def analyze_repo_task(self, library_id: str, repo_url: str):
             "ok": True,
             "metrics_updated": updated_count,
             "metrics_skipped": skipped_count,
+            "cached": bool(cached),
         }
 
     except Exception:
@@ -146,6 +317,8 @@ def analyze_repo_task(self, library_id: str, repo_url: str):
 
 @shared_task(
     bind=True,
+    base=LibraryAnalysisTask,
+    coalesce_kind="gitstats",
     queue="gitstats",
     soft_time_limit=28800,
     time_limit=30600,
@@ -186,48 +359,56 @@ def analyze_repo_gitstats_task(self, library_id: str, repo_url: str):
                 ]
             )
 
-            metric = Metric.objects.filter(metric_key="gitstats_report").first()
+            metric = get_catalog().by_key.get("gitstats_report")
             if metric:
-                LibraryMetricValue.objects.update_or_create(
-                    library=lib,
-                    metric=metric,
-                    defaults={
-                        "value": lib.gitstats_report_path,
-                        "evidence": None,
-                    },
+                upsert_metric_values(
+                    [
+                        LibraryMetricValue(
+                            library=lib, metric=metric, value=lib.gitstats_report_path
+                        )
+                    ],
+                    ["value", "evidence"],
                 )
 
             return {"ok": True, "result": {"skipped": True}}
 
         analyzer = RepoAnalyzer(github_url=repo_url)
+        _apply_clone_timeout(analyzer, self.request)
         results = analyzer.run_gitstats_only(
             work_dir=work_dir, serve_dir=serve_dir, library_id=library_id
         )
 
-        lib.gitstats_report_path = f"/gitstats/{library_id}/git_stats/index.html"
-        lib.gitstats_status = Library.GITSTATS_SUCCESS
-        lib.gitstats_finished_at = timezone.now()
-        lib.gitstats_error = None
-        lib.save(
-            update_fields=[
-                "gitstats_status",
-                "gitstats_finished_at",
-                "gitstats_report_path",
-                "gitstats_error",
-            ]
-        )
-
-        metric = Metric.objects.filter(metric_key="gitstats_report").first()
-        if metric:
-            LibraryMetricValue.objects.update_or_create(
-                library=lib,
-                metric=metric,
-                defaults={
-                    "value": lib.gitstats_report_path,
-                    "evidence": None,
-                },
+        with timing.stage("db_write"):
+            lib.gitstats_report_path = f"/gitstats/{library_id}/git_stats/index.html"
+            lib.gitstats_status = Library.GITSTATS_SUCCESS
+            lib.gitstats_finished_at = timezone.now()
+            lib.gitstats_error = None
+            lib.repo_clone_bytes = results.get("clone_bytes")
+            lib.gitstats_report_bytes = results.get("report_bytes")
+            lib.disk_usage_measured_at = timezone.now()
+            lib.save(
+                update_fields=[
+                    "gitstats_status",
+                    "gitstats_finished_at",
+                    "gitstats_report_path",
+                    "gitstats_error",
+                    "repo_clone_bytes",
+                    "gitstats_report_bytes",
+                    "disk_usage_measured_at",
+                ]
             )
 
+            metric = get_catalog().by_key.get("gitstats_report")
+            if metric:
+                upsert_metric_values(
+                    [
+                        LibraryMetricValue(
+                            library=lib, metric=metric, value=lib.gitstats_report_path
+                        )
+                    ],
+                    ["value", "evidence"],
+                )
+
         return {"ok": True, "result": results}
 
     except SoftTimeLimitExceeded:
@@ -258,3 +439,70 @@ def analyze_repo_gitstats_task(self, library_id: str, repo_url: str):
             extra={"library_id": library_id, "repo_url": repo_url, "task_id": task_id},
         )
         raise
+
+
+@shared_task(queue="gitstats")
+def enforce_gitstats_disk_budget_task(dry_run: bool = False):
+    summary = enforce_disk_budget(dry_run=dry_run)
+    return {
+        "ok": True,
+        "work_dirs_removed": len(summary["work_dirs_removed"]),
+        "reports_evicted": len(summary["reports_evicted"]),
+        "work_dir_bytes": summary["work_dir_bytes"],
+        "serve_dir_bytes": summary["serve_dir_bytes"],
+    }
+
+
+@shared_task(queue="analysis")
+def purge_repository_cache_task():
+    return {"ok": True, "deleted": purge_expired()}
+
+
+@shared_task(queue="analysis")
+def purge_analysis_runs_task():
+    return {"ok": True, "deleted": purge_old_runs()}
+
+
+@shared_task(queue="analysis")
+def dispatch_deferred_analysis_task():
+    """
+    Safety net for ``LibraryAnalysisTask.after_return``, which never runs when
+    a worker dies or a job hits its hard time limit: top up every domain that
+    still has deferred libraries.
+    """
+    if not settings.ANALYSIS_DOMAIN_MAX_IN_FLIGHT:
+        return {"ok": True, "dispatched": 0}
+
+    from .utils.analysis import dispatch_deferred_analysis
+
+    domain_ids = (
+        Library.objects.filter(analysis_deferred=True)
+        .values_list("domain_id", flat=True)
+        .distinct()
+    )
+    dispatched = 0
+    for domain_id in domain_ids:
+        try:
+            dispatched += len(dispatch_deferred_analysis(domain_id))
+        except Exception:
+            logger.error(
+                "Dispatching deferred analysis failed",
+                exc_info=True,
+                extra={"domain_id": str(domain_id)},
+            )
+    return {"ok": True, "dispatched": dispatched}
+
+
+@shared_task(queue="analysis")
+def rescore_metric_values_task(metric_ids=None):
+    """
+    Recompute stored value scores for ``metric_ids`` after their rule
+    changed, or for every metric when rules.json changed since the last run.
+    """
+    if metric_ids is None:
+        updated = rescore_if_rules_changed()
+    else:
+        # From the database, not the catalog: this worker's cached catalog
+        # may predate the commit that enqueued the task
+        updated = rescore_values(Metric.objects.filter(pk__in=metric_ids))
+    return {"ok": True, "updated": updated}
@@ -1,5 +1,10 @@
 from django.urls import include, path
 
+from .views import profile_download, profiles_list, server_timing_stats
+
 urlpatterns = [
     path("", include("api.database.urls")),
+    path("server-timing/", server_timing_stats, name="server-timing-stats"),
+    path("profiles/", profiles_list, name="profiles-list"),
+    path("profiles/<str:profile_id>/", profile_download, name="profile-download"),
 ]
@@ -1,37 +1,338 @@
+from datetime import timedelta
+from uuid import uuid4
+
+from celery import group
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
 from ..database.libraries.models import Library
 from ..tasks import analyze_repo_gitstats_task, analyze_repo_task
+from . import coalesce
+from .routing import plan_library_analysis, time_limits
 
+MISSING_GITHUB_URL_ERROR = "Library GitHub URL is missing."
 
-def enqueue_library_analysis(library: Library):
-    library.analysis_status = Library.ANALYSIS_PENDING
-    library.analysis_task_id = None
-    library.analysis_error = None
-    library.analysis_started_at = None
-    library.analysis_finished_at = None
+KINDS = ("analysis", "gitstats")
+FAILED_STATUS = {
+    "analysis": Library.ANALYSIS_FAILED,
+    "gitstats": Library.GITSTATS_FAILED,
+}
+
+STATUS_FIELDS = {
+    "analysis": [
+        "analysis_status",
+        "analysis_task_id",
+        "analysis_error",
+        "analysis_started_at",
+        "analysis_finished_at",
+        "analysis_deferred",
+    ],
+    "gitstats": [
+        "gitstats_status",
+        "gitstats_task_id",
+        "gitstats_error",
+        "gitstats_started_at",
+        "gitstats_finished_at",
+        "gitstats_report_path",
+    ],
+}
+
+
+def _task(kind: str):
+    return analyze_repo_task if kind == "analysis" else analyze_repo_gitstats_task
+
+
+def reset_analysis_status(library: Library, kinds=KINDS):
+    if "analysis" in kinds:
+        library.analysis_status = Library.ANALYSIS_PENDING
+        library.analysis_task_id = None
+        library.analysis_error = None
+        library.analysis_started_at = None
+        library.analysis_finished_at = None
+        library.analysis_deferred = False
+
+    if "gitstats" in kinds:
+        library.gitstats_status = Library.GITSTATS_PENDING
+        library.gitstats_task_id = None
+        library.gitstats_error = None
+        library.gitstats_started_at = None
+        library.gitstats_finished_at = None
+        library.gitstats_report_path = None
+
+
+def reserve_analysis(libraries: list[Library]) -> list[list[str]]:
+    """
+    Reserve analysis and GitStats jobs for ``libraries`` against jobs already
+    in flight, and set each library's task IDs to the reserved ones. Returns,
+    per library, the kinds that need publishing; kinds missing from the list
+    are already running and have been attached to.
+    """
+    requests = [
+        (kind, library.library_ID, library.github_url, str(uuid4()))
+        for library in libraries
+        for kind in KINDS
+    ]
+    reserved = iter(coalesce.reserve_many(requests))
 
-    library.gitstats_status = Library.GITSTATS_PENDING
-    library.gitstats_task_id = None
-    library.gitstats_error = None
-    library.gitstats_started_at = None
-    library.gitstats_finished_at = None
-    library.gitstats_report_path = None
+    new_kinds = []
+    for library in libraries:
+        kinds = []
+        for kind in KINDS:
+            task_id, is_new = next(reserved)
+            if is_new:
+                reset_analysis_status(library, [kind])
+                kinds.append(kind)
+            setattr(library, f"{kind}_task_id", task_id)
+        new_kinds.append(kinds)
+    return new_kinds
 
-    library.save()
 
+def release_analysis(published: list[tuple[Library, list[str]]]):
+    """Drop the reservations of ``(library, kinds)`` jobs that were not published."""
+    coalesce.release_many(
+        [
+            (
+                kind,
+                library.library_ID,
+                library.github_url,
+                getattr(library, f"{kind}_task_id"),
+            )
+            for library, kinds in published
+            for kind in kinds
+        ]
+    )
+
+
+def analysis_signatures(library: Library, kinds=KINDS) -> list:
+    """
+    Build signatures for the ``kinds`` jobs of ``library`` using the task IDs
+    already set on it, so the IDs can be stored before anything is published.
+    """
+    plan = plan_library_analysis(library)
+    args = [str(library.library_ID), library.github_url]
+
+    return [
+        _task(kind).signature(
+            args=args, task_id=getattr(library, f"{kind}_task_id"), **plan[kind]
+        )
+        for kind in kinds
+    ]
+
+
+def _queued_entry(library: Library) -> dict:
+    return {
+        "library_id": str(library.library_ID),
+        "analysis_task_id": library.analysis_task_id,
+        "gitstats_task_id": library.gitstats_task_id,
+    }
+
+
+def enqueue_library_analysis(library: Library):
     if not library.github_url:
+        reset_analysis_status(library)
         library.analysis_status = Library.ANALYSIS_FAILED
-        library.analysis_error = "Library GitHub URL is missing."
-        library.save(update_fields=["analysis_status", "analysis_error"])
+        library.analysis_error = MISSING_GITHUB_URL_ERROR
+        library.save()
         return None
 
-    a = analyze_repo_task.delay(str(library.library_ID), library.github_url)
-    g = analyze_repo_gitstats_task.apply_async(
-        args=[str(library.library_ID), library.github_url],
-        queue="gitstats",
+    (kinds,) = reserve_analysis([library])
+    if not kinds:
+        return {
+            "analysis_task_id": library.analysis_task_id,
+            "gitstats_task_id": library.gitstats_task_id,
+        }
+
+    library.save(update_fields=[f for kind in kinds for f in STATUS_FIELDS[kind]])
+
+    plan = plan_library_analysis(library)
+    args = [str(library.library_ID), library.github_url]
+
+    try:
+        for kind in kinds:
+            result = _task(kind).apply_async(
+                args=args, task_id=getattr(library, f"{kind}_task_id"), **plan[kind]
+            )
+            setattr(library, f"{kind}_task_id", result.id)
+    except Exception:
+        release_analysis([(library, kinds)])
+        raise
+
+    library.save(update_fields=[f"{kind}_task_id" for kind in kinds])
+
+    return {
+        "analysis_task_id": library.analysis_task_id,
+        "gitstats_task_id": library.gitstats_task_id,
+    }
+
+
+def enqueue_domain_analysis(domain, max_in_flight: int | None = None) -> dict:
+    """
+    Queue analysis for every library of ``domain`` with one status
+    ``bulk_update`` per job kind and one Celery ``group`` publish. Jobs that
+    are already running for a library are attached to instead of re-queued.
+
+    With a ``max_in_flight`` cap (default ANALYSIS_DOMAIN_MAX_IN_FLIGHT) only
+    that many libraries are published; the rest stay pending without task
+    IDs and are picked up by ``dispatch_deferred_analysis`` as jobs finish,
+    or by ``dispatch_deferred_analysis_task`` if a worker dies first.
+    """
+    if max_in_flight is None:
+        max_in_flight = settings.ANALYSIS_DOMAIN_MAX_IN_FLIGHT
+
+    libraries = list(Library.objects.filter(domain=domain).order_by("library_name"))
+
+    to_queue, deferred, failed = [], [], []
+    updated = {kind: [] for kind in KINDS}
+
+    for library in libraries:
+        if not library.github_url:
+            reset_analysis_status(library)
+            library.analysis_status = Library.ANALYSIS_FAILED
+            library.analysis_error = MISSING_GITHUB_URL_ERROR
+            for kind in KINDS:
+                updated[kind].append(library)
+            failed.append(
+                {
+                    "library_id": str(library.library_ID),
+                    "error": MISSING_GITHUB_URL_ERROR,
+                }
+            )
+        elif max_in_flight and len(to_queue) >= max_in_flight:
+            reset_analysis_status(library)
+            library.analysis_deferred = True
+            for kind in KINDS:
+                updated[kind].append(library)
+            deferred.append(str(library.library_ID))
+        else:
+            to_queue.append(library)
+
+    signatures, published = [], []
+    for library, kinds in zip(to_queue, reserve_analysis(to_queue)):
+        for kind in kinds:
+            updated[kind].append(library)
+        if kinds:
+            signatures.extend(analysis_signatures(library, kinds))
+            published.append((library, kinds))
+
+    for kind in KINDS:
+        Library.objects.bulk_update(updated[kind], STATUS_FIELDS[kind], batch_size=500)
+
+    queued = to_queue
+    if signatures:
+        try:
+            group(signatures).apply_async()
+        except Exception as e:
+            release_analysis(published)
+            failed_by_kind = {kind: [] for kind in KINDS}
+            for library, kinds in published:
+                for kind in kinds:
+                    setattr(library, f"{kind}_status", FAILED_STATUS[kind])
+                    setattr(library, f"{kind}_error", str(e))
+                    setattr(library, f"{kind}_task_id", None)
+                    failed_by_kind[kind].append(library)
+            for kind in KINDS:
+                Library.objects.bulk_update(
+                    failed_by_kind[kind],
+                    [f"{kind}_status", f"{kind}_error", f"{kind}_task_id"],
+                    batch_size=500,
+                )
+            failed.extend(
+                {"library_id": str(library.library_ID), "error": str(e)}
+                for library, _ in published
+            )
+            failed_ids = {id(library) for library, _ in published}
+            queued = [lib for lib in to_queue if id(lib) not in failed_ids]
+
+    return {
+        "queued": [_queued_entry(library) for library in queued],
+        "deferred": deferred,
+        "failed": failed,
+        "total": len(libraries),
+    }
+
+
+def _holds_slot(kind: str, now) -> Q:
+    """
+    A published job that is queued or running. A job still "running" past its
+    longest hard time limit died with its worker and no longer holds a slot.
+    """
+    _, hard_limit = time_limits(kind, None)
+    return Q(
+        **{
+            f"{kind}_task_id__isnull": False,
+            f"{kind}_status": getattr(Library, f"{kind.upper()}_PENDING"),
+        }
+    ) | Q(
+        Q(**{f"{kind}_started_at__isnull": True})
+        | Q(**{f"{kind}_started_at__gte": now - timedelta(seconds=hard_limit)}),
+        **{
+            f"{kind}_task_id__isnull": False,
+            f"{kind}_status": getattr(Library, f"{kind.upper()}_RUNNING"),
+        },
     )
 
-    library.analysis_task_id = a.id
-    library.gitstats_task_id = g.id
-    library.save(update_fields=["analysis_task_id", "gitstats_task_id"])
 
-    return {"analysis_task_id": a.id, "gitstats_task_id": g.id}
+def dispatch_deferred_analysis(domain_id, max_in_flight: int | None = None) -> list:
+    """
+    Top a capped domain back up to ``max_in_flight`` running libraries.
+    Each deferred library is claimed with a conditional UPDATE so two workers
+    finishing at the same time cannot publish the same library twice.
+    """
+    if max_in_flight is None:
+        max_in_flight = settings.ANALYSIS_DOMAIN_MAX_IN_FLIGHT
+    if not max_in_flight:
+        return []
+
+    now = timezone.now()
+    in_flight = (
+        Library.objects.filter(domain_id=domain_id)
+        .filter(_holds_slot("analysis", now) | _holds_slot("gitstats", now))
+        .count()
+    )
+    free_slots = max_in_flight - in_flight
+    if free_slots <= 0:
+        return []
+
+    candidates = list(
+        Library.objects.filter(
+            domain_id=domain_id,
+            analysis_deferred=True,
+            analysis_task_id__isnull=True,
+            gitstats_task_id__isnull=True,
+        )
+        .exclude(Q(github_url__isnull=True) | Q(github_url=""))
+        .order_by("library_name")[:free_slots]
+    )
+
+    dispatched, signatures, claimed_jobs = [], [], []
+    for library, kinds in zip(candidates, reserve_analysis(candidates)):
+        claimed = Library.objects.filter(
+            pk=library.pk, analysis_deferred=True, analysis_task_id__isnull=True
+        ).update(
+            analysis_deferred=False,
+            analysis_task_id=library.analysis_task_id,
+            gitstats_task_id=library.gitstats_task_id,
+        )
+        if not claimed:
+            release_analysis([(library, kinds)])
+            continue
+        signatures.extend(analysis_signatures(library, kinds))
+        claimed_jobs.append((library, kinds))
+        dispatched.append(_queued_entry(library))
+
+    if signatures:
+        try:
+            group(signatures).apply_async()
+        except Exception:
+            # Hand the libraries back to the next dispatch instead of leaving
+            # them with task IDs of jobs that were never published
+            release_analysis(claimed_jobs)
+            Library.objects.filter(
+                pk__in=[library.pk for library, _ in claimed_jobs]
+            ).update(
+                analysis_deferred=True, analysis_task_id=None, gitstats_task_id=None
+            )
+            raise
+
+    return dispatched
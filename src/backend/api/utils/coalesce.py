@@ -0,0 +1,123 @@
+import logging
+import time
+from contextlib import contextmanager
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .repos import repo_slug
+
+logger = logging.getLogger("api.utils.coalesce")
+
+LOCK_KEY = "analysis:inflight:lock"
+LOCK_TIMEOUT = 10
+LOCK_WAIT = 2.0
+
+
+def inflight_key(kind: str, library_id, repo_url: str) -> str:
+    return f"analysis:inflight:{kind}:{library_id}:{repo_slug(repo_url)}"
+
+
+@contextmanager
+def _mutex():
+    """
+    Serialise reservations and claims across web and worker processes with a
+    ``cache.add`` lock. If the lock cannot be taken in time we carry on
+    without it: the worst case is a duplicate job, which is what we had
+    before coalescing.
+    """
+    token = uuid4().hex
+    deadline = time.monotonic() + LOCK_WAIT
+    acquired = cache.add(LOCK_KEY, token, LOCK_TIMEOUT)
+    while not acquired and time.monotonic() < deadline:
+        time.sleep(0.02)
+        acquired = cache.add(LOCK_KEY, token, LOCK_TIMEOUT)
+
+    if not acquired:
+        logger.warning("Analysis coalescing lock is busy; continuing without it")
+
+    try:
+        yield
+    finally:
+        if acquired and cache.get(LOCK_KEY) == token:
+            cache.delete(LOCK_KEY)
+
+
+def reserve_many(requests: list[tuple]) -> list[tuple[str, bool]]:
+    """
+    Reserve ``(kind, library_id, repo_url, task_id)`` jobs. For each one
+    return ``(task_id, is_new)``: a job that is already running is reused
+    (``is_new`` False, nothing should be published), while one that is only
+    queued is superseded by the new ``task_id`` and will no-op when it starts.
+    """
+    keys = [inflight_key(kind, lib_id, url) for kind, lib_id, url, _ in requests]
+
+    with _mutex():
+        current = cache.get_many(keys)
+        results, reserved = [], {}
+        for key, (_, _, _, task_id) in zip(keys, requests):
+            entry = current.get(key)
+            if entry and entry["started"]:
+                results.append((entry["task_id"], False))
+            else:
+                reserved[key] = {"task_id": task_id, "started": False}
+                results.append((task_id, True))
+
+        if reserved:
+            cache.set_many(reserved, settings.ANALYSIS_COALESCE_TTL)
+
+    return results
+
+
+def reserve(kind: str, library_id, repo_url: str, task_id: str) -> tuple[str, bool]:
+    return reserve_many([(kind, library_id, repo_url, task_id)])[0]
+
+
+def claim(
+    kind: str, library_id, repo_url: str, task_id: str | None, timeout=None
+) -> bool:
+    """
+    Called by a task when it starts. Returns False when a newer request has
+    superseded this task (or another copy of it is already running), in which
+    case the task must exit without doing any work.
+    """
+    if not task_id:
+        return True
+
+    key = inflight_key(kind, library_id, repo_url)
+    with _mutex():
+        entry = cache.get(key)
+        if entry and entry["task_id"] != task_id:
+            return False
+        cache.set(
+            key,
+            {"task_id": task_id, "started": True},
+            timeout or settings.ANALYSIS_COALESCE_TTL,
+        )
+    return True
+
+
+def release_many(requests: list[tuple]):
+    """Drop reservations of ``(kind, library_id, repo_url, task_id)`` jobs."""
+    keys = {
+        inflight_key(kind, lib_id, url): task_id
+        for kind, lib_id, url, task_id in requests
+        if task_id
+    }
+    if not keys:
+        return
+
+    with _mutex():
+        current = cache.get_many(list(keys))
+        owned = [
+            key
+            for key, entry in current.items()
+            if entry and entry["task_id"] == keys[key]
+        ]
+        if owned:
+            cache.delete_many(owned)
+
+
+def release(kind: str, library_id, repo_url: str, task_id: str | None):
+    release_many([(kind, library_id, repo_url, task_id)])
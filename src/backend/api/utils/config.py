@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+import zlib
+from collections.abc import Mapping
+
+from django.conf import settings
+
+CONFIG_FILES = {
+    "rules": "rules.json",
+    "categories": "categories.json",
+    "auto_metrics": "auto_metrics.json",
+}
+
+
+class ConfigRegistry:
+    """
+    Process-wide cache of the JSON definition files under ``api/database``.
+
+    Each file is parsed once and re-read only when its path (BASE_DIR can
+    change, e.g. in tests), modification time or size changes, so a lookup
+    costs one ``os.stat``. Parsed data is shared between callers and must be
+    treated as read-only.
+
+    ``version(name)`` is a checksum of the file contents, so it is stable
+    across processes and can key shared caches as well as local ones.
+    """
+
+    def __init__(self, files: dict[str, str]):
+        self.files = files
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def path(self, name: str) -> str:
+        return os.path.join(settings.BASE_DIR, "api", "database", self.files[name])
+
+    def _entry(self, name: str) -> dict:
+        path = self.path(name)
+        st = os.stat(path)  # FileNotFoundError propagates to the caller
+        stamp = (path, st.st_mtime_ns, st.st_size)
+
+        entry = self._entries.get(name)
+        if entry is not None and entry["stamp"] == stamp:
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry["stamp"] != stamp:
+                with open(path, "rb") as f:
+                    raw = f.read()
+                entry = {
+                    "stamp": stamp,
+                    "data": json.loads(raw),
+                    "version": zlib.crc32(raw),
+                }
+                self._entries[name] = entry
+        return entry
+
+    def get(self, name: str):
+        """
+        Parsed contents of ``name``. Raises FileNotFoundError or
+        json.JSONDecodeError like reading the file directly would.
+        """
+        return self._entry(name)["data"]
+
+    def version(self, name: str | None = None) -> int:
+        """Checksum of one file, or of all of them when ``name`` is omitted."""
+        if name is not None:
+            return self._entry(name)["version"]
+
+        versions = []
+        for file_name in self.files:
+            try:
+                versions.append(self._entry(file_name)["version"])
+            except (OSError, ValueError):
+                versions.append(0)
+        return zlib.crc32(repr(versions).encode())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class LiveConfig(Mapping):
+    """Read-only mapping that always reflects the current contents of a file."""
+
+    def __init__(self, registry: ConfigRegistry, name: str):
+        self._registry = registry
+        self._name = name
+
+    def _data(self):
+        return self._registry.get(self._name)
+
+    def __getitem__(self, key):
+        return self._data()[key]
+
+    def __iter__(self):
+        return iter(self._data())
+
+    def __len__(self):
+        return len(self._data())
+
+    def __contains__(self, key):
+        return key in self._data()
+
+
+registry = ConfigRegistry(CONFIG_FILES)
+
+
+def load_config(name: str):
+    return registry.get(name)
+
+
+def config_version(name: str | None = None) -> int:
+    return registry.version(name)
+
+
+def load_categories() -> list[str]:
+    return load_config("categories").get("Categories", [])
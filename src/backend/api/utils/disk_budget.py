@@ -0,0 +1,302 @@
+import logging
+import os
+import shutil
+import time
+import uuid
+
+from django.conf import settings
+from django.utils import timezone
+
+from ..database.libraries.models import Library
+from ..database.library_metric_values.models import LibraryMetricValue
+from ..database.library_metric_values.signals import bump_domain_data
+
+logger = logging.getLogger("api.utils.disk_budget")
+
+EVICTED_REPORT_MESSAGE = (
+    "GitStats report was removed to free disk space. Re-run analysis to regenerate it."
+)
+
+
+def directory_size(path: str) -> int:
+    """Return the apparent size in bytes of everything under ``path``."""
+    total = 0
+    for root, _, files in os.walk(path, onerror=lambda e: None):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+def _library_dirs(root: str) -> dict[str, str]:
+    """
+    Map library IDs to their per-library directory under ``root``.
+    Anything that is not named after a library UUID is left alone.
+    """
+    if not os.path.isdir(root):
+        return {}
+
+    dirs = {}
+    for entry in os.scandir(root):
+        if not entry.is_dir(follow_symlinks=False):
+            continue
+        try:
+            library_id = str(uuid.UUID(entry.name))
+        except ValueError:
+            continue
+        dirs[library_id] = entry.path
+    return dirs
+
+
+def _report_last_viewed(report_dir: str) -> float:
+    """
+    Reports are served straight from disk by nginx, so the access time of the
+    report index is the only view signal we have. Mounts using relatime still
+    refresh it at least once a day, which is enough granularity for eviction.
+    """
+    index_path = os.path.join(report_dir, "git_stats", "index.html")
+    try:
+        st = os.stat(index_path)
+        return max(st.st_atime, st.st_mtime)
+    except OSError:
+        try:
+            return os.stat(report_dir).st_mtime
+        except OSError:
+            return 0.0
+
+
+def _remove(path: str, dry_run: bool):
+    if not dry_run:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _mark_reports_evicted(library_ids: list[str]):
+    if not library_ids:
+        return
+
+    Library.objects.filter(library_ID__in=library_ids).update(
+        gitstats_status=Library.GITSTATS_PENDING,
+        gitstats_report_path=None,
+        gitstats_report_bytes=0,
+        gitstats_error=EVICTED_REPORT_MESSAGE,
+        disk_usage_measured_at=timezone.now(),
+    )
+    LibraryMetricValue.objects.filter(
+        library_id__in=library_ids, metric__metric_key="gitstats_report"
+    ).update(value=None, **dict.fromkeys(LibraryMetricValue.DERIVED_FIELDS))
+    bump_domain_data(
+        Library.objects.filter(library_ID__in=library_ids).values_list(
+            "domain_id", flat=True
+        )
+    )
+
+
+def _gitstats_status(library_id: str) -> str | None:
+    return (
+        Library.objects.filter(library_ID=library_id)
+        .values_list("gitstats_status", flat=True)
+        .first()
+    )
+
+
+def sweep_orphaned_work_dirs(
+    libraries: dict[str, Library],
+    max_age_seconds: int,
+    grace_seconds: int,
+    dry_run: bool = False,
+) -> list[dict]:
+    """
+    Remove clone directories that no running GitStats task owns: the library
+    is gone, its GitStats run is no longer running, or it has been "running"
+    for longer than any task is allowed to live (the worker crashed).
+    Directories younger than ``grace_seconds`` are never "not running": their
+    job may have just claimed them and not yet marked itself as running.
+    """
+    now = time.time()
+    removed = []
+
+    for library_id, path in _library_dirs(settings.GITSTATS_WORK_DIR).items():
+        lib = libraries.get(library_id)
+        try:
+            age = now - os.stat(path).st_mtime
+        except OSError:
+            continue
+
+        if lib is None:
+            reason = "library_deleted"
+        elif lib.gitstats_status != Library.GITSTATS_RUNNING:
+            if age <= grace_seconds:
+                continue
+            reason = "not_running"
+        elif age > max_age_seconds:
+            reason = "stale"
+        else:
+            continue
+
+        # ``libraries`` was read before the walk; a job may have started since
+        if (
+            reason == "not_running"
+            and _gitstats_status(library_id) == Library.GITSTATS_RUNNING
+        ):
+            continue
+
+        size = directory_size(path)
+        _remove(path, dry_run)
+        removed.append({"library_id": library_id, "bytes": size, "reason": reason})
+
+    return removed
+
+
+def evict_deleted_library_reports(
+    report_dirs: dict[str, str], libraries: dict[str, Library], dry_run: bool = False
+) -> list[dict]:
+    evicted = []
+    for library_id in list(report_dirs):
+        if library_id in libraries:
+            continue
+        path = report_dirs.pop(library_id)
+        size = directory_size(path)
+        _remove(path, dry_run)
+        evicted.append(
+            {"library_id": library_id, "bytes": size, "reason": "library_deleted"}
+        )
+    return evicted
+
+
+def evict_least_recently_viewed_reports(
+    report_sizes: dict[str, int],
+    report_dirs: dict[str, str],
+    libraries: dict[str, Library],
+    max_bytes: int,
+    dry_run: bool = False,
+) -> list[dict]:
+    """
+    Evict whole reports, least recently viewed first, until the serve dir is
+    back under ``max_bytes``. Reports for libraries whose GitStats run is in
+    progress are never evicted.
+    """
+    total = sum(report_sizes.values())
+    if total <= max_bytes:
+        return []
+
+    candidates = sorted(
+        (
+            library_id
+            for library_id in report_dirs
+            if libraries[library_id].gitstats_status != Library.GITSTATS_RUNNING
+        ),
+        key=lambda library_id: _report_last_viewed(report_dirs[library_id]),
+    )
+
+    evicted = []
+    for library_id in candidates:
+        if total <= max_bytes:
+            break
+        size = report_sizes.pop(library_id, 0)
+        _remove(report_dirs.pop(library_id), dry_run)
+        total -= size
+        evicted.append({"library_id": library_id, "bytes": size, "reason": "lru"})
+
+    if not dry_run:
+        _mark_reports_evicted([e["library_id"] for e in evicted])
+
+    return evicted
+
+
+def record_disk_footprint(
+    libraries: dict[str, Library], report_sizes: dict[str, int]
+) -> int:
+    """Persist the measured report size of every library that has a report."""
+    now = timezone.now()
+    changed = []
+    for library_id, size in report_sizes.items():
+        lib = libraries[library_id]
+        lib.gitstats_report_bytes = size
+        lib.disk_usage_measured_at = now
+        changed.append(lib)
+
+    Library.objects.bulk_update(
+        changed,
+        ["gitstats_report_bytes", "disk_usage_measured_at"],
+        batch_size=500,
+    )
+    return len(changed)
+
+
+def enforce_disk_budget(dry_run: bool = False) -> dict:
+    """
+    Bring GITSTATS_WORK_DIR and GITSTATS_SERVE_DIR back under their budgets
+    and refresh the per-library disk footprint. Returns a summary suitable for
+    logging or printing from the management command.
+    """
+    libraries = {
+        str(lib.library_ID): lib
+        for lib in Library.objects.only(
+            "library_ID",
+            "gitstats_status",
+            "gitstats_report_bytes",
+            "disk_usage_measured_at",
+        )
+    }
+
+    swept = sweep_orphaned_work_dirs(
+        libraries,
+        settings.GITSTATS_ORPHAN_MAX_AGE,
+        settings.GITSTATS_ORPHAN_GRACE,
+        dry_run=dry_run,
+    )
+
+    report_dirs = _library_dirs(settings.GITSTATS_SERVE_DIR)
+    evicted = evict_deleted_library_reports(report_dirs, libraries, dry_run=dry_run)
+
+    report_sizes = {
+        library_id: directory_size(path) for library_id, path in report_dirs.items()
+    }
+    evicted += evict_least_recently_viewed_reports(
+        report_sizes,
+        report_dirs,
+        libraries,
+        settings.GITSTATS_SERVE_DIR_MAX_BYTES,
+        dry_run=dry_run,
+    )
+
+    recorded = 0
+    if not dry_run:
+        recorded = record_disk_footprint(libraries, report_sizes)
+
+    swept_ids = {s["library_id"] for s in swept}
+    work_bytes = sum(
+        directory_size(path)
+        for library_id, path in _library_dirs(settings.GITSTATS_WORK_DIR).items()
+        if library_id not in swept_ids
+    )
+    if work_bytes > settings.GITSTATS_WORK_DIR_MAX_BYTES:
+        logger.warning(
+            "GitStats work dir is over budget with only active clones left "
+            "(%d > %d bytes)",
+            work_bytes,
+            settings.GITSTATS_WORK_DIR_MAX_BYTES,
+        )
+
+    summary = {
+        "dry_run": dry_run,
+        "work_dirs_removed": swept,
+        "reports_evicted": evicted,
+        "work_dir_bytes": work_bytes,
+        "serve_dir_bytes": sum(report_sizes.values()),
+        "libraries_measured": recorded,
+    }
+
+    logger.info(
+        "GitStats disk budget enforced",
+        extra={
+            "dry_run": dry_run,
+            "work_dirs_removed": len(swept),
+            "reports_evicted": len(evicted),
+            "work_dir_bytes": summary["work_dir_bytes"],
+            "serve_dir_bytes": summary["serve_dir_bytes"],
+        },
+    )
+    return summary
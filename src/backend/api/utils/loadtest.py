@@ -0,0 +1,361 @@
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+# Fixed bucket edges (milliseconds) so histograms of different runs line up
+HISTOGRAM_EDGES_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+PERCENTILES = (50, 95, 99)
+
+DEFAULT_MIX = "comparison=4,dashboard=2,ahp=1,domains=2,login=1,me=1"
+
+
+def _comparison(ctx):
+    return "GET", f"/api/library_metric_values/comparison/{ctx.domain()}/", None
+
+
+def _comparison_page(ctx):
+    return (
+        "GET",
+        f"/api/library_metric_values/comparison/{ctx.domain()}/"
+        "?sort=library_name&order=desc&limit=50",
+        None,
+    )
+
+
+def _charts(ctx):
+    return "GET", f"/api/library_metric_values/charts/{ctx.domain()}/", None
+
+
+def _ahp(ctx):
+    return "GET", f"/api/library_metric_values/ahp/{ctx.domain()}/", None
+
+
+def _dashboard(ctx):
+    return "GET", f"/api/domain/{ctx.domain()}/dashboard/", None
+
+
+def _domains(ctx):
+    return "GET", "/api/domain/", None
+
+
+def _login(ctx):
+    return "POST", "/api/login/", {"login": ctx.login, "password": ctx.password}
+
+
+def _me(ctx):
+    return "GET", "/api/me/", None
+
+
+SCENARIOS = {
+    "comparison": _comparison,
+    "comparison_page": _comparison_page,
+    "charts": _charts,
+    "ahp": _ahp,
+    "dashboard": _dashboard,
+    "domains": _domains,
+    "login": _login,
+    "me": _me,
+}
+
+
+class LoadContext:
+    """What scenarios need to build a request: target domains and a user."""
+
+    def __init__(self, domain_ids, login=None, password=None, token=None, seed=0):
+        self.domain_ids = [str(d) for d in domain_ids]
+        self.login = login
+        self.password = password
+        self.token = token
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+    def domain(self):
+        return self.rng.choice(self.domain_ids)
+
+    def for_worker(self, index: int) -> "LoadContext":
+        ctx = LoadContext(
+            self.domain_ids, self.login, self.password, self.token, self.seed
+        )
+        ctx.rng = random.Random(f"{self.seed}:{index}")
+        return ctx
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    """``"comparison=4,ahp=1"`` as ``{"comparison": 4.0, "ahp": 1.0}``."""
+    mix = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(
+                f"Unknown scenario '{name}'; choose from {', '.join(SCENARIOS)}."
+            )
+        try:
+            mix[name] = float(weight or 1)
+        except ValueError:
+            raise ValueError(f"Weight of '{name}' must be a number.")
+        if mix[name] <= 0:
+            raise ValueError(f"Weight of '{name}' must be positive.")
+    if not mix:
+        raise ValueError("The request mix is empty.")
+    return mix
+
+
+def summarize(latencies_ms, statuses: dict, errors: int, elapsed: float) -> dict:
+    """Latency percentiles, fixed-bucket histogram and throughput of a run."""
+    values = np.asarray(latencies_ms, dtype=float)
+    counts = np.histogram(values, bins=[0, *HISTOGRAM_EDGES_MS, np.inf])[0]
+    summary = {
+        "requests": int(values.size),
+        "errors": errors,
+        "statuses": dict(sorted((str(k), v) for k, v in statuses.items())),
+        "throughput_rps": round(values.size / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": None,
+        "histogram": {
+            "edges_ms": HISTOGRAM_EDGES_MS,
+            "counts": [int(c) for c in counts],
+        },
+    }
+    if values.size:
+        summary["latency_ms"] = {
+            "mean": round(float(values.mean()), 3),
+            "min": round(float(values.min()), 3),
+            "max": round(float(values.max()), 3),
+            **{f"p{p}": round(float(np.percentile(values, p)), 3) for p in PERCENTILES},
+        }
+    return summary
+
+
+class _Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.statuses = {}
+        self.errors = {}
+
+    def add(self, name, latency_ms, status):
+        with self.lock:
+            self.latencies.setdefault(name, []).append(latency_ms)
+            statuses = self.statuses.setdefault(name, {})
+            statuses[status] = statuses.get(status, 0) + 1
+            if not isinstance(status, int) or status >= 400:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+
+def _worker(base, ctx, mix, stop_at, budget, recorder, headers):
+    names, weights = list(mix), list(mix.values())
+    conn = None
+    while time.monotonic() < stop_at and budget.take():
+        name = ctx.rng.choices(names, weights)[0]
+        method, path, body = SCENARIOS[name](ctx)
+        data = json.dumps(body).encode() if body is not None else None
+        request_headers = dict(headers)
+        if data is not None:
+            request_headers["Content-Type"] = "application/json"
+
+        started = time.perf_counter()
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection(base.hostname, base.port, timeout=60)
+            conn.request(method, base.path.rstrip("/") + path, data, request_headers)
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException) as e:
+            status = type(e).__name__
+            if conn is not None:
+                conn.close()
+            conn = None
+        recorder.add(name, (time.perf_counter() - started) * 1000, status)
+    if conn is not None:
+        conn.close()
+
+
+class _Budget:
+    """Shared request cap; unlimited when ``total`` is None."""
+
+    def __init__(self, total):
+        self.remaining = total
+        self.lock = threading.Lock()
+
+    def take(self) -> bool:
+        if self.remaining is None:
+            return True
+        with self.lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+
+def run_load(
+    base_url: str,
+    ctx: LoadContext,
+    mix: dict,
+    concurrency: int = 8,
+    duration: float = 30.0,
+    max_requests: int | None = None,
+    warmup: float = 0.0,
+) -> dict:
+    """
+    Drive ``mix`` against ``base_url`` from ``concurrency`` threads, each with
+    its own keep-alive connection, for ``duration`` seconds or until
+    ``max_requests`` have been sent. Requests made during ``warmup`` are not
+    recorded. Returns the overall and per-scenario summaries.
+    """
+    base = urlsplit(base_url)
+    headers = {"Accept": "application/json", "X-Forwarded-Proto": "https"}
+    if ctx.token:
+        headers["Authorization"] = f"Bearer {ctx.token}"
+
+    def run(seconds, budget, recorder, offset):
+        threads = [
+            threading.Thread(
+                target=_worker,
+                args=(
+                    base,
+                    ctx.for_worker(offset + i),
+                    mix,
+                    time.monotonic() + seconds,
+                    budget,
+                    recorder,
+                    headers,
+                ),
+                daemon=True,
+            )
+            for i in range(concurrency)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started
+
+    if warmup:
+        run(warmup, _Budget(None), _Recorder(), concurrency)
+
+    recorder = _Recorder()
+    elapsed = run(duration, _Budget(max_requests), recorder, 0)
+
+    endpoints = {
+        name: summarize(
+            recorder.latencies[name],
+            recorder.statuses[name],
+            recorder.errors.get(name, 0),
+            elapsed,
+        )
+        for name in sorted(recorder.latencies)
+    }
+    statuses = {}
+    for per_name in recorder.statuses.values():
+        for status, count in per_name.items():
+            statuses[status] = statuses.get(status, 0) + count
+    total = summarize(
+        [v for values in recorder.latencies.values() for v in values],
+        statuses,
+        sum(recorder.errors.values()),
+        elapsed,
+    )
+    return {"elapsed_s": round(elapsed, 3), "total": total, "endpoints": endpoints}
+
+
+def compare(baseline: dict, current: dict) -> list[dict]:
+    """
+    Per scenario (and ``total``), the change in throughput and latency
+    percentiles from ``baseline`` to ``current`` report. Positive latency
+    deltas are regressions.
+    """
+    rows = []
+    names = ["total"] + sorted(set(baseline["endpoints"]) | set(current["endpoints"]))
+    for name in names:
+        before = (
+            baseline["total"] if name == "total" else baseline["endpoints"].get(name)
+        )
+        after = current["total"] if name == "total" else current["endpoints"].get(name)
+        if (
+            not before
+            or not after
+            or not before["latency_ms"]
+            or not after["latency_ms"]
+        ):
+            continue
+        row = {
+            "name": name,
+            "throughput_rps": (before["throughput_rps"], after["throughput_rps"]),
+        }
+        for p in PERCENTILES:
+            old, new = before["latency_ms"][f"p{p}"], after["latency_ms"][f"p{p}"]
+            row[f"p{p}"] = (
+                old,
+                new,
+                round((new - old) / old * 100, 1) if old else None,
+            )
+        rows.append(row)
+    return rows
+
+
+def git_commit(cwd=None) -> str | None:
+    """The checked-out commit, recorded so reports can be told apart."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=cwd,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_server(base_url: str, timeout: float = 30.0):
+    base = urlsplit(base_url)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with socket.create_connection((base.hostname, base.port), timeout=1):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Server at {base_url} did not start.")
+            time.sleep(0.2)
+
+
+def start_server(port: int, workers: int = 2, threads: int = 4, cwd=None):
+    """
+    Boot the app under gunicorn on 127.0.0.1 with this process's settings
+    and database, as in production but without nginx.
+    """
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "DomainX.wsgi:application",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--workers",
+            str(workers),
+            "--threads",
+            str(threads),
+            "--log-level",
+            "warning",
+        ],
+        cwd=cwd,
+        env=os.environ.copy(),
+    )
@@ -0,0 +1,279 @@
+import json
+import logging
+import os
+import re
+import socket
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+logger = logging.getLogger("api.utils.profiling")
+
+PROFILE_ID = re.compile(r"^\d+-(request|task)-[0-9a-f]{12}$")
+
+
+def _frame_label(code) -> str:
+    # Folded stacks separate frames with ";"
+    path = code.co_filename.replace("\\", "/")
+    for marker in ("/site-packages/", "/backend/"):
+        if marker in path:
+            path = path.rsplit(marker, 1)[1]
+            break
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({path}:{code.co_firstlineno})".replace(";", ":")
+
+
+class Profile:
+    """Stack samples of one thread, kept as folded-stack counts."""
+
+    def __init__(self):
+        self.stacks = Counter()
+        self.samples = 0
+        self._labels = {}
+
+    def add(self, frame):
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = _frame_label(code)
+            frames.append(label)
+            frame = frame.f_back
+        frames.reverse()
+        self.stacks[";".join(frames)] += 1
+        self.samples += 1
+
+    def folded(self) -> str:
+        """Brendan Gregg's collapsed format, read by flamegraph.pl and speedscope."""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+
+class Sampler:
+    """
+    One background thread per process that snapshots the stacks of the
+    registered threads every ``interval`` seconds. It exits when nothing is
+    registered, so an idle process pays nothing.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._targets = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self, thread_id: int) -> Profile | None:
+        """Start sampling ``thread_id``; None if an outer profile already is."""
+        profile = Profile()
+        with self._lock:
+            if thread_id in self._targets:
+                return None
+            self._targets[thread_id] = profile
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="profiling-sampler", daemon=True
+                )
+                self._thread.start()
+        return profile
+
+    def stop(self, thread_id: int) -> Profile | None:
+        with self._lock:
+            return self._targets.pop(thread_id, None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._targets:
+                    self._thread = None
+                    return
+                # Sampled under the lock, so a profile stop() has handed back
+                # is never written to while its owner reads it
+                frames = sys._current_frames()
+                for thread_id, profile in self._targets.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        profile.add(frame)
+
+
+_sampler = {"pid": None, "sampler": None}
+_sampler_lock = threading.Lock()
+
+
+def get_sampler() -> Sampler:
+    # Threads do not survive a fork, so each Celery child builds its own
+    with _sampler_lock:
+        if _sampler["pid"] != os.getpid():
+            _sampler["sampler"] = Sampler(settings.PROFILING_INTERVAL_MS / 1000)
+            _sampler["pid"] = os.getpid()
+        return _sampler["sampler"]
+
+
+def save_profile(profile: Profile, kind: str, meta: dict) -> str:
+    """
+    Write ``profile`` as ``<id>.folded`` with its metadata in ``<id>.json``,
+    then drop the oldest profiles beyond PROFILING_MAX_PROFILES.
+    """
+    directory = settings.PROFILING_DIR
+    os.makedirs(directory, exist_ok=True)
+    profile_id = f"{time.time_ns() // 1000}-{kind}-{uuid.uuid4().hex[:12]}"
+    meta = {
+        "id": profile_id,
+        "kind": kind,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "host": socket.gethostname(),
+        "pid": os.getpid(),
+        "interval_ms": settings.PROFILING_INTERVAL_MS,
+        "samples": profile.samples,
+        **meta,
+    }
+    base = os.path.join(directory, profile_id)
+    for suffix, content in ((".folded", profile.folded()), (".json", json.dumps(meta))):
+        with open(f"{base}{suffix}.tmp", "w") as f:
+            f.write(content)
+        os.replace(f"{base}{suffix}.tmp", f"{base}{suffix}")
+    _trim(directory, settings.PROFILING_MAX_PROFILES)
+    return profile_id
+
+
+def _profile_ids(directory: str) -> list[str]:
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    # IDs start with a microsecond timestamp, so they sort oldest first
+    return sorted(
+        n[:-5] for n in names if n.endswith(".json") and PROFILE_ID.match(n[:-5])
+    )
+
+
+def _trim(directory: str, keep: int):
+    ids = _profile_ids(directory)
+    for profile_id in ids[: max(len(ids) - keep, 0)]:
+        for suffix in (".json", ".folded"):
+            try:
+                os.remove(os.path.join(directory, profile_id + suffix))
+            except FileNotFoundError:
+                # Another process trimmed it first
+                pass
+
+
+def list_profiles(kind: str | None = None) -> list[dict]:
+    """Metadata of the stored profiles, newest first."""
+    profiles = []
+    for profile_id in reversed(_profile_ids(settings.PROFILING_DIR)):
+        try:
+            with open(os.path.join(settings.PROFILING_DIR, profile_id + ".json")) as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            continue
+        if kind is None or meta.get("kind") == kind:
+            profiles.append(meta)
+    return profiles
+
+
+def profile_path(profile_id: str) -> str | None:
+    if not PROFILE_ID.match(profile_id):
+        return None
+    path = os.path.join(settings.PROFILING_DIR, profile_id + ".folded")
+    return path if os.path.exists(path) else None
+
+
+class ProfilingMiddleware:
+    """
+    Sample the stack of every request and keep the profile of those slower
+    than PROFILING_REQUEST_THRESHOLD_MS. Removed from the stack unless
+    PROFILING_ENABLED is set.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sampler = get_sampler()
+        thread_id = threading.get_ident()
+        if sampler.start(thread_id) is None:
+            return self.get_response(request)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profile = sampler.stop(thread_id)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        if duration_ms >= settings.PROFILING_REQUEST_THRESHOLD_MS and profile.samples:
+            match = getattr(request, "resolver_match", None)
+            user = getattr(request, "user", None)
+            try:
+                save_profile(
+                    profile,
+                    "request",
+                    {
+                        "name": match.view_name if match is not None else None,
+                        "method": request.method,
+                        "path": request.path,
+                        "status": response.status_code,
+                        "user_id": (
+                            str(user.pk) if user and user.is_authenticated else None
+                        ),
+                        "duration_ms": round(duration_ms, 1),
+                    },
+                )
+            except OSError:
+                logger.warning("Could not save the request profile", exc_info=True)
+        return response
+
+
+_task_profiles = {}
+
+
+def _task_prerun(task_id=None, **kwargs):
+    if not settings.PROFILING_ENABLED:
+        return
+    thread_id = threading.get_ident()
+    # Eager tasks run inside a request or task that is already sampled
+    if get_sampler().start(thread_id) is not None:
+        _task_profiles[task_id] = (thread_id, time.perf_counter())
+
+
+def _task_postrun(task_id=None, task=None, state=None, **kwargs):
+    entry = _task_profiles.pop(task_id, None)
+    if entry is None:
+        return
+    thread_id, started = entry
+    profile = get_sampler().stop(thread_id)
+    duration_s = time.perf_counter() - started
+    if not profile or not profile.samples:
+        return
+    if duration_s < settings.PROFILING_TASK_THRESHOLD_S:
+        return
+    try:
+        save_profile(
+            profile,
+            "task",
+            {
+                "name": task.name if task is not None else None,
+                "task_id": task_id,
+                "state": state,
+                "duration_ms": round(duration_s * 1000, 1),
+            },
+        )
+    except OSError:
+        logger.warning("Could not save the task profile", exc_info=True)
+
+
+def connect_celery_signals():
+    from celery.signals import task_postrun, task_prerun
+
+    task_prerun.connect(_task_prerun, weak=False)
+    task_postrun.connect(_task_postrun, weak=False)
@@ -0,0 +1,219 @@
+import glob
+import logging
+import os
+import time
+from contextlib import ExitStack, contextmanager
+
+from celery import current_app
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse, HttpResponseNotFound
+from kombu.exceptions import ChannelError
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector, mark_process_dead
+
+from .server_timing import QueryTimer
+
+logger = logging.getLogger("api.utils.prometheus")
+
+REQUEST_LATENCY = Histogram(
+    "domainx_http_request_duration_seconds",
+    "Request wall time by URL name",
+    ["method", "url_name", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+REQUEST_QUERIES = Histogram(
+    "domainx_http_db_queries",
+    "Database queries per request by URL name",
+    ["url_name"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+)
+REQUEST_DB_SECONDS = Counter(
+    "domainx_http_db_query_seconds",
+    "Time spent in database queries by URL name",
+    ["url_name"],
+)
+CACHE_REQUESTS = Counter(
+    "domainx_cache_requests",
+    "Lookups of application caches by result (hit or miss)",
+    ["cache", "result"],
+)
+TASK_DURATION = Histogram(
+    "domainx_celery_task_duration_seconds",
+    "Celery task run time by task name",
+    ["task"],
+    buckets=(0.1, 0.5, 1, 5, 15, 60, 300, 900, 1800, 3600, 7200, 14400, 28800),
+)
+TASKS = Counter(
+    "domainx_celery_tasks",
+    "Finished Celery tasks by task name and final state",
+    ["task", "state"],
+)
+CLONES_IN_FLIGHT = Gauge(
+    "domainx_clones_in_flight",
+    "Repository clones currently running",
+    multiprocess_mode="livesum",
+)
+
+
+def cache_lookup(cache: str, hit: bool):
+    if settings.PROMETHEUS_ENABLED:
+        CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+@contextmanager
+def track_clone():
+    """Count a running clone in CLONES_IN_FLIGHT when PROMETHEUS_ENABLED is set."""
+    if not settings.PROMETHEUS_ENABLED:
+        yield
+        return
+    with CLONES_IN_FLIGHT.track_inprogress():
+        yield
+
+
+def _multiprocess_root() -> str | None:
+    """
+    Directory holding the metric files of every process to aggregate. Each
+    service writes to its own PROMETHEUS_MULTIPROC_DIR (PIDs repeat across
+    containers); PROMETHEUS_MULTIPROC_ROOT is their shared parent.
+    """
+    return os.environ.get("PROMETHEUS_MULTIPROC_ROOT") or os.environ.get(
+        "PROMETHEUS_MULTIPROC_DIR"
+    )
+
+
+class _FilesCollector:
+    """Merge the multiprocess metric files of all services under ``root``."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def collect(self):
+        files = glob.glob(os.path.join(self.root, "**", "*.db"), recursive=True)
+        return MultiProcessCollector.merge(files, accumulate=True)
+
+
+class QueueDepthCollector:
+    """Messages waiting in each Celery queue, read from the broker at scrape time."""
+
+    def collect(self):
+        depth = GaugeMetricFamily(
+            "domainx_celery_queue_depth",
+            "Messages waiting in each Celery queue",
+            labels=["queue"],
+        )
+        try:
+            with current_app.connection_for_read() as conn:
+                conn.ensure_connection(max_retries=1)
+                channel = conn.default_channel
+                for queue in settings.CELERY_TASK_QUEUES:
+                    try:
+                        count = channel.queue_declare(
+                            queue=queue.name, passive=True
+                        ).message_count
+                    except ChannelError:
+                        # Never declared on this broker, so nothing waiting
+                        count = 0
+                    depth.add_metric([queue.name], count)
+        except Exception as e:
+            logger.warning("Could not read Celery queue depths: %s", e)
+            return
+        yield depth
+
+
+def scrape() -> bytes:
+    registry = CollectorRegistry()
+    root = _multiprocess_root()
+    registry.register(_FilesCollector(root) if root else REGISTRY)
+    registry.register(QueueDepthCollector())
+    return generate_latest(registry)
+
+
+def metrics_view(request):
+    """
+    Prometheus exposition of the web, worker and broker metrics. Not routed
+    through nginx; scrape the backend directly. With PROMETHEUS_METRICS_TOKEN
+    set, scrapers must send it as a bearer token.
+    """
+    if not settings.PROMETHEUS_ENABLED:
+        return HttpResponseNotFound()
+    token = settings.PROMETHEUS_METRICS_TOKEN
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return HttpResponse(status=401)
+    return HttpResponse(scrape(), content_type=CONTENT_TYPE_LATEST)
+
+
+def _url_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.view_name or f"/{match.route}"
+
+
+class PrometheusMiddleware:
+    """
+    Request latency and database query metrics per URL name. Removed from
+    the stack unless PROMETHEUS_ENABLED is set.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROMETHEUS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryTimer()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(queries))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        url_name = _url_name(request)
+        REQUEST_LATENCY.labels(
+            request.method, url_name, f"{response.status_code // 100}xx"
+        ).observe(elapsed)
+        REQUEST_QUERIES.labels(url_name).observe(queries.count)
+        REQUEST_DB_SECONDS.labels(url_name).inc(queries.ms / 1000)
+        return response
+
+
+_task_started = {}
+
+
+def _task_prerun(task_id=None, **kwargs):
+    if settings.PROMETHEUS_ENABLED:
+        _task_started[task_id] = time.perf_counter()
+
+
+def _task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if not settings.PROMETHEUS_ENABLED or task is None:
+        return
+    if started is not None:
+        TASK_DURATION.labels(task.name).observe(time.perf_counter() - started)
+    TASKS.labels(task.name, (state or "unknown").lower()).inc()
+
+
+def _process_shutdown(**kwargs):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        mark_process_dead(os.getpid())
+
+
+def connect_celery_signals():
+    from celery.signals import task_postrun, task_prerun, worker_process_shutdown
+
+    task_prerun.connect(_task_prerun, weak=False)
+    task_postrun.connect(_task_postrun, weak=False)
+    worker_process_shutdown.connect(_process_shutdown, weak=False)
@@ -0,0 +1,512 @@
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import numpy as np
+
+from ..database.services import RepoAnalyzer
+from ..services import github_http
+from .disk_budget import directory_size
+
+# commits, files and lines per file of each fixture repository
+FIXTURE_SIZES = {
+    "small": (50, 20, 40),
+    "medium": (500, 200, 60),
+    "large": (5000, 2000, 80),
+}
+
+# RepoAnalyzer methods timed as stages, in pipeline order
+STAGE_METHODS = {
+    "api": "_get_github_api_metrics",
+    "clone": "_clone_repo_to_tempdir",
+    "scc": "_run_scc",
+    "gitstats_clone": "_clone_repo_to_dir",
+    "gitstats": "_run_gitstats",
+}
+
+FIXTURE_OWNER = "benchmark"
+HISTORY_DAYS = 8 * 365
+WORDS = ["alpha", "beta", "gamma", "delta", "value", "index", "count", "state"]
+
+
+def _source_file(rng: random.Random, lines: int) -> bytes:
+    out = []
+    for i in range(lines):
+        kind = i % 8
+        if kind == 0:
+            out.append(f"# {' '.join(rng.sample(WORDS, 3))}")
+        elif kind == 7:
+            out.append("")
+        else:
+            a, b = rng.sample(WORDS, 2)
+            out.append(f"{a}_{i} = {b}_{i - 1} if {rng.randrange(100)} else {i}")
+    return ("\n".join(out) + "\n").encode()
+
+
+def build_fixture_repo(
+    root: str, name: str, commits: int, files: int, lines: int, seed: int = 0
+) -> dict:
+    """
+    Write a bare repository at ``root/<owner>/<name>.git`` with ``commits``
+    commits over the last eight years touching ``files`` source files (and
+    a few binary ones), plus a handful of branches. Uses git fast-import,
+    so even the large fixture builds in seconds. Returns what the fake
+    GitHub server needs to answer for it.
+    """
+    rng = random.Random(f"{seed}:{name}")
+    path = os.path.join(root, FIXTURE_OWNER, f"{name}.git")
+    os.makedirs(path)
+    subprocess.run(
+        ["git", "init", "--quiet", "--bare", "--initial-branch=main", path],
+        check=True,
+    )
+
+    paths = [
+        (f"assets/image_{i}.png" if i % 10 == 9 else f"src/pkg_{i % 16}/module_{i}.py")
+        for i in range(files)
+    ]
+
+    def blob(file_path):
+        if file_path.endswith(".png"):
+            return b"\x89PNG\r\n\x1a\n" + rng.randbytes(512)
+        return _source_file(rng, lines + rng.randrange(lines))
+
+    now = int(time.time())
+    start = now - HISTORY_DAYS * 86400
+    step = (now - start) // max(commits, 1)
+    commit_times = [start + i * step for i in range(commits)]
+
+    stream = []
+    for n, at in enumerate(commit_times, start=1):
+        message = f"Change {n}".encode()
+        stream.append(
+            b"commit refs/heads/main\nmark :%d\n"
+            b"committer Bench <bench@example.com> %d +0000\n"
+            b"data %d\n%s\n" % (n, at, len(message), message)
+        )
+        if n > 1:
+            stream.append(b"from :%d\n" % (n - 1))
+        changed = paths if n == 1 else rng.sample(paths, min(3, len(paths)))
+        for file_path in changed:
+            content = blob(file_path)
+            stream.append(
+                b"M 100644 inline %s\ndata %d\n%s\n"
+                % (file_path.encode(), len(content), content)
+            )
+    branches = ["main"]
+    for b in range(min(5, commits)):
+        branches.append(f"feature-{b}")
+        stream.append(
+            b"reset refs/heads/feature-%d\nfrom :%d\n\n"
+            % (b, rng.randrange(commits) + 1)
+        )
+    subprocess.run(
+        ["git", "fast-import", "--quiet"],
+        input=b"".join(stream),
+        cwd=path,
+        check=True,
+    )
+
+    dirs = sorted({os.path.dirname(p) for p in paths} | {"src", "assets"})
+    return {
+        "owner": FIXTURE_OWNER,
+        "name": name,
+        "path": path,
+        "default_branch": "main",
+        "commit_times": commit_times,
+        "branches": branches,
+        "tree": [{"path": d, "type": "tree"} for d in dirs]
+        + [{"path": p, "type": "blob"} for p in paths],
+        "size_kb": directory_size(path) // 1024,
+        "files": files,
+    }
+
+
+def _parse_github_time(value: str) -> int:
+    return int(
+        datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ")
+        .replace(tzinfo=timezone.utc)
+        .timestamp()
+    )
+
+
+class FakeGitHub:
+    """
+    A local stand-in for the GitHub REST, search and GraphQL endpoints
+    RepoAnalyzer uses, answering from fixture repository metadata. Every
+    response waits ``latency_ms``; each resource (core, search, graphql)
+    allows ``rate_limit`` requests per ``rate_window`` seconds and then
+    answers 403 with GitHub's rate-limit headers until the window resets.
+    """
+
+    def __init__(self, repos=(), latency_ms=0.0, rate_limit=None, rate_window=60.0):
+        self.repos = {(r["owner"], r["name"]): r for r in repos}
+        self.latency_ms = latency_ms
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.rate_limited = 0
+        self._windows = {}
+        self._httpd = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _handler(self))
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def take(self, resource: str):
+        """Count a request; return its rate-limit headers and whether it's allowed."""
+        with self.lock:
+            self.requests += 1
+            if self.rate_limit is None:
+                return {}, True
+            now = time.monotonic()
+            started, used = self._windows.get(resource, (now, 0))
+            if now - started >= self.rate_window:
+                started, used = now, 0
+            reset = int(time.time() + self.rate_window - (now - started))
+            headers = {
+                "X-RateLimit-Limit": str(self.rate_limit),
+                "X-RateLimit-Resource": resource,
+                "X-RateLimit-Reset": str(reset),
+            }
+            if used >= self.rate_limit:
+                self.rate_limited += 1
+                headers["X-RateLimit-Remaining"] = "0"
+                return headers, False
+            self._windows[resource] = (started, used + 1)
+            headers["X-RateLimit-Remaining"] = str(self.rate_limit - used - 1)
+            return headers, True
+
+    def answer(self, method: str, path: str, query: dict, body) -> tuple:
+        """Status, JSON payload and extra headers for one API call."""
+        if method == "POST" and path == "/graphql":
+            return self._graphql(body or {})
+        if path == "/search/issues":
+            return self._search(query.get("q", [""])[0])
+
+        match = re.fullmatch(r"/repos/([^/]+)/([^/]+)(/.*)?", path)
+        repo = match and self.repos.get((match[1], match[2]))
+        if repo is None:
+            return 404, {"message": "Not Found"}, {}
+        rest = match[3] or ""
+
+        if rest == "":
+            return (
+                200,
+                {
+                    "full_name": f"{repo['owner']}/{repo['name']}",
+                    "default_branch": repo["default_branch"],
+                    "size": repo["size_kb"],
+                    "stargazers_count": len(repo["commit_times"]) * 3,
+                    "forks_count": len(repo["commit_times"]) // 4,
+                    "subscribers_count": len(repo["commit_times"]) // 10,
+                },
+                {},
+            )
+        if rest == f"/git/trees/{repo['default_branch']}":
+            return 200, {"sha": "0" * 40, "tree": repo["tree"], "truncated": False}, {}
+        if rest == "/commits":
+            times = repo["commit_times"]
+            if "since" in query:
+                since = _parse_github_time(query["since"][0])
+                times = [t for t in times if t >= since]
+            return self._paged(path, query, [{"sha": str(t)} for t in times])
+        if rest == "/branches":
+            return self._paged(path, query, [{"name": b} for b in repo["branches"]])
+        return 404, {"message": "Not Found"}, {}
+
+    def _paged(self, path, query, items):
+        per_page = int(query.get("per_page", ["30"])[0])
+        page = int(query.get("page", ["1"])[0])
+        last = max(1, -(-len(items) // per_page))
+        headers = {}
+        if last > 1:
+            params = {k: v[0] for k, v in query.items()}
+            links = []
+            if page < last:
+                links.append((page + 1, "next"))
+            links.append((last, "last"))
+            headers["Link"] = ", ".join(
+                f'<{self.url}{path}?{urlencode({**params, "page": p})}>; rel="{rel}"'
+                for p, rel in links
+            )
+        return 200, items[(page - 1) * per_page : page * per_page], headers
+
+    def _counts(self, repo) -> dict:
+        commits = len(repo["commit_times"])
+        return {
+            ("issue", "open"): commits // 10,
+            ("issue", "closed"): commits // 3,
+            ("pr", "open"): commits // 20,
+            ("pr", "closed"): commits // 2,
+        }
+
+    def _search(self, q: str):
+        words = q.split()
+        full_name = next((w[5:] for w in words if w.startswith("repo:")), "")
+        repo = self.repos.get(tuple(full_name.partition("/")[::2]))
+        if repo is None:
+            return 422, {"message": "Validation Failed"}, {}
+        kind = "pr" if "is:pr" in words else "issue"
+        state = "closed" if "is:closed" in words else "open"
+        total = self._counts(repo)[(kind, state)]
+        return 200, {"total_count": total, "incomplete_results": False, "items": []}, {}
+
+    def _graphql(self, body: dict):
+        variables = body.get("variables") or {}
+        repo = self.repos.get((variables.get("owner"), variables.get("name")))
+        if repo is None:
+            return 200, {"data": {"repository": None}}, {}
+        counts = self._counts(repo)
+        return (
+            200,
+            {
+                "data": {
+                    "repository": {
+                        "stargazerCount": len(repo["commit_times"]) * 3,
+                        "forkCount": len(repo["commit_times"]) // 4,
+                        "defaultBranchRef": {
+                            "name": repo["default_branch"],
+                            "target": {
+                                "history": {"totalCount": len(repo["commit_times"])}
+                            },
+                        },
+                        "refs": {"totalCount": len(repo["branches"])},
+                        "openIssues": {"totalCount": counts[("issue", "open")]},
+                        "openPullRequests": {"totalCount": counts[("pr", "open")]},
+                        "closedPullRequests": {"totalCount": counts[("pr", "closed")]},
+                    }
+                }
+            },
+            {},
+        )
+
+
+def _handler(server: FakeGitHub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _respond(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            split = urlsplit(self.path)
+            if split.path == "/graphql":
+                resource = "graphql"
+            elif split.path.startswith("/search/"):
+                resource = "search"
+            else:
+                resource = "core"
+
+            if server.latency_ms:
+                time.sleep(server.latency_ms / 1000)
+            limit_headers, allowed = server.take(resource)
+            if not allowed:
+                status, payload, headers = (
+                    403,
+                    {"message": "API rate limit exceeded"},
+                    {},
+                )
+            else:
+                try:
+                    body = json.loads(raw) if raw else None
+                except ValueError:
+                    body = None
+                status, payload, headers = server.answer(
+                    self.command, split.path, parse_qs(split.query), body
+                )
+
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in {**limit_headers, **headers}.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_GET = do_POST = _respond
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+@contextmanager
+def pointed_at(server: FakeGitHub, repos_root: str):
+    """
+    Send RepoAnalyzer's API calls to ``server`` with a dummy token, and its
+    clones to the fixture repositories under ``repos_root``.
+    """
+    saved_base, saved_clone = github_http.API_BASE, RepoAnalyzer.clone_base
+    saved_env = {
+        k: os.environ.get(k)
+        for k in ("GITHUB_TOKEN", "GITHUB_APP_ID", "GITHUB_APP_PRIVATE_KEY_PATH")
+    }
+    github_http.API_BASE = server.url
+    RepoAnalyzer.clone_base = f"file://{os.path.abspath(repos_root)}"
+    os.environ["GITHUB_TOKEN"] = "benchmark"
+    os.environ.pop("GITHUB_APP_ID", None)
+    os.environ.pop("GITHUB_APP_PRIVATE_KEY_PATH", None)
+    try:
+        yield
+    finally:
+        github_http.API_BASE, RepoAnalyzer.clone_base = saved_base, saved_clone
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def _timed(stage, method, timings):
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        except Exception as e:
+            timings.setdefault(stage, {})["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            timings.setdefault(stage, {})["ms"] = (time.perf_counter() - started) * 1000
+
+    return wrapper
+
+
+def time_stages(github_url: str, work_dir: str) -> dict:
+    """
+    Run RepoAnalyzer's analysis and GitStats pipelines for ``github_url``
+    as the Celery tasks do, timing each stage. A failing stage (a missing
+    tool, a rate limit) is recorded and ends its pipeline, as in production.
+    """
+    timings = {}
+    analyzer = RepoAnalyzer(github_url)
+    for stage, name in STAGE_METHODS.items():
+        setattr(analyzer, name, _timed(stage, getattr(analyzer, name), timings))
+
+    metrics = None
+    try:
+        metrics = analyzer.run_analysis_and_get_data()["metric_data"]
+    except Exception:
+        pass
+    try:
+        analyzer.run_gitstats_only(
+            os.path.join(work_dir, "work"),
+            os.path.join(work_dir, "serve"),
+            library_id="benchmark",
+        )
+    except Exception:
+        pass
+    finally:
+        shutil.rmtree(os.path.join(work_dir, "serve"), ignore_errors=True)
+    return {"stages": timings, "metrics": metrics}
+
+
+def _stage_summary(runs: list[dict]) -> dict:
+    summary = {}
+    for stage in STAGE_METHODS:
+        seen = [r[stage] for r in runs if stage in r]
+        if not seen:
+            continue
+        ms = np.asarray([r["ms"] for r in seen])
+        errors = [r["error"] for r in seen if "error" in r]
+        summary[stage] = {
+            "runs": len(seen),
+            "errors": len(errors),
+            "mean_ms": round(float(ms.mean()), 3),
+            "min_ms": round(float(ms.min()), 3),
+            "max_ms": round(float(ms.max()), 3),
+            "last_error": errors[-1] if errors else None,
+        }
+    return summary
+
+
+def run_benchmark(
+    sizes=("small", "medium"),
+    repeat: int = 3,
+    latency_ms: float = 0.0,
+    rate_limit: int | None = None,
+    rate_window: float = 60.0,
+    seed: int = 0,
+    stdout=None,
+) -> dict:
+    """
+    Build a fixture repository per size, serve them from a FakeGitHub and
+    time ``repeat`` RepoAnalyzer runs against each. Returns per-size stage
+    timings, the fixture shape, the API traffic and the computed metrics.
+    """
+    root = tempfile.mkdtemp(prefix="domainx_bench_")
+    try:
+        fixtures = {}
+        for size in sizes:
+            started = time.perf_counter()
+            fixtures[size] = build_fixture_repo(
+                os.path.join(root, "repos"), size, *FIXTURE_SIZES[size], seed=seed
+            )
+            if stdout is not None:
+                stdout.write(
+                    f"  built {size} fixture in {time.perf_counter() - started:.1f}s"
+                )
+
+        results = {}
+        with (
+            FakeGitHub(
+                fixtures.values(), latency_ms, rate_limit, rate_window
+            ) as server,
+            pointed_at(server, os.path.join(root, "repos")),
+        ):
+            for size, fixture in fixtures.items():
+                requests_before, limited_before = server.requests, server.rate_limited
+                runs, metrics = [], None
+                for _ in range(repeat):
+                    run = time_stages(
+                        f"https://github.com/{fixture['owner']}/{fixture['name']}",
+                        os.path.join(root, "work"),
+                    )
+                    runs.append(run["stages"])
+                    metrics = run["metrics"] or metrics
+                results[size] = {
+                    "fixture": {
+                        "commits": len(fixture["commit_times"]),
+                        "files": fixture["files"],
+                        "branches": len(fixture["branches"]),
+                        "size_kb": fixture["size_kb"],
+                    },
+                    "stages": _stage_summary(runs),
+                    "api_requests": server.requests - requests_before,
+                    "rate_limited": server.rate_limited - limited_before,
+                    "metrics": metrics,
+                }
+        return results
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
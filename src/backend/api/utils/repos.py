@@ -0,0 +1,25 @@
+from urllib.parse import urlparse
+
+
+def repo_slug(url: str) -> str:
+    """
+    Normalised ``owner/repo`` for a GitHub URL, so that
+    ``https://github.com/Org/Repo.git`` and ``github.com/org/repo/`` name the
+    same repository. Anything that does not look like a repository URL falls
+    back to the stripped, lower-cased input.
+    """
+    raw = (url or "").strip()
+    if raw.startswith("git@") and ":" in raw:
+        path = raw.split(":", 1)[1]
+    else:
+        parsed = urlparse(raw if "://" in raw else f"https://{raw}")
+        path = parsed.path
+
+    parts = [p for p in path.strip("/").split("/") if p]
+    if len(parts) < 2:
+        return raw.lower().rstrip("/")
+
+    owner, repo = parts[0], parts[1]
+    if repo.endswith(".git"):
+        repo = repo[: -len(".git")]
+    return f"{owner}/{repo}".lower()
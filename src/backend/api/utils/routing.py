@@ -0,0 +1,60 @@
+from django.conf import settings
+
+from ..database.libraries.models import Library
+
+LIGHT = "light"
+HEAVY = "heavy"
+
+GB = 1024**3
+
+
+def estimated_repo_bytes(library: Library) -> int | None:
+    """
+    Best known size of the library's repository. The size of the last clone
+    is the most accurate signal; GitHub's ``size`` metadata is the fallback.
+    """
+    if library.repo_clone_bytes:
+        return library.repo_clone_bytes
+    if library.repo_size_kb is not None:
+        return library.repo_size_kb * 1024
+    return None
+
+
+def size_tier(size_bytes: int | None) -> str:
+    if size_bytes is None:
+        return settings.ANALYSIS_UNKNOWN_SIZE_TIER
+    if size_bytes >= settings.ANALYSIS_HEAVY_REPO_BYTES:
+        return HEAVY
+    return LIGHT
+
+
+def time_limits(kind: str, size_bytes: int | None) -> tuple[int, int]:
+    """Return ``(soft_time_limit, time_limit)`` in seconds for a job."""
+    limits = settings.ANALYSIS_TIME_LIMITS[kind]
+    if size_bytes is None:
+        soft = limits["max"]
+    else:
+        soft = min(
+            limits["max"], int(limits["base"] + limits["per_gb"] * size_bytes / GB)
+        )
+    return soft, soft + settings.ANALYSIS_HARD_TIME_LIMIT_GRACE
+
+
+def plan_library_analysis(library: Library) -> dict:
+    """
+    Decide where and for how long each analysis job of ``library`` may run.
+    The ``analysis``/``gitstats`` entries are ``apply_async`` options.
+    """
+    size_bytes = estimated_repo_bytes(library)
+    tier = size_tier(size_bytes)
+    queues = settings.ANALYSIS_TIER_QUEUES[tier]
+
+    plan = {"tier": tier, "size_bytes": size_bytes}
+    for kind in ("analysis", "gitstats"):
+        soft, hard = time_limits(kind, size_bytes)
+        plan[kind] = {
+            "queue": queues[kind],
+            "soft_time_limit": soft,
+            "time_limit": hard,
+        }
+    return plan
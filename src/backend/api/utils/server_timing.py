@@ -0,0 +1,177 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.renderers import JSONRenderer
+
+from . import timing
+
+# Bucket upper bounds (milliseconds); the last bucket counts everything slower
+EDGES_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+PERCENTILES = (50, 95, 99)
+SLOT_SECONDS = 60
+
+
+class _Slot:
+    __slots__ = ("start", "counts", "count", "total_ms", "queries", "db_ms")
+
+    def __init__(self, start):
+        self.start = start
+        self.counts = [0] * (len(EDGES_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.queries = 0
+        self.db_ms = 0.0
+
+
+class RollingHistogram:
+    """
+    Request latencies of one endpoint over the last ``window`` seconds, kept
+    as one bucket array per minute so old minutes simply drop off.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.slots = deque()
+
+    def observe(self, ms: float, queries: int, db_ms: float, now: float):
+        start = now - now % SLOT_SECONDS
+        if not self.slots or self.slots[-1].start != start:
+            self.slots.append(_Slot(start))
+            self._expire(now)
+        slot = self.slots[-1]
+        slot.counts[bisect_left(EDGES_MS, ms)] += 1
+        slot.count += 1
+        slot.total_ms += ms
+        slot.queries += queries
+        slot.db_ms += db_ms
+
+    def _expire(self, now: float):
+        while self.slots and self.slots[0].start + SLOT_SECONDS <= now - self.window:
+            self.slots.popleft()
+
+    def snapshot(self, now: float) -> dict | None:
+        self._expire(now)
+        count = sum(s.count for s in self.slots)
+        if not count:
+            return None
+        counts = [sum(column) for column in zip(*(s.counts for s in self.slots))]
+        summary = {
+            "count": count,
+            "mean_ms": round(sum(s.total_ms for s in self.slots) / count, 3),
+            "mean_queries": round(sum(s.queries for s in self.slots) / count, 2),
+            "mean_db_ms": round(sum(s.db_ms for s in self.slots) / count, 3),
+            "histogram": {"edges_ms": EDGES_MS, "counts": counts},
+        }
+        for p in PERCENTILES:
+            # Upper bound of the bucket holding the percentile; None past the
+            # last edge
+            rank, seen = count * p / 100, 0
+            for i, c in enumerate(counts):
+                seen += c
+                if seen >= rank:
+                    summary[f"p{p}_ms"] = EDGES_MS[i] if i < len(EDGES_MS) else None
+                    break
+        return summary
+
+
+_histograms = {}
+_lock = threading.Lock()
+
+
+def observe(endpoint: str, ms: float, queries: int, db_ms: float):
+    now = time.monotonic()
+    with _lock:
+        histogram = _histograms.get(endpoint)
+        if histogram is None:
+            histogram = _histograms[endpoint] = RollingHistogram(
+                settings.SERVER_TIMING_WINDOW
+            )
+        histogram.observe(ms, queries, db_ms, now)
+
+
+def endpoint_stats() -> list[dict]:
+    """This process's rolling per-endpoint latency summaries, busiest first."""
+    now = time.monotonic()
+    with _lock:
+        snapshots = [(name, h.snapshot(now)) for name, h in _histograms.items()]
+    stats = [{"endpoint": name, **s} for name, s in snapshots if s is not None]
+    return sorted(stats, key=lambda s: (-s["count"], s["endpoint"]))
+
+
+class QueryTimer:
+    """Database execute wrapper counting queries and their time in ms."""
+
+    def __init__(self):
+        self.count = 0
+        self.ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.ms += (time.perf_counter() - started) * 1000
+
+
+def _endpoint(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    route = f"/{match.route}" if match is not None else "unmatched"
+    return f"{request.method} {route}"
+
+
+class ServerTimingMiddleware:
+    """
+    Time every request and report it in a ``Server-Timing`` header: ``db``
+    (query time, with the query count), ``render`` (JSON rendering), ``app``
+    (the rest of the Python work) and ``total``, plus any api.utils.timing
+    stages the view recorded. Also feeds the per-endpoint rolling histograms
+    behind endpoint_stats(). Removed from the stack unless
+    SERVER_TIMING_ENABLED is set.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryTimer()
+        started = time.perf_counter()
+        with timing.recording() as recorder, ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(queries))
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - started) * 1000
+
+        render_ms = recorder.stages.get("render", {}).get("ms", 0.0)
+        parts = [f'db;dur={queries.ms:.1f};desc="{queries.count} queries"']
+        parts.extend(
+            f"{name};dur={entry['ms']:.1f}" for name, entry in recorder.stages.items()
+        )
+        app_ms = max(total_ms - queries.ms - render_ms, 0.0)
+        parts.append(f"app;dur={app_ms:.1f}")
+        parts.append(f"total;dur={total_ms:.1f}")
+        response["Server-Timing"] = ", ".join(parts)
+
+        origin = request.headers.get("Origin")
+        if origin and origin in getattr(settings, "CORS_ALLOWED_ORIGINS", ()):
+            # Lets the frontend read the timings through the Resource Timing API
+            response["Timing-Allow-Origin"] = origin
+
+        observe(_endpoint(request), total_ms, queries.count, queries.ms)
+        return response
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """JSONRenderer that reports its time as the ``render`` stage."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timing.stage("render"):
+            return super().render(data, accepted_media_type, renderer_context)
@@ -0,0 +1,271 @@
+import random
+import uuid
+from contextlib import contextmanager, nullcontext
+from datetime import date, timedelta
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from ..database.domain.models import Domain
+from ..database.libraries.models import Library
+from ..database.library_metric_values.models import LibraryMetricValue
+from ..database.library_metric_values.scores import (
+    load_rules,
+    scoring_version,
+    value_score,
+)
+from ..database.library_metric_values.signals import bump_domain_data
+from ..database.library_metric_values.typed import typed_values
+from ..database.metrics.models import Metric
+from ..database.metrics.signals import METRIC_DEFINITIONS
+from .config import load_categories
+from .versions import bump_version
+
+# Metrics without an option category, mixed in with the rules.json ones
+FREE_VALUE_TYPES = ["int", "float", "text", "date"]
+WORDS = ["fast", "stable", "tiny", "modular", "typed", "async", "legacy", "pure"]
+LANGUAGES = ["Python", "C++", "Rust", "Julia", "Fortran", "R", "Go", "Java"]
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def metric_templates(rules_data: dict) -> list[dict]:
+    """
+    One metric template per rule in rules.json, plus free-valued ones. Rules
+    with options score their options with the rule's points, which also
+    become the metric's scoring_dict.
+    """
+    templates = []
+    for value_type, option_categories in rules_data.items():
+        for option_category, definition in option_categories.items():
+            for rule, points in definition.get("templates", {}).items():
+                templates.append(
+                    {
+                        "value_type": value_type,
+                        "option_category": option_category,
+                        "rule": rule,
+                        # Some templates score only part of the category's
+                        # options; values must stay within the scoring_dict
+                        "options": list(points) or definition.get("options") or [],
+                        "scoring_dict": dict(points),
+                    }
+                )
+    for value_type in FREE_VALUE_TYPES:
+        templates.append(
+            {
+                "value_type": value_type,
+                "option_category": None,
+                "rule": None,
+                "options": [],
+                "scoring_dict": {},
+            }
+        )
+    return templates
+
+
+def _random_value(rng: random.Random, template: dict):
+    if template["options"]:
+        return rng.choice(template["options"])
+    value_type = template["value_type"]
+    if value_type == "int":
+        return int(rng.paretovariate(1.2) * 10)
+    if value_type == "float":
+        return round(rng.uniform(0, 100), 2)
+    if value_type == "date":
+        return (date(2010, 1, 1) + timedelta(days=rng.randrange(5000))).isoformat()
+    return " ".join(rng.sample(WORDS, 2))
+
+
+def _insert_values(rng, libraries, metrics, pools, fill, batch_size, stdout):
+    """
+    Insert the value rows with executemany: at millions of rows, building
+    model instances and bulk_create's per-batch SQL dominate the run time.
+    Every column is converted with its field's get_db_prep_value.
+    """
+    fields = [
+        LibraryMetricValue._meta.get_field(name)
+        for name in (
+            "value_ID",
+            "library",
+            "metric",
+            "value",
+            *LibraryMetricValue.DERIVED_FIELDS,
+            "collected_by",
+            "last_modified",
+        )
+    ]
+    # The connection proxy costs more per attribute lookup than the insert
+    db = connections[DEFAULT_DB_ALIAS]
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        db.ops.quote_name(LibraryMetricValue._meta.db_table),
+        ", ".join(db.ops.quote_name(f.column) for f in fields),
+        ", ".join(["%s"] * len(fields)),
+    )
+
+    def prep(field, value):
+        return field.get_db_prep_value(value, db)
+
+    def tail(raw, derived):
+        columns = {"value": raw, **derived, "collected_by": "synthetic"}
+        columns["last_modified"] = now
+        return tuple(prep(field, columns[field.name]) for field in fields[3:])
+
+    value_id, library_field, metric_field = fields[:3]
+    now = timezone.now()
+    # Everything after the IDs depends only on the pool entry
+    tails = {
+        metric.metric_ID: [
+            tail(raw, derived) for raw, derived in pools[metric.metric_ID]
+        ]
+        for metric in metrics
+    }
+    metric_ids = [
+        (prep(metric_field, m.metric_ID), tails[m.metric_ID]) for m in metrics
+    ]
+
+    # Consecutive value IDs append to the primary key index instead of
+    # landing on random pages; the high bits still come from the seed
+    id_base = rng.getrandbits(64) << 64
+    count, batch = 0, []
+    with db.cursor() as cursor:
+        for library in libraries:
+            library_id = prep(library_field, library.library_ID)
+            for metric_id, pool in metric_ids:
+                if rng.random() >= fill:
+                    continue
+                batch.append(
+                    (
+                        prep(value_id, uuid.UUID(int=id_base | len(batch) + count)),
+                        library_id,
+                        metric_id,
+                    )
+                    + rng.choice(pool)
+                )
+            if len(batch) >= batch_size:
+                cursor.executemany(sql, batch)
+                count += len(batch)
+                batch = []
+                if stdout is not None:
+                    stdout.write(f"  {count} values")
+        if batch:
+            cursor.executemany(sql, batch)
+            count += len(batch)
+    return count
+
+
+@contextmanager
+def deferred_indexes(model):
+    """
+    Drop ``model``'s Meta indexes for a bulk load and build them again at
+    the end, which is several times faster than maintaining them row by
+    row. Schema changes must run outside a transaction on some backends.
+    """
+    db = connections[DEFAULT_DB_ALIAS]
+    indexes = model._meta.indexes
+    with db.schema_editor() as editor:
+        for index in indexes:
+            editor.remove_index(model, index)
+    try:
+        yield
+    finally:
+        with db.schema_editor() as editor:
+            for index in indexes:
+                editor.add_index(model, index)
+
+
+def generate_dataset(
+    domains: int,
+    libraries: int,
+    metrics: int,
+    fill: float = 1.0,
+    seed: int = 0,
+    prefix: str = "Synthetic",
+    batch_size: int = 5000,
+    defer_indexes: bool = False,
+    stdout=None,
+) -> dict:
+    """
+    Create ``domains`` domains of ``libraries`` libraries each, ``metrics``
+    metrics shared by all of them and a value for roughly ``fill`` of every
+    library/metric pair. The same arguments always produce the same rows,
+    IDs included, so benchmarks and load tests share one baseline.
+
+    Rows are inserted in bulk with their typed and score columns
+    precomputed, so no save() or signal runs per row; the metric definition
+    and domain data versions are bumped once at the end. With
+    ``defer_indexes`` the value indexes are rebuilt after the load.
+    """
+    rng = random.Random(seed)
+    rules_version, rules_data = load_rules()
+    templates = metric_templates(rules_data)
+    categories = [c for c in load_categories() if c != "Summary"] or [None]
+
+    if Domain.objects.filter(domain_name__startswith=f"{prefix} ").exists():
+        raise ValueError(f"Domains named '{prefix} ...' already exist.")
+
+    metric_rows, value_pools = [], {}
+    for j in range(metrics):
+        template = templates[j % len(templates)]
+        metric = Metric(
+            metric_ID=_uuid(rng),
+            metric_name=f"{prefix} {template['value_type']} {j}",
+            category=categories[j % len(categories)],
+            value_type=template["value_type"],
+            option_category=template["option_category"],
+            rule=template["rule"],
+            scoring_dict=template["scoring_dict"],
+        )
+        metric_rows.append(metric)
+        # A small pool of values per metric, each with its derived columns
+        # computed once
+        pool = []
+        for _ in range(len(template["options"]) or 20):
+            raw = _random_value(rng, template)
+            derived = typed_values(raw, metric.value_type)
+            derived["score"] = value_score(metric, derived["value_option"], rules_data)
+            derived["scored_version"] = scoring_version(metric, rules_version)
+            pool.append((raw, derived))
+        value_pools[metric.metric_ID] = pool
+
+    domain_rows = [
+        Domain(
+            domain_ID=_uuid(rng),
+            domain_name=f"{prefix} {d}",
+            description=f"Generated with seed {seed}",
+            category_weights={c: 1.0 for c in categories if c},
+        )
+        for d in range(domains)
+    ]
+    library_rows = [
+        Library(
+            library_ID=_uuid(rng),
+            domain=domain,
+            library_name=f"{prefix} library {d}-{i}",
+            description=" ".join(rng.sample(WORDS, 3)),
+            github_url=f"https://github.com/synthetic/{prefix.lower()}-{d}-{i}",
+            programming_language=rng.choice(LANGUAGES),
+        )
+        for d, domain in enumerate(domain_rows)
+        for i in range(libraries)
+    ]
+
+    loading = deferred_indexes(LibraryMetricValue) if defer_indexes else nullcontext()
+    with loading, transaction.atomic():
+        Metric.objects.bulk_create(metric_rows, batch_size=batch_size)
+        Domain.objects.bulk_create(domain_rows, batch_size=batch_size)
+        Library.objects.bulk_create(library_rows, batch_size=batch_size)
+        values = _insert_values(
+            rng, library_rows, metric_rows, value_pools, fill, batch_size, stdout
+        )
+
+    bump_version(METRIC_DEFINITIONS)
+    bump_domain_data(d.domain_ID for d in domain_rows)
+
+    return {
+        "domains": len(domain_rows),
+        "libraries": len(library_rows),
+        "metrics": len(metric_rows),
+        "values": values,
+    }
@@ -0,0 +1,68 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current = ContextVar("stage_recorder", default=None)
+
+
+class StageRecorder:
+    """
+    Wall time per named stage of one analysis run, plus the GitHub API and
+    clone figures that explain it. Stages that run more than once (one per
+    API call, say) accumulate their time and count.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.api_calls = 0
+        self.rate_limit_remaining = None
+        self.bytes_cloned = None
+
+    def add(self, name: str, ms: float):
+        entry = self.stages.setdefault(name, {"ms": 0.0, "count": 0})
+        entry["ms"] += ms
+        entry["count"] += 1
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - started) * 1000)
+
+    def note_api_call(self, name: str, ms: float, headers=None):
+        self.api_calls += 1
+        self.add(f"api.{name}", ms)
+        remaining = (headers or {}).get("X-RateLimit-Remaining")
+        if remaining is not None:
+            try:
+                self.rate_limit_remaining = int(remaining)
+            except ValueError:
+                pass
+
+
+def current() -> StageRecorder | None:
+    return _current.get()
+
+
+@contextmanager
+def recording():
+    """Collect the stages timed in this context into a new StageRecorder."""
+    recorder = StageRecorder()
+    token = _current.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name: str):
+    """Time ``name`` into the active recorder; a no-op outside recording()."""
+    recorder = _current.get()
+    if recorder is None:
+        yield
+        return
+    with recorder.stage(name):
+        yield
@@ -0,0 +1,27 @@
+import time
+
+from django.core.cache import cache
+
+KEY_PREFIX = "version:"
+
+
+def get_version(name: str) -> int:
+    """
+    Current version of a named dataset. Versions live in the shared cache so
+    a bump in one process invalidates derived caches in every other process.
+
+    New versions start from the clock rather than 1, so a key that was
+    evicted or flushed never comes back as a value some process already
+    cached data under.
+    """
+    return cache.get_or_set(f"{KEY_PREFIX}{name}", time.time_ns, timeout=None)
+
+
+def bump_version(name: str) -> int:
+    key = f"{KEY_PREFIX}{name}"
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Not set yet (or evicted): a fresh seed is already a new version
+        cache.add(key, time.time_ns(), timeout=None)
+        return cache.get(key)
@@ -0,0 +1,66 @@
+import os
+
+from django.conf import settings
+from django.http import FileResponse
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from users.permissions import IsAdmin, IsSuperAdmin
+
+from .utils.profiling import list_profiles, profile_path
+from .utils.server_timing import endpoint_stats
+
+
+@api_view(["GET"])
+@permission_classes([IsAdmin])
+def server_timing_stats(request):
+    """
+    Rolling per-endpoint latency histograms of the worker process that
+    answers; each gunicorn worker keeps its own.
+    """
+    return Response(
+        {
+            "enabled": settings.SERVER_TIMING_ENABLED,
+            "pid": os.getpid(),
+            "window_s": settings.SERVER_TIMING_WINDOW,
+            "endpoints": endpoint_stats(),
+        },
+        status=status.HTTP_200_OK,
+    )
+
+
+@api_view(["GET"])
+@permission_classes([IsSuperAdmin])
+def profiles_list(request):
+    """
+    Stored profiles of slow requests and long tasks, newest first. Filter
+    with ``?kind=request`` or ``?kind=task``.
+    """
+    kind = request.query_params.get("kind")
+    if kind not in (None, "request", "task"):
+        return Response(
+            {"error": "kind must be 'request' or 'task'."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    return Response(
+        {"enabled": settings.PROFILING_ENABLED, "profiles": list_profiles(kind)},
+        status=status.HTTP_200_OK,
+    )
+
+
+@api_view(["GET"])
+@permission_classes([IsSuperAdmin])
+def profile_download(request, profile_id):
+    """One profile as folded stacks, for flamegraph.pl or speedscope."""
+    path = profile_path(profile_id)
+    if path is None:
+        return Response(
+            {"error": "Profile not found."}, status=status.HTTP_404_NOT_FOUND
+        )
+    return FileResponse(
+        open(path, "rb"),
+        as_attachment=True,
+        filename=f"{profile_id}.folded",
+        content_type="text/plain",
+    )
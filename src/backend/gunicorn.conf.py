@@ -0,0 +1,9 @@
+import os
+
+
+def child_exit(server, worker):
+    # Drop the live-gauge samples of a dead worker; its counters stay summed in
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client.multiprocess import mark_process_dead
+
+        mark_process_dead(worker.pid)
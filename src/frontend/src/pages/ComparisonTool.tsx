@@ -67,30 +67,6 @@ const ComparisonToolPage: React.FC = () => {
     loadPageData();
   }, [DOMAIN_ID]);
 
-  const getDomainSpecification = async () => {
-    try {
-      const response = await fetch(apiUrl(`/domain/${DOMAIN_ID}/`), {
-        credentials: "include",
-      });
-
-      if (!response.ok) {
-        if (response.status === 404) {
-          throw new Error("Domain not found");
-        }
-        throw new Error("Failed to fetch domain specifications");
-      }
-
-      const data = await response.json();
-      setDomainName(data.domain_name || "");
-      setDomainPublished(data.published || false);
-      return data;
-    } catch (error) {
-      console.error("Error:", error);
-      setError(error instanceof Error ? error.message : "Failed to load domain");
-      return null;
-    }
-  };
-
   // Check access based on domain published status and auth
   useEffect(() => {
     // Wait for auth to load and domain data to be fetched
@@ -111,42 +87,39 @@ const ComparisonToolPage: React.FC = () => {
       setLoading(true);
       setError(null);
 
-      const domainData = await getDomainSpecification();
-
-      // If domain fetch succeeded, proceed with loading comparison data
-      if (domainData) {
-        const res = await fetch(
-          apiUrl(`/library_metric_values/comparison/${DOMAIN_ID}/`),
-          {
-            credentials: "include",
-          }
-        );
+      const res = await fetch(apiUrl(`/domain/${DOMAIN_ID}/dashboard/`), {
+        credentials: "include",
+      });
 
-        const contentType = res.headers.get("content-type") || "";
-        const text = await res.text();
-
-        if (!res.ok) {
-          if (res.status === 403) {
-            // Backend explicitly forbids access
-            setAccessDenied(true);
-            setTimeout(() => {
-              navigate("/login", { state: { from: `/comparison-tool/${DOMAIN_ID}` } });
-            }, 2000);
-            return;
-          }
-          throw new Error(`HTTP ${res.status}: ${text.slice(0, 200)}`);
+      const contentType = res.headers.get("content-type") || "";
+      const text = await res.text();
+
+      if (!res.ok) {
+        if (res.status === 403) {
+          // Backend explicitly forbids access
+          setAccessDenied(true);
+          setTimeout(() => {
+            navigate("/login", { state: { from: `/comparison-tool/${DOMAIN_ID}` } });
+          }, 2000);
+          return;
         }
-
-        if (!contentType.includes("application/json")) {
-          throw new Error(
-            `Expected JSON, got ${contentType}. Body starts with: ${text.slice(0, 80)}`
-          );
+        if (res.status === 404) {
+          throw new Error("Domain not found");
         }
+        throw new Error(`HTTP ${res.status}: ${text.slice(0, 200)}`);
+      }
 
-        const data = JSON.parse(text);
-        setMetricList(Array.isArray(data.metrics) ? data.metrics : []);
-        setTableRows(Array.isArray(data.libraries) ? data.libraries : []);
+      if (!contentType.includes("application/json")) {
+        throw new Error(
+          `Expected JSON, got ${contentType}. Body starts with: ${text.slice(0, 80)}`
+        );
       }
+
+      const data = JSON.parse(text);
+      setDomainName(data.domain?.domain_name || "");
+      setDomainPublished(data.domain?.published || false);
+      setMetricList(Array.isArray(data.metrics) ? data.metrics : []);
+      setTableRows(Array.isArray(data.libraries) ? data.libraries : []);
     } catch (err) {
       console.error("Error loading comparison data:", err);
       setError(err instanceof Error ? err.message : "Failed to load comparison data");
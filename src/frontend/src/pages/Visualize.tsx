@@ -16,6 +16,12 @@ interface Metric {
   value_type?: string;
 }
 
+interface MetricSeries {
+  metric_name: string;
+  invalid: number;
+  bars: { library_ID: string; label: string; value: number }[];
+}
+
 interface LibraryRow {
   library_ID: string;
   library_name: string;
@@ -45,6 +51,7 @@ const Visualize: React.FC = () => {
   const [selectedLibraries, setSelectedLibraries] = useState<string[]>([]);
 
   const [chartData, setChartData] = useState<{ metric: string; rows: { label: string; value: number }[] }[] | null>(null);
+  const [chartSeries, setChartSeries] = useState<MetricSeries[] | null>(null);
   const [error, setError] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
   const [accessDenied, setAccessDenied] = useState(false);
@@ -56,30 +63,6 @@ const Visualize: React.FC = () => {
     return metricList.filter(m => m.value_type !== "bool" && m.value_type !== "text");
   }, [metricList]);
 
-  const getDomainSpecification = async () => {
-    try {
-      const response = await fetch(apiUrl(`/domain/${DOMAIN_ID}/`), {
-        credentials: "include",
-      });
-
-      if (!response.ok) {
-        if (response.status === 404) {
-          throw new Error("Domain not found");
-        }
-        throw new Error("Failed to fetch domain specifications");
-      }
-
-      const data = await response.json();
-      setDomainName(data.domain_name || "");
-      setDomainPublished(data.published || false);
-      return data;
-    } catch (error) {
-      console.error("Error:", error);
-      setError(error instanceof Error ? error.message : "Failed to load domain");
-      return null;
-    }
-  };
-
   // Check access based on domain published status and auth
   useEffect(() => {
     // Wait for auth to load and domain data to be fetched
@@ -110,71 +93,54 @@ const Visualize: React.FC = () => {
     try {
       setLoading(true);
       setError(null);
+      setChartSeries(null);
 
-      await getDomainSpecification();
-
-      const parseJson = async (res: Response) => {
-        const contentType = res.headers.get("content-type") || "";
-        const responseText = await res.text();
-
-        if (!res.ok) {
-          if (res.status === 403) {
-            // Backend explicitly forbids access
-            setAccessDenied(true);
-            setTimeout(() => {
-              navigate("/login", { state: { from: `/visualize/${DOMAIN_ID}` } });
-            }, 2000);
-            return null;
-          }
-          console.error("Visualize load error:", res.status, responseText);
-          throw new Error(`Server Error (${res.status})`);
+      const res = await fetch(apiUrl(`/domain/${DOMAIN_ID}/dashboard/`), {
+        credentials: "include",
+      });
+      const contentType = res.headers.get("content-type") || "";
+      const responseText = await res.text();
+
+      if (!res.ok) {
+        if (res.status === 403) {
+          // Backend explicitly forbids access
+          setAccessDenied(true);
+          setTimeout(() => {
+            navigate("/login", { state: { from: `/visualize/${DOMAIN_ID}` } });
+          }, 2000);
+          return;
         }
-
-        if (!contentType.includes("application/json")) {
-          throw new Error(`Expected JSON, got ${contentType}. Body: ${responseText.slice(0, 120)}`);
+        if (res.status === 404) {
+          throw new Error("Domain not found");
         }
+        console.error("Visualize load error:", res.status, responseText);
+        throw new Error(`Server Error (${res.status})`);
+      }
 
-        return JSON.parse(responseText);
-      };
-
-      const [comparisonRes, metricsRes, categoriesRes] = await Promise.all([
-        fetch(apiUrl(`/library_metric_values/comparison/${DOMAIN_ID}/`), {
-          credentials: "include",
-        }),
-        fetch(apiUrl("/metrics/"), { credentials: "include" }),
-        fetch(apiUrl("/metrics/categories/"), { credentials: "include" }),
-      ]);
-
-      const [comparisonData, metricsData, categoriesData] = await Promise.all([
-        parseJson(comparisonRes),
-        parseJson(metricsRes),
-        parseJson(categoriesRes)
-      ]);
-      // If any of the requests returned null due to 403, stop loading
-      if (comparisonData === null || metricsData === null || categoriesData === null) {
-        return;
+      if (!contentType.includes("application/json")) {
+        throw new Error(`Expected JSON, got ${contentType}. Body: ${responseText.slice(0, 120)}`);
       }
 
-      setMetricList(Array.isArray(metricsData) ? metricsData : comparisonData.metrics || []);
-      const librariesData = comparisonData.libraries || [];
+      const dashboard = JSON.parse(responseText);
+      setDomainName(dashboard.domain?.domain_name || "");
+      setDomainPublished(dashboard.domain?.published || false);
+
+      const metricsData: Metric[] = Array.isArray(dashboard.metrics) ? dashboard.metrics : [];
+      setMetricList(metricsData);
+      const librariesData = dashboard.libraries || [];
       setLibraries(librariesData);
       // Auto-select all libraries by default
       setSelectedLibraries(librariesData.map((lib: LibraryRow) => lib.library_ID));
-      setCategories(Array.isArray(categoriesData?.Categories) ? categoriesData.Categories : []);
 
       const derivedCategories = Array.from(
-        new Set((Array.isArray(metricsData) ? metricsData : comparisonData.metrics || [])
-          .map((m: Metric) => m.category)
-          .filter(Boolean) as string[])
+        new Set(metricsData.map((m: Metric) => m.category).filter(Boolean) as string[])
       );
-      const availableCategories = (Array.isArray(categoriesData?.Categories)
-        ? categoriesData.Categories
+      const availableCategories = (Array.isArray(dashboard.categories)
+        ? dashboard.categories
         : derivedCategories
-      ).filter((cat: string) => (Array.isArray(metricsData) ? metricsData : comparisonData.metrics || [])
-        .some((m: Metric) => m.category === cat));
+      ).filter((cat: string) => metricsData.some((m: Metric) => m.category === cat));
 
-      const hasUncategorized = (Array.isArray(metricsData) ? metricsData : comparisonData.metrics || [])
-        .some((m: Metric) => !m.category);
+      const hasUncategorized = metricsData.some((m: Metric) => !m.category);
 
       const categoryList = hasUncategorized
         ? [...availableCategories, "Uncategorized"]
@@ -321,7 +287,22 @@ const Visualize: React.FC = () => {
     saveAs(zipBlob, `visualizations_${dateStamp}.zip`);
   };
 
-  const handleVisualize = () => {
+  const loadChartSeries = async (): Promise<MetricSeries[]> => {
+    if (chartSeries) return chartSeries;
+
+    const res = await fetch(apiUrl(`/library_metric_values/charts/${DOMAIN_ID}/`), {
+      credentials: "include",
+    });
+    if (!res.ok) {
+      throw new Error(`Server Error (${res.status})`);
+    }
+    const data = await res.json();
+    const series: MetricSeries[] = Array.isArray(data.metrics) ? data.metrics : [];
+    setChartSeries(series);
+    return series;
+  };
+
+  const handleVisualize = async () => {
     setError(null);
     setChartData(null);
 
@@ -363,28 +344,36 @@ const Visualize: React.FC = () => {
       return;
     }
 
-    let hasInvalid = false;
-    const toNumber = (val: string | number | null | undefined) => {
-      if (val === null || val === undefined || val === "") return 0;
-      const num = Number(val);
-      if (isNaN(num)) {
-        hasInvalid = true;
-        return 0;
-      }
-      return num;
-    };
+    let series: MetricSeries[];
+    try {
+      series = await loadChartSeries();
+    } catch (err) {
+      console.error(err);
+      setError(err instanceof Error ? err.message : "Failed to load chart data");
+      return;
+    }
+    const seriesByName = new Map(series.map(s => [s.metric_name, s]));
 
     const selectedMetricArray = Array.from(selectedMetricNames);
-    const selectedLibs = libraries.filter(l => selectedLibraries.includes(l.library_ID));
+    const selectedIds = new Set(selectedLibraries);
+    const selectedLibs = libraries.filter(l => selectedIds.has(l.library_ID));
 
-    let charts: { metric: string; rows: { label: string; value: number }[] }[] = [];
+    if (selectedMetricArray.some(name => (seriesByName.get(name)?.invalid || 0) > 0)) {
+      setError("Some selected metrics have invalid values.");
+      return;
+    }
 
-    // Metrics mode - show raw metric values
-    charts = selectedMetricArray.map(metricName => {
-      const rows = selectedLibs.map(l => ({
-        label: l.library_name,
-        value: toNumber(l.metrics[metricName])
-      })).sort((a, b) => b.value - a.value);
+    // Metrics mode - show raw metric values, sorted by the server;
+    // selected libraries without a value are shown as 0
+    const charts = selectedMetricArray.map(metricName => {
+      const bars = (seriesByName.get(metricName)?.bars || []).filter(b => selectedIds.has(b.library_ID));
+      const withValue = new Set(bars.map(b => b.library_ID));
+      const rows = [
+        ...bars.map(b => ({ label: b.label, value: b.value })),
+        ...selectedLibs
+          .filter(l => !withValue.has(l.library_ID))
+          .map(l => ({ label: l.library_name, value: 0 })),
+      ];
 
       return {
         metric: metricName,
@@ -392,11 +381,6 @@ const Visualize: React.FC = () => {
       };
     });
 
-    if (hasInvalid) {
-      setError("Some selected metrics have invalid values.");
-      return;
-    }
-
     setChartData(charts);
   };
 
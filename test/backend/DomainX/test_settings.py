@@ -89,3 +89,40 @@ class DatabaseConfigurationTestCase(SimpleTestCase):
 
         self.assertIn("default", settings.DATABASES)
         self.assertEqual(len(settings.DATABASES), 1)
+
+
+class CacheConfigurationTestCase(SimpleTestCase):
+    """The shared cache is required outside DEBUG."""
+    databases = {}
+
+    def import_settings(self, **env):
+        import subprocess
+        import sys
+
+        env = {
+            "PATH": os.environ.get("PATH", ""),
+            "DJANGO_SECRET_KEY": "123",
+            "CELERY_BROKER_URL": "memory://",
+            "DJANGO_LOCAL": "true",
+            **env,
+        }
+        return subprocess.run(
+            [sys.executable, "-c", "import DomainX.settings as s; print(s.CACHES['default']['BACKEND'])"],
+            cwd=Path(django.conf.settings.BASE_DIR),
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+
+    def test_missing_cache_url_without_debug_fails(self):
+        result = self.import_settings(DJANGO_DEBUG="false")
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("DJANGO_CACHE_URL is not set", result.stderr)
+
+    def test_cache_url_selects_redis(self):
+        result = self.import_settings(DJANGO_DEBUG="false", DJANGO_CACHE_URL="redis://localhost:6379/1")
+        self.assertEqual(result.stdout.strip(), "django.core.cache.backends.redis.RedisCache")
+
+    def test_debug_falls_back_to_local_memory(self):
+        result = self.import_settings(DJANGO_DEBUG="true")
+        self.assertEqual(result.stdout.strip(), "django.core.cache.backends.locmem.LocMemCache")
@@ -0,0 +1,177 @@
+from datetime import timedelta
+from unittest.mock import Mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+import api.services.github_http as gh
+import api.tasks as tasks_module
+from api.database.analysis_runs.models import AnalysisRun, AnalysisRunStage
+from api.database.analysis_runs.services import run_stats
+from api.database.domain.models import Domain
+from api.database.libraries.models import Library
+from api.utils import timing
+
+
+@pytest.fixture(autouse=True)
+def no_head_sha(monkeypatch):
+    monkeypatch.setattr(tasks_module, "resolve_head_sha", lambda slug: None)
+
+
+@pytest.fixture()
+def library():
+    domain = Domain.objects.create(domain_name="D1", description="desc", category_weights={})
+    return Library.objects.create(
+        domain=domain,
+        library_name="RepoA",
+        github_url="https://github.com/Org/RepoA",
+        programming_language="Python",
+    )
+
+
+def make_run(slug, duration_ms, outcome=AnalysisRun.OUTCOME_SUCCESS, days_ago=0, stages=(), kind="analysis"):
+    run = AnalysisRun.objects.create(
+        kind=kind,
+        repo_slug=slug,
+        outcome=outcome,
+        started_at=timezone.now() - timedelta(days=days_ago),
+        duration_ms=duration_ms,
+    )
+    for name, ms in stages:
+        AnalysisRunStage.objects.create(run=run, name=name, duration_ms=ms)
+    return run
+
+
+def test_recorder_accumulates_stages_and_rate_limit(monkeypatch):
+    with timing.recording() as recorder:
+        with timing.stage("clone"):
+            pass
+        recorder.note_api_call("search", 5.0, {"X-RateLimit-Remaining": "41"})
+        recorder.note_api_call("search", 7.0, {})
+
+    with timing.stage("outside"):
+        pass
+
+    assert recorder.stages["clone"]["count"] == 1
+    assert recorder.stages["api.search"] == {"ms": 12.0, "count": 2}
+    assert (recorder.api_calls, recorder.rate_limit_remaining) == (2, 41)
+    assert "outside" not in recorder.stages
+
+
+def test_github_get_records_api_calls(monkeypatch):
+    monkeypatch.setenv("GITHUB_TOKEN", "t")
+    monkeypatch.delenv("GITHUB_APP_ID", raising=False)
+    resp = Mock(status_code=200, headers={"X-RateLimit-Remaining": "99"})
+    monkeypatch.setattr(gh.requests, "get", lambda *a, **k: resp)
+
+    with timing.recording() as recorder:
+        gh.github_get("/repos/o/r/git/trees/main")
+        gh.github_get("/repos/o/r")
+        gh.github_get("/search/issues")
+
+    assert set(recorder.stages) == {"api.trees", "api.repo", "api.search"}
+    assert recorder.rate_limit_remaining == 99
+
+
+@pytest.mark.django_db
+def test_analysis_task_records_run_with_stages(monkeypatch, library):
+    fake_analyzer = Mock()
+    fake_analyzer.run_analysis_and_get_data.return_value = {"metric_data": {}}
+    monkeypatch.setattr(tasks_module, "RepoAnalyzer", lambda github_url: fake_analyzer)
+
+    tasks_module.analyze_repo_task.apply(
+        args=[str(library.library_ID), library.github_url], task_id="t-1"
+    ).get(propagate=True)
+
+    run = AnalysisRun.objects.get()
+    assert (run.kind, run.outcome, run.task_id, run.repo_slug) == ("analysis", "success", "t-1", "org/repoa")
+    assert run.library_id == library.library_ID
+    assert run.worker
+    assert {"cache_lookup", "db_write"} <= set(run.stages.values_list("name", flat=True))
+
+
+@pytest.mark.django_db
+def test_failed_and_skipped_runs_are_recorded(monkeypatch, library, tmp_path, settings):
+    fake_analyzer = Mock()
+    fake_analyzer.run_analysis_and_get_data.side_effect = RuntimeError("GitHub API error 403")
+    monkeypatch.setattr(tasks_module, "RepoAnalyzer", lambda github_url: fake_analyzer)
+
+    with pytest.raises(RuntimeError):
+        tasks_module.analyze_repo_task.apply(
+            args=[str(library.library_ID), library.github_url], task_id="t-2"
+        ).get(propagate=True)
+
+    settings.GITSTATS_SERVE_DIR = str(tmp_path)
+    report = tmp_path / str(library.library_ID) / "git_stats" / "index.html"
+    report.parent.mkdir(parents=True)
+    report.write_text("ok")
+    tasks_module.analyze_repo_gitstats_task.apply(
+        args=[str(library.library_ID), library.github_url], task_id="t-3"
+    ).get(propagate=True)
+
+    failed = AnalysisRun.objects.get(task_id="t-2")
+    assert failed.outcome == AnalysisRun.OUTCOME_FAILED
+    assert failed.error == "RuntimeError: GitHub API error 403"
+    assert AnalysisRun.objects.get(task_id="t-3").outcome == AnalysisRun.OUTCOME_SKIPPED
+
+
+@pytest.mark.django_db
+def test_run_stats_aggregates_repos_stages_and_trend():
+    make_run("o/slow", 9000, stages=[("clone", 6000), ("scc", 2000)])
+    make_run("o/slow", 3000, outcome=AnalysisRun.OUTCOME_TIMEOUT, days_ago=1, stages=[("clone", 2000)])
+    make_run("o/fast", 500, stages=[("clone", 400)])
+    make_run("o/old", 99999, days_ago=40)
+    make_run("o/gitstats", 50000, kind="gitstats")
+
+    stats = run_stats(days=30, kind="analysis")
+
+    assert stats["totals"]["runs"] == 3
+    assert stats["totals"]["failures"] == 1
+    assert [(r["repo_slug"], r["total_ms"], r["runs"]) for r in stats["slowest"]] == [("o/slow", 12000, 2), ("o/fast", 500, 1)]
+    assert [(s["name"], s["total_ms"], s["runs"]) for s in stats["stages"]] == [("clone", 8400, 3), ("scc", 2000, 1)]
+    assert sum(s["share"] for s in stats["stages"]) == pytest.approx(1.0)
+    assert [d["runs"] for d in stats["trend"]] == [1, 2]
+
+    by_max = run_stats(days=30, limit=1, sort="max")
+    assert [r["repo_slug"] for r in by_max["slowest"]] == ["o/gitstats"]
+
+
+@pytest.mark.django_db
+def test_old_runs_are_purged_with_their_stages(settings):
+    settings.ANALYSIS_RUN_RETENTION_DAYS = 30
+    make_run("o/old", 100, days_ago=31, stages=[("clone", 50)])
+    make_run("o/old", 100, days_ago=40, kind="gitstats", stages=[("gitstats", 80)])
+    recent = make_run("o/recent", 100, days_ago=29, stages=[("clone", 50)])
+
+    assert tasks_module.purge_analysis_runs_task() == {"ok": True, "deleted": 2}
+    assert list(AnalysisRun.objects.all()) == [recent]
+    assert list(AnalysisRunStage.objects.values_list("run_id", flat=True)) == [recent.pk]
+
+
+@pytest.mark.django_db
+def test_stats_and_list_endpoints_are_admin_only(library):
+    User = get_user_model()
+    admin = User.objects.create_user(username="a", email="a@x.com", password=None, role="admin")
+    viewer = User.objects.create_user(username="u", email="u@x.com", password=None, role="user")
+    run = make_run("org/repoa", 100, stages=[("scc", 60)])
+    run.library = library
+    run.save()
+    make_run("o/other", 100)
+
+    client = APIClient()
+    client.force_authenticate(user=viewer)
+    assert client.get("/api/analysis_runs/stats/").status_code == status.HTTP_403_FORBIDDEN
+
+    client.force_authenticate(user=admin)
+    stats = client.get("/api/analysis_runs/stats/", {"days": 7, "sort": "mean"})
+    assert stats.status_code == status.HTTP_200_OK
+    assert stats.json()["stages"][0]["name"] == "scc"
+    assert client.get("/api/analysis_runs/stats/", {"days": "x"}).status_code == status.HTTP_400_BAD_REQUEST
+    assert client.get("/api/analysis_runs/stats/", {"kind": "nope"}).status_code == status.HTTP_400_BAD_REQUEST
+
+    runs = client.get("/api/analysis_runs/", {"library": str(library.library_ID)}).json()
+    assert [(r["repo_slug"], r["stages"]) for r in runs] == [("org/repoa", [{"name": "scc", "duration_ms": 60.0, "count": 1}])]
+    assert client.get("/api/analysis_runs/", {"library": "bad"}).json() == []
@@ -104,3 +104,52 @@ def test_delete_domain(api_client, user_factory):
 
     assert response.status_code == status.HTTP_204_NO_CONTENT
     assert not Domain.objects.filter(pk=domain.domain_ID).exists()
+
+
+@pytest.mark.django_db
+def test_domain_dashboard_returns_everything_in_one_response(api_client, monkeypatch, tmp_path, django_assert_max_num_queries):
+    from api.database.libraries.models import Library
+    from api.database.library_metric_values.models import LibraryMetricValue
+    from api.database.metrics.models import Metric
+    from api.database.metrics.catalog import get_catalog
+    import api.utils.config as config_module
+
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
+    (tmp_path / "api" / "database").mkdir(parents=True)
+    (tmp_path / "api" / "database" / "categories.json").write_text('{"Categories": ["Visibility"]}')
+    (tmp_path / "api" / "database" / "rules.json").write_text('{"int": {}}')
+
+    domain = Domain.objects.create(domain_name="Dash", description="desc", published=True)
+    stars = Metric.objects.create(metric_name="Stars", category="Visibility", value_type="int")
+    ranked = Library.objects.create(
+        domain=domain, library_name="Ranked", ahp_results={"overall_score": 0.7, "category_scores": {"Visibility": 0.7}}
+    )
+    Library.objects.create(domain=domain, library_name="Unranked")
+    LibraryMetricValue.objects.create(library=ranked, metric=stars, value=12, evidence="api")
+    get_catalog()
+
+    # domain, creators, libraries, values
+    with django_assert_max_num_queries(4):
+        response = api_client.get(f"/api/domain/{domain.domain_ID}/dashboard/")
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["domain"]["domain_name"] == "Dash"
+    assert "libraries" not in data["domain"]
+    assert [m["metric_name"] for m in data["metrics"]] == ["Stars"]
+    assert data["categories"] == ["Visibility"]
+    assert data["rules"] == {"int": {}}
+    rows = {row["library_name"]: row for row in data["libraries"]}
+    assert rows["Ranked"]["metrics"]["Stars"] == 12
+    assert rows["Ranked"]["metrics"]["Stars_evidence"] == "api"
+    assert rows["Unranked"]["metrics"]["Stars"] is None
+    assert data["ahp"] == {"global_ranking": {"Ranked": 0.7}, "category_scores": {"Ranked": {"Visibility": 0.7}}}
+
+
+@pytest.mark.django_db
+def test_domain_dashboard_returns_404_for_unknown_domain(api_client):
+    import uuid
+
+    response = api_client.get(f"/api/domain/{uuid.uuid4()}/dashboard/")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
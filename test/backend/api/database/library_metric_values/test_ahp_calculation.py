@@ -1,6 +1,6 @@
 import pytest
 import json
-from unittest.mock import patch, mock_open
+from unittest.mock import patch
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -11,6 +11,7 @@ from api.database.libraries.models import Library
 from api.database.metrics.models import Metric
 from api.database.library_metric_values.models import LibraryMetricValue
 from api.database.library_metric_values.views import AHPCalculations
+import api.utils.config as config_module
 
 
 
@@ -65,11 +66,9 @@ def test_ahp_calculations_success(api_client, ahp_qualities):
     mock_rules = json.dumps({"numeric": {}})
     mock_categories = json.dumps({"Categories": ["Installability"]})
 
-    with patch("builtins.open", mock_open()) as mocked_file:
-        mocked_file.side_effect = [
-            mock_open(read_data=mock_rules).return_value,
-            mock_open(read_data=mock_categories).return_value
-        ]
+    configs = {"rules": json.loads(mock_rules), "categories": json.loads(mock_categories)}
+
+    with patch.object(config_module.registry, "get", side_effect=configs.get):
 
         # Call the API
         url = reverse("values-ahp", kwargs={"domain_id": domain.domain_ID})
@@ -143,11 +142,9 @@ def test_ahp_calculations_with_weighted_categories(api_client, ahp_qualities):
     mock_rules = json.dumps({"numeric": {}})
     mock_categories = json.dumps({"Categories": ["Installability", "Maintainability"]})
 
-    with patch("builtins.open", mock_open()) as mocked_file:
-        mocked_file.side_effect = [
-            mock_open(read_data=mock_rules).return_value,
-            mock_open(read_data=mock_categories).return_value
-        ]
+    configs = {"rules": json.loads(mock_rules), "categories": json.loads(mock_categories)}
+
+    with patch.object(config_module.registry, "get", side_effect=configs.get):
 
         url = reverse("values-ahp", kwargs={"domain_id": domain.domain_ID})
         response = api_client.get(url)
@@ -200,11 +197,9 @@ def test_ahp_calculations_with_single_package(api_client, ahp_qualities):
     mock_rules = json.dumps({"numeric": {}})
     mock_categories = json.dumps({"Categories": ["Installability"]})
 
-    with patch("builtins.open", mock_open()) as mocked_file:
-        mocked_file.side_effect = [
-            mock_open(read_data=mock_rules).return_value,
-            mock_open(read_data=mock_categories).return_value
-        ]
+    configs = {"rules": json.loads(mock_rules), "categories": json.loads(mock_categories)}
+
+    with patch.object(config_module.registry, "get", side_effect=configs.get):
 
         url = reverse("values-ahp", kwargs={"domain_id": domain.domain_ID})
         response = api_client.get(url)
@@ -237,11 +232,9 @@ def test_ahp_calculations_with_no_metrics(api_client, ahp_qualities):
     mock_rules = json.dumps({"numeric": {}})
     mock_categories = json.dumps({"Categories": ["Installability"]})
 
-    with patch("builtins.open", mock_open()) as mocked_file:
-        mocked_file.side_effect = [
-            mock_open(read_data=mock_rules).return_value,
-            mock_open(read_data=mock_categories).return_value
-        ]
+    configs = {"rules": json.loads(mock_rules), "categories": json.loads(mock_categories)}
+
+    with patch.object(config_module.registry, "get", side_effect=configs.get):
 
         url = reverse("values-ahp", kwargs={"domain_id": domain.domain_ID})
         response = api_client.get(url)
@@ -303,11 +296,9 @@ def test_ahp_calculations_with_equal_weights(api_client, ahp_qualities):
     mock_rules = json.dumps({"numeric": {}})
     mock_categories = json.dumps({"Categories": ["Installability", "Maintainability", "Reusability"]})
 
-    with patch("builtins.open", mock_open()) as mocked_file:
-        mocked_file.side_effect = [
-            mock_open(read_data=mock_rules).return_value,
-            mock_open(read_data=mock_categories).return_value
-        ]
+    configs = {"rules": json.loads(mock_rules), "categories": json.loads(mock_categories)}
+
+    with patch.object(config_module.registry, "get", side_effect=configs.get):
 
         url = reverse("values-ahp", kwargs={"domain_id": domain.domain_ID})
         response = api_client.get(url)
@@ -349,11 +340,9 @@ def test_ahp_calculations_response_structure(api_client, ahp_qualities):
     mock_rules = json.dumps({"numeric": {}})
     mock_categories = json.dumps({"Categories": ["Installability"]})
 
-    with patch("builtins.open", mock_open()) as mocked_file:
-        mocked_file.side_effect = [
-            mock_open(read_data=mock_rules).return_value,
-            mock_open(read_data=mock_categories).return_value
-        ]
+    configs = {"rules": json.loads(mock_rules), "categories": json.loads(mock_categories)}
+
+    with patch.object(config_module.registry, "get", side_effect=configs.get):
 
         url = reverse("values-ahp", kwargs={"domain_id": domain.domain_ID})
         response = api_client.get(url)
@@ -0,0 +1,61 @@
+import pytest
+from django.db import IntegrityError
+
+from api.database.domain.models import Domain
+from api.database.libraries.models import Library
+from api.database.library_metric_values.bulk import upsert_metric_values
+from api.database.library_metric_values.models import LibraryMetricValue
+from api.database.metrics.models import Metric
+
+
+@pytest.fixture()
+def library():
+    domain = Domain.objects.create(domain_name="D1", description="desc")
+    return Library.objects.create(domain=domain, library_name="A")
+
+
+@pytest.fixture()
+def metrics():
+    return [
+        Metric.objects.create(metric_name=f"M{i}", metric_key=f"m{i}", value_type="int")
+        for i in range(3)
+    ]
+
+
+@pytest.mark.django_db
+def test_upsert_inserts_then_updates_only_given_fields(library, metrics):
+    LibraryMetricValue.objects.create(
+        library=library, metric=metrics[0], value=1, evidence="kept"
+    )
+
+    count = upsert_metric_values(
+        [LibraryMetricValue(library=library, metric=m, value=10) for m in metrics],
+        ["value"],
+    )
+
+    assert count == 3
+    assert LibraryMetricValue.objects.filter(library=library).count() == 3
+    existing = LibraryMetricValue.objects.get(library=library, metric=metrics[0])
+    assert existing.value == 10
+    assert existing.evidence == "kept"
+
+
+@pytest.mark.django_db
+def test_upsert_last_duplicate_wins(library, metrics):
+    upsert_metric_values(
+        [
+            LibraryMetricValue(library=library, metric=metrics[0], value=1),
+            LibraryMetricValue(library=library, metric=metrics[0], value=2),
+        ],
+        ["value"],
+    )
+
+    assert LibraryMetricValue.objects.get(library=library, metric=metrics[0]).value == 2
+    assert upsert_metric_values([], ["value"]) == 0
+
+
+@pytest.mark.django_db
+def test_library_metric_pair_is_unique(library, metrics):
+    LibraryMetricValue.objects.create(library=library, metric=metrics[0], value=1)
+    with pytest.raises(IntegrityError):
+        LibraryMetricValue.objects.create(library=library, metric=metrics[0], value=2)
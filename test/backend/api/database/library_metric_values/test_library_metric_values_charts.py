@@ -0,0 +1,136 @@
+import pytest
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+
+from api.database.domain.models import Domain
+from api.database.libraries.models import Library
+from api.database.library_metric_values.bulk import upsert_metric_values
+from api.database.library_metric_values.models import LibraryMetricValue
+from api.database.library_metric_values.signals import domain_data_version
+from api.database.metrics.models import Metric
+import api.database.library_metric_values.charts as charts_module
+import api.database.library_metric_values.views as views_module
+
+
+@pytest.fixture()
+def domain():
+    return Domain.objects.create(domain_name="Charts", description="desc")
+
+
+@pytest.fixture()
+def libs(domain):
+    return [Library.objects.create(domain=domain, library_name=name) for name in ("Alpha", "Beta", "Gamma")]
+
+
+@pytest.fixture()
+def metrics():
+    return {
+        "stars": Metric.objects.create(metric_name="Stars", category="Visibility", value_type="int"),
+        "forks": Metric.objects.create(metric_name="Forks", category="Visibility", value_type="int"),
+        "notes": Metric.objects.create(metric_name="Notes", category="Visibility", value_type="text"),
+        "size": Metric.objects.create(metric_name="Size", value_type="float"),
+    }
+
+
+def set_values(libs, metric, values):
+    for lib, value in zip(libs, values):
+        LibraryMetricValue.objects.create(library=lib, metric=metric, value=value)
+
+
+@pytest.mark.django_db
+def test_metric_series_are_sorted_with_stats_and_histogram(domain, libs, metrics):
+    set_values(libs, metrics["stars"], [10, 30, 20])
+    set_values(libs, metrics["forks"], [5, None, "lots"])
+
+    charts = charts_module.build_charts(domain)
+
+    assert [lib["library_name"] for lib in charts["libraries"]] == ["Alpha", "Beta", "Gamma"]
+    series = {s["metric_name"]: s for s in charts["metrics"]}
+    assert set(series) == {"Stars", "Forks", "Size"}
+
+    stars = series["Stars"]
+    assert [(b["label"], b["value"]) for b in stars["bars"]] == [("Beta", 30.0), ("Gamma", 20.0), ("Alpha", 10.0)]
+    assert stars["stats"] == {"min": 10.0, "median": 20.0, "max": 30.0, "mean": 20.0}
+    assert sum(stars["histogram"]["counts"]) == 3
+    assert len(stars["histogram"]["edges"]) == len(stars["histogram"]["counts"]) + 1
+
+    forks = series["Forks"]
+    assert (forks["count"], forks["missing"], forks["invalid"]) == (1, 2, 1)
+    assert forks["stats"]["median"] == 5.0
+
+    size = series["Size"]
+    assert size["bars"] == [] and size["stats"] is None
+
+
+@pytest.mark.django_db
+def test_category_series_average_scaled_values(domain, libs, metrics):
+    set_values(libs, metrics["stars"], [0, 100, 50])
+    set_values(libs, metrics["forks"], [10, 0, None])
+
+    charts = charts_module.build_charts(domain)
+
+    categories = {c["category"]: c for c in charts["categories"]}
+    assert set(categories) == {"Visibility", "Uncategorized"}
+    visibility = categories["Visibility"]
+    assert visibility["metrics"] == ["Forks", "Stars"]
+    assert {row["label"]: row["value"] for row in visibility["libraries"]} == {"Alpha": 0.5, "Beta": 0.5, "Gamma": 0.5}
+    assert visibility["average"] == 0.5
+    assert categories["Uncategorized"]["average"] is None
+
+
+@pytest.mark.django_db
+def test_charts_are_cached_until_domain_data_changes(domain, libs, metrics, monkeypatch, django_capture_on_commit_callbacks):
+    set_values(libs[:1], metrics["stars"], [1])
+    builds = []
+    real_build = charts_module.build_charts
+    monkeypatch.setattr(charts_module, "build_charts", lambda d: builds.append(d) or real_build(d))
+
+    first = charts_module.get_charts(domain)
+    assert charts_module.get_charts(domain) == first
+    assert len(builds) == 1
+
+    version = domain_data_version(domain.domain_ID)
+    with django_capture_on_commit_callbacks(execute=True):
+        upsert_metric_values([LibraryMetricValue(library=libs[1], metric=metrics["stars"], value=7)], ["value"])
+        # Not before commit: other processes would cache the old rows under it
+        assert domain_data_version(domain.domain_ID) == version
+    updated = charts_module.get_charts(domain)
+    assert len(builds) == 2
+    stars = next(s for s in updated["metrics"] if s["metric_name"] == "Stars")
+    assert [b["value"] for b in stars["bars"]] == [7.0, 1.0]
+
+    libs[2].library_name = "Zeta"
+    with django_capture_on_commit_callbacks(execute=True):
+        libs[2].save()
+    assert charts_module.get_charts(domain)["libraries"][-1]["library_name"] == "Zeta"
+
+    libs[0].analysis_status = Library.ANALYSIS_RUNNING
+    libs[0].save(update_fields=["analysis_status"])
+    charts_module.get_charts(domain)
+    assert len(builds) == 3
+
+
+@pytest.mark.django_db
+def test_domain_charts_view(domain, libs, metrics):
+    set_values(libs, metrics["stars"], [3, 2, 1])
+
+    request = APIRequestFactory().get("/x")
+    response = views_module.domain_charts(request, domain_id=domain.domain_ID)
+
+    assert response.status_code == status.HTTP_200_OK
+    stars = next(s for s in response.data["metrics"] if s["metric_name"] == "Stars")
+    assert stars["bars"][0]["label"] == "Alpha"
+
+
+@pytest.mark.django_db
+def test_moving_a_library_refreshes_both_domains(domain, libs, metrics, django_capture_on_commit_callbacks):
+    other = Domain.objects.create(domain_name="Other", description="desc")
+    assert [lib["library_name"] for lib in charts_module.get_charts(domain)["libraries"]] == ["Alpha", "Beta", "Gamma"]
+    assert charts_module.get_charts(other)["libraries"] == []
+
+    libs[1].domain = other
+    with django_capture_on_commit_callbacks(execute=True):
+        libs[1].save()
+
+    assert [lib["library_name"] for lib in charts_module.get_charts(domain)["libraries"]] == ["Alpha", "Gamma"]
+    assert [lib["library_name"] for lib in charts_module.get_charts(other)["libraries"]] == ["Beta"]
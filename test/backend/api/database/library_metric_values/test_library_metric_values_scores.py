@@ -0,0 +1,145 @@
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+
+from api.database.domain.models import Domain
+from api.database.libraries.models import Library
+from api.database.library_metric_values import rescoring
+from api.database.library_metric_values.models import LibraryMetricValue
+from api.database.metrics.models import Metric
+import api.database.library_metric_values.views as views_module
+import api.tasks as tasks_module
+import api.utils.config as config_module
+
+
+def yes_no_rules(yes, no=0):
+    return {"bool": {"yes_no": {"options": ["yes", "no"], "templates": {"standard": {"yes": yes, "no": no}}}}}
+
+
+@pytest.fixture()
+def write_rules(monkeypatch, tmp_path):
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
+    db_dir = tmp_path / "api" / "database"
+    db_dir.mkdir(parents=True)
+    (db_dir / "categories.json").write_text(json.dumps({"Categories": ["Installability", "Maintainability"]}))
+    stamp = [1_000_000_000]
+
+    def write(rules):
+        path = db_dir / "rules.json"
+        path.write_text(json.dumps(rules))
+        stamp[0] += 1_000_000_000
+        os.utime(path, ns=(stamp[0], stamp[0]))
+
+    write(yes_no_rules(2))
+    return write
+
+
+@pytest.fixture()
+def domain():
+    return Domain.objects.create(domain_name="Scores")
+
+
+@pytest.fixture()
+def setup(write_rules, domain):
+    libs = [Library.objects.create(domain=domain, library_name=name) for name in ("A", "B")]
+    docs = Metric.objects.create(
+        metric_name="Docs", category="Installability", value_type="bool", option_category="yes_no", rule="standard"
+    )
+    tests = Metric.objects.create(
+        metric_name="Tests", category="Installability", value_type="bool", option_category="yes_no", rule="standard"
+    )
+    stars = Metric.objects.create(metric_name="Stars", category="Maintainability", value_type="int")
+    for lib, answers in zip(libs, (("yes", "Yes"), ("no", None))):
+        LibraryMetricValue.objects.create(library=lib, metric=docs, value=answers[0])
+        LibraryMetricValue.objects.create(library=lib, metric=tests, value=answers[1])
+        LibraryMetricValue.objects.create(library=lib, metric=stars, value=10)
+    return libs, docs, stars
+
+
+def scores(metric):
+    return dict(LibraryMetricValue.objects.filter(metric=metric).values_list("library__library_name", "score"))
+
+
+@pytest.mark.django_db
+def test_values_are_scored_on_write(setup):
+    _, docs, stars = setup
+
+    assert scores(docs) == {"A": 2.0, "B": 0.0}
+    assert scores(stars) == {"A": None, "B": None}
+
+
+@pytest.mark.django_db
+def test_category_totals_sum_scores_per_library(setup, domain):
+    libs, _, _ = setup
+    totals = rescoring.category_totals(
+        LibraryMetricValue.objects.filter(library__domain=domain), ["Installability", "Maintainability"]
+    )
+
+    assert totals["Installability"] == {libs[0].pk: 4.0, libs[1].pk: 0.0}
+    assert totals["Maintainability"] == {libs[0].pk: 0, libs[1].pk: 0}
+
+
+@pytest.mark.django_db
+def test_rules_change_rescores_only_once(setup, write_rules):
+    _, docs, _ = setup
+    write_rules(yes_no_rules(5, no=-1))
+
+    assert tasks_module.rescore_metric_values_task(None)["updated"] == 6
+    assert scores(docs) == {"A": 5.0, "B": -1.0}
+    assert tasks_module.rescore_metric_values_task(None)["updated"] == 0
+
+
+@pytest.mark.django_db
+def test_metric_rule_change_enqueues_rescore(setup, django_capture_on_commit_callbacks):
+    _, docs, stars = setup
+
+    with patch.object(tasks_module.rescore_metric_values_task, "delay") as delay:
+        with django_capture_on_commit_callbacks(execute=True):
+            stars.description = "unchanged rule"
+            stars.save()
+        delay.assert_not_called()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            docs.rule = "missing"
+            docs.save()
+        delay.assert_called_once_with([str(docs.pk)])
+
+    tasks_module.rescore_metric_values_task([str(docs.pk)])
+    assert scores(docs) == {"A": 0.0, "B": 0.0}
+
+
+@pytest.mark.django_db
+def test_ahp_uses_current_scores(setup, write_rules, domain):
+    request = APIRequestFactory().get("/x")
+    response = views_module.AHPCalculations.as_view()(request, domain_id=domain.domain_ID)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["raw_scores"]["Installability"] == {"A": 4.0, "B": 0.0001}
+
+    # Not rescored in the background yet: the request brings scores up to date
+    write_rules(yes_no_rules(1, no=3))
+    response = views_module.AHPCalculations.as_view()(request, domain_id=domain.domain_ID)
+    assert response.data["raw_scores"]["Installability"] == {"A": 2.0, "B": 3.0}
+    assert response.data["raw_scores"]["Maintainability"] == {"A": 0.0001, "B": 0.0001}
+
+
+@pytest.mark.django_db
+def test_rescoring_reads_metrics_from_the_database(setup, domain):
+    from api.database.metrics.catalog import get_catalog
+
+    _, docs, _ = setup
+    assert get_catalog().get(docs.pk).rule == "standard"
+    # Saved by another process: this one's catalog still has the old rule
+    Metric.objects.filter(pk=docs.pk).update(rule="missing")
+    assert get_catalog().get(docs.pk).rule == "standard"
+
+    tasks_module.rescore_metric_values_task([str(docs.pk)])
+    assert scores(docs) == {"A": 0.0, "B": 0.0}
+
+    LibraryMetricValue.objects.filter(metric=docs).update(scored_version=0, score=7)
+    request = APIRequestFactory().get("/x")
+    response = views_module.AHPCalculations.as_view()(request, domain_id=domain.domain_ID)
+    assert response.data["raw_scores"]["Installability"] == {"A": 2.0, "B": 0.0001}
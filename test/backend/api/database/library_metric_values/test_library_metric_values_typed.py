@@ -0,0 +1,92 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from api.database.domain.models import Domain
+from api.database.libraries.models import Library
+from api.database.library_metric_values.bulk import upsert_metric_values
+from api.database.library_metric_values.models import LibraryMetricValue
+from api.database.library_metric_values.scores import load_rules, rule_points
+from api.database.library_metric_values.typed import typed_values
+from api.database.metrics.models import Metric
+
+
+@pytest.mark.parametrize(
+    "value, value_type, expected",
+    [
+        (12, "int", {"value_number": 12.0, "value_text": "12", "value_date": None, "value_option": "12"}),
+        ("3.5", "float", {"value_number": 3.5, "value_text": "3.5", "value_date": None, "value_option": "3.5"}),
+        ("1000+", "range", {"value_number": None, "value_text": "1000+", "value_date": None, "value_option": "1000+"}),
+        ("inf", "float", {"value_number": None, "value_text": "inf", "value_date": None, "value_option": "inf"}),
+        (" Yes ", "bool", {"value_number": None, "value_text": "Yes", "value_date": None, "value_option": "yes"}),
+        ("42", "text", {"value_number": None, "value_text": "42", "value_date": None, "value_option": "42"}),
+        ("9:05", "time", {"value_number": None, "value_text": "09:05:00", "value_date": None, "value_option": "9:05"}),
+        (None, "int", {"value_number": None, "value_text": None, "value_date": None, "value_option": None}),
+    ],
+)
+def test_typed_values(value, value_type, expected):
+    assert typed_values(value, value_type) == expected
+
+
+def test_typed_values_parse_dates_as_utc():
+    utc = timezone.utc
+    assert typed_values("2024-3-5", "date")["value_date"] == datetime(2024, 3, 5, tzinfo=utc)
+    assert typed_values("2024-03-05T14:30", "datetime")["value_date"] == datetime(2024, 3, 5, 14, 30, tzinfo=utc)
+    assert typed_values("2024-03-05T14:30+02:00", "datetime")["value_date"] == datetime(2024, 3, 5, 12, 30, tzinfo=utc)
+    assert typed_values("soon", "date")["value_date"] is None
+    assert typed_values("2024-03-05", "text")["value_date"] is None
+
+
+def test_typed_text_is_truncated_to_column_length():
+    assert len(typed_values("x" * 1000, "text")["value_text"]) == 255
+
+
+@pytest.mark.django_db
+def test_writes_fill_typed_columns_by_metric_type():
+    domain = Domain.objects.create(domain_name="Typed")
+    lib = Library.objects.create(domain=domain, library_name="Lib")
+    released = Metric.objects.create(metric_name="Released", value_type="date")
+    docs = Metric.objects.create(metric_name="Docs", value_type="bool", option_category="yes_no")
+
+    LibraryMetricValue.objects.create(library=lib, metric=released, value="2023-01-02")
+    upsert_metric_values([LibraryMetricValue(library=lib, metric=docs, value="Yes")], ["value"])
+
+    rows = {row.metric.metric_name: row for row in LibraryMetricValue.objects.select_related("metric")}
+    assert rows["Released"].value_date == datetime(2023, 1, 2, tzinfo=timezone.utc)
+    assert rows["Released"].value_number is None
+    assert rows["Docs"].value_option == "yes"
+    assert rows["Docs"].value_text == "Yes"
+
+
+@pytest.mark.django_db
+def test_scores_match_options_case_insensitively_and_whole_floats_as_ints():
+    # Before typed columns, scoring looked up str(value) exactly, so "Yes"
+    # and 2.0 scored 0; they now score like "yes" and "2"
+    domain = Domain.objects.create(domain_name="Scored")
+    libs = [Library.objects.create(domain=domain, library_name=f"Lib {i}") for i in range(4)]
+    docs = Metric.objects.create(metric_name="Docs", value_type="bool", option_category="yes_no", rule="standard")
+    level = Metric.objects.create(metric_name="Level", value_type="int", option_category="score_0_2", rule="standard")
+    _, rules_data = load_rules()
+    yes_no = rule_points(docs, rules_data)
+    zero_two = rule_points(level, rules_data)
+
+    upsert_metric_values(
+        [
+            LibraryMetricValue(library=libs[0], metric=docs, value="Yes"),
+            LibraryMetricValue(library=libs[1], metric=docs, value=" no "),
+            LibraryMetricValue(library=libs[2], metric=docs, value="maybe"),
+            LibraryMetricValue(library=libs[0], metric=level, value=2.0),
+            LibraryMetricValue(library=libs[1], metric=level, value="2.0"),
+            LibraryMetricValue(library=libs[2], metric=level, value=1),
+        ],
+        ["value"],
+    )
+
+    scores = {(row.library_id, row.metric_id): row.score for row in LibraryMetricValue.objects.all()}
+    assert scores[(libs[0].pk, docs.pk)] == yes_no["yes"]
+    assert scores[(libs[1].pk, docs.pk)] == yes_no["no"]
+    assert scores[(libs[2].pk, docs.pk)] == 0
+    assert scores[(libs[0].pk, level.pk)] == zero_two["2"]
+    # Only numbers are normalized; the text "2.0" is not an option
+    assert scores[(libs[1].pk, level.pk)] == 0
+    assert scores[(libs[2].pk, level.pk)] == zero_two["1"]
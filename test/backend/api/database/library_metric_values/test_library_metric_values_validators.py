@@ -0,0 +1,85 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from api.database.metrics.models import Metric
+import api.database.library_metric_values.validators as validators_module
+import api.utils.config as config_module
+
+
+def write_rules(tmp_path, max_value):
+    path = tmp_path / "api" / "database"
+    path.mkdir(parents=True, exist_ok=True)
+    rules = {"int": {"scale": {"templates": {"bounded": {"min": 1, "max": max_value}}}}}
+    (path / "rules.json").write_text(json.dumps(rules))
+
+
+@pytest.fixture()
+def bounded(monkeypatch, tmp_path):
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
+    write_rules(tmp_path, 10)
+    return Metric.objects.create(
+        metric_name="Score",
+        metric_key="score",
+        value_type="int",
+        option_category="scale",
+        rule="bounded",
+    )
+
+
+@pytest.mark.django_db
+def test_validator_is_compiled_once_and_rebuilt_on_metric_save(bounded, monkeypatch, django_capture_on_commit_callbacks):
+    compiled = []
+    original = validators_module.compile_validator
+
+    def counting(metric, rules_data):
+        compiled.append(metric.metric_ID)
+        return original(metric, rules_data)
+
+    monkeypatch.setattr(validators_module, "compile_validator", counting)
+
+    validator = validators_module.get_validator(bounded)
+    assert validator("5") == (None, 5)
+    assert validators_module.get_validator(bounded) is validator
+    assert len(compiled) == 1
+
+    bounded.value_type = "float"
+    with django_capture_on_commit_callbacks(execute=True):
+        bounded.save()
+
+    assert validators_module.get_validator(bounded)("5") == (None, 5.0)
+    assert len(compiled) == 2
+
+
+@pytest.mark.django_db
+def test_validator_picks_up_rules_changes(bounded, tmp_path):
+    assert validators_module.get_validator(bounded)("20") == ("Score must be <= 10.", None)
+
+    write_rules(tmp_path, 50)
+
+    assert validators_module.get_validator(bounded)("20") == (None, 20)
+
+
+@pytest.mark.parametrize(
+    "value_type, fmt, samples",
+    [
+        ("date", ["%Y-%m-%d"], ["2026-03-18", "2026-3-8", "2026-02-30", "26-03-18", "2026-03-18x"]),
+        ("time", ["%H:%M", "%H:%M:%S"], ["14:30", "9:05", "14:30:59", "24:00", "14:30:61", "1430"]),
+        ("datetime", ["%Y-%m-%dT%H:%M"], ["2026-03-18T14:30", "2026-03-18t14:30", "2026-02-29T10:00", "2026/03/18 14:30"]),
+    ],
+)
+def test_compiled_formats_match_strptime(value_type, fmt, samples):
+    metric = Metric(metric_name="M", metric_key="m", value_type=value_type)
+    validator = validators_module.compile_validator(metric, {})
+
+    for sample in samples:
+        expected = False
+        for f in fmt:
+            try:
+                datetime.strptime(sample, f)
+                expected = True
+            except ValueError:
+                pass
+        error, _ = validator(sample)
+        assert (error is None) == expected, sample
@@ -12,6 +12,10 @@ from api.database.libraries.models import Library
 from api.database.metrics.models import Metric
 from api.database.library_metric_values.models import LibraryMetricValue
 import api.database.library_metric_values.views as views_module
+import api.utils.analysis as analysis_module
+from api.database.metrics.catalog import get_catalog
+from api.database.library_metric_values.bulk import upsert_metric_values
+import api.utils.config as config_module
 
 
 @pytest.fixture()
@@ -259,7 +263,7 @@ def test_validate_metric_value_accepts_bounded_int_in_range(metric_int_bounded,
 
     (tmp_path / "api" / "database").mkdir(parents=True, exist_ok=True)
     (tmp_path / "api" / "database" / "rules.json").write_text(json.dumps(rules))
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     error, value = views_module.validate_metric_value(metric_int_bounded, "7")
     assert error is None
@@ -292,7 +296,7 @@ def test_validate_metric_value_rejects_bounded_int_below_min(metric_int_bounded,
 
     (tmp_path / "api" / "database").mkdir(parents=True, exist_ok=True)
     (tmp_path / "api" / "database" / "rules.json").write_text(json.dumps(rules))
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     error, value = views_module.validate_metric_value(metric_int_bounded, "0")
     assert error == "Maturity Score must be >= 1."
@@ -325,7 +329,7 @@ def test_validate_metric_value_rejects_bounded_int_above_max(metric_int_bounded,
 
     (tmp_path / "api" / "database").mkdir(parents=True, exist_ok=True)
     (tmp_path / "api" / "database" / "rules.json").write_text(json.dumps(rules))
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     error, value = views_module.validate_metric_value(metric_int_bounded, "11")
     assert error == "Maturity Score must be <= 10."
@@ -358,7 +362,7 @@ def test_validate_metric_value_accepts_free_int(metric_int_other, monkeypatch, t
 
     (tmp_path / "api" / "database").mkdir(parents=True, exist_ok=True)
     (tmp_path / "api" / "database" / "rules.json").write_text(json.dumps(rules))
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     error, value = views_module.validate_metric_value(metric_int_other, "2120234324")
     assert error is None
@@ -494,17 +498,11 @@ def test_analyze_library_enqueue_raises_500_and_marks_failed(rf, lib_a, monkeypa
 @pytest.mark.django_db
 def test_analyze_domain_libraries_mixed_results(rf, domain, lib_a, lib_b, monkeypatch, user_factory):
     user = user_factory("test@example.com", "testuser")
+    lib_b.github_url = ""
+    lib_b.save(update_fields=["github_url"])
 
-    def fake_enqueue(lib):
-        if lib.library_name == "A":
-            return {"analysis_task_id": "tA", "gitstats_task_id": "gA"}
-        if lib.library_name == "B":
-            lib.analysis_error = "nope"
-            lib.save(update_fields=["analysis_error"])
-            return None
-        return {"analysis_task_id": "tX", "gitstats_task_id": "gX"}
-
-    monkeypatch.setattr(views_module, "enqueue_library_analysis", fake_enqueue)
+    fake_group = Mock()
+    monkeypatch.setattr(analysis_module, "group", fake_group)
 
     req = rf.post("/x", {}, format="json")
     force_authenticate(req, user=user)
@@ -514,29 +512,32 @@ def test_analyze_domain_libraries_mixed_results(rf, domain, lib_a, lib_b, monkey
     body = resp.data
     assert body["message"] == "Analysis queued for domain libraries."
     assert body["total"] == 2
+    assert body["deferred"] == []
 
     queued = body["queued"]
     failed = body["failed"]
 
+    lib_a.refresh_from_db()
     assert len(queued) == 1
     assert queued[0]["library_id"] == str(lib_a.library_ID)
-    assert queued[0]["analysis_task_id"] == "tA"
-    assert queued[0]["gitstats_task_id"] == "gA"
+    assert queued[0]["analysis_task_id"] == lib_a.analysis_task_id
+    assert queued[0]["gitstats_task_id"] == lib_a.gitstats_task_id
 
     assert len(failed) == 1
     assert failed[0]["library_id"] == str(lib_b.library_ID)
-    assert failed[0]["error"] == "nope"
+    assert failed[0]["error"] == "Library GitHub URL is missing."
+
+    fake_group.assert_called_once()
+    fake_group.return_value.apply_async.assert_called_once()
 
 
 @pytest.mark.django_db
 def test_analyze_domain_libraries_exception_marks_failed(rf, domain, lib_a, lib_b, monkeypatch, user_factory):
-    def fake_enqueue(lib):
-        if lib.library_name == "A":
-            raise RuntimeError("explode")
-        return {"analysis_task_id": "tB", "gitstats_task_id": "gB"}
+    fake_group = Mock()
+    fake_group.return_value.apply_async.side_effect = RuntimeError("explode")
+    monkeypatch.setattr(analysis_module, "group", fake_group)
 
     user = user_factory("test@example.com", "testuser")
-    monkeypatch.setattr(views_module, "enqueue_library_analysis", fake_enqueue)
 
     req = rf.post("/x", {}, format="json")
     force_authenticate(req, user=user)
@@ -545,16 +546,138 @@ def test_analyze_domain_libraries_exception_marks_failed(rf, domain, lib_a, lib_
     assert resp.status_code == status.HTTP_202_ACCEPTED
     body = resp.data
 
-    assert len(body["queued"]) == 1
-    assert body["queued"][0]["library_id"] == str(lib_b.library_ID)
-
-    assert len(body["failed"]) == 1
-    assert body["failed"][0]["library_id"] == str(lib_a.library_ID)
-    assert body["failed"][0]["error"] == "explode"
+    assert body["queued"] == []
+    assert {f["library_id"] for f in body["failed"]} == {
+        str(lib_a.library_ID),
+        str(lib_b.library_ID),
+    }
+    assert all(f["error"] == "explode" for f in body["failed"])
 
     lib_a.refresh_from_db()
     assert lib_a.analysis_status == Library.ANALYSIS_FAILED
     assert lib_a.analysis_error == "explode"
+    assert lib_a.analysis_task_id is None
+
+
+@pytest.fixture()
+def ranked_libraries(domain, metric_stars):
+    libs = {}
+    for name, stars, description in (("Gamma", 5, "plots"), ("Alpha", "30", "numerics"), ("Beta", None, "plots"), ("Delta", 12, None)):
+        libs[name] = Library.objects.create(domain=domain, library_name=name, description=description)
+        LibraryMetricValue.objects.create(library=libs[name], metric=metric_stars, value=stars)
+    return libs
+
+
+def comparison(rf, domain, query=""):
+    return views_module.domain_comparison(rf.get(f"/x{query}"), domain_id=str(domain.domain_ID))
+
+
+@pytest.mark.django_db
+def test_metric_value_writes_keep_value_number_in_sync(lib_a, metric_stars, metric_forks):
+    value = LibraryMetricValue.objects.create(library=lib_a, metric=metric_stars, value="42")
+    assert LibraryMetricValue.objects.get(pk=value.pk).value_number == 42.0
+
+    value.value = "n/a"
+    value.save(update_fields=["value"])
+    assert LibraryMetricValue.objects.get(pk=value.pk).value_number is None
+
+    upsert_metric_values([LibraryMetricValue(library=lib_a, metric=metric_stars, value=7.5)], ["value"])
+    upsert_metric_values([LibraryMetricValue(library=lib_a, metric=metric_forks, value=True)], ["value"])
+    assert dict(LibraryMetricValue.objects.values_list("metric__metric_name", "value_number")) == {
+        "Stars Count": 7.5,
+        "Forks Count": None,
+    }
+
+
+@pytest.mark.django_db
+def test_domain_comparison_sorts_by_metric_in_database(rf, domain, metric_stars, ranked_libraries):
+    resp = comparison(rf, domain, "?sort=Stars Count&order=desc")
+
+    assert resp.status_code == status.HTTP_200_OK
+    assert [row["library_name"] for row in resp.data["libraries"]] == ["Alpha", "Delta", "Gamma", "Beta"]
+    assert resp.data["count"] == 4
+
+    resp = comparison(rf, domain, f"?sort={metric_stars.metric_ID}")
+    assert [row["library_name"] for row in resp.data["libraries"]] == ["Gamma", "Delta", "Alpha", "Beta"]
+
+    resp = comparison(rf, domain, "?order=desc")
+    assert [row["library_name"] for row in resp.data["libraries"]] == ["Gamma", "Delta", "Beta", "Alpha"]
+
+
+@pytest.mark.django_db
+def test_domain_comparison_sorts_and_filters_dates(rf, domain):
+    released = Metric.objects.create(metric_name="Released", value_type="date")
+    for name, day in (("Old", "2019-05-01"), ("New", "2024-1-15"), ("Mid", "2021-12-31"), ("Never", None)):
+        lib = Library.objects.create(domain=domain, library_name=name)
+        LibraryMetricValue.objects.create(library=lib, metric=released, value=day)
+
+    resp = comparison(rf, domain, "?sort=Released&order=desc")
+    assert [row["library_name"] for row in resp.data["libraries"]] == ["New", "Mid", "Old", "Never"]
+
+    resp = comparison(rf, domain, "?range=Released:2020-01-01:")
+    assert [row["library_name"] for row in resp.data["libraries"]] == ["Mid", "New"]
+
+    resp = comparison(rf, domain, "?range=Released:yesterday:")
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_domain_comparison_orders_range_metrics_by_option_position(rf, domain, metric_stars):
+    files = Metric.objects.create(metric_name="Files", value_type="range", option_category="file_ranges")
+    Metric.objects.create(metric_name="License", value_type="text")
+    for name, band in (("Huge", "1000+"), ("Small", "0-9"), ("Mid", "50-99"), ("Unknown", None)):
+        lib = Library.objects.create(domain=domain, library_name=name)
+        LibraryMetricValue.objects.create(library=lib, metric=files, value=band)
+
+    # As text, "1000+" would sort before "50-99"
+    resp = comparison(rf, domain, "?sort=Files")
+    assert [row["library_name"] for row in resp.data["libraries"]] == ["Small", "Mid", "Huge", "Unknown"]
+
+    resp = comparison(rf, domain, "?range=Files:10-49:")
+    assert [row["library_name"] for row in resp.data["libraries"]] == ["Huge", "Mid"]
+    resp = comparison(rf, domain, "?range=Files::50-99")
+    assert [row["library_name"] for row in resp.data["libraries"]] == ["Mid", "Small"]
+
+    assert comparison(rf, domain, "?range=Files:10:").status_code == status.HTTP_400_BAD_REQUEST
+    assert comparison(rf, domain, "?range=License:3:").status_code == status.HTTP_400_BAD_REQUEST
+    assert comparison(rf, domain, "?range=License:MIT:").status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_domain_comparison_filters_by_range_and_search(rf, domain, ranked_libraries):
+    resp = comparison(rf, domain, "?range=Stars Count:10:")
+    assert [row["library_name"] for row in resp.data["libraries"]] == ["Alpha", "Delta"]
+
+    resp = comparison(rf, domain, "?range=Stars Count::12&search=plot")
+    assert [row["library_name"] for row in resp.data["libraries"]] == ["Gamma"]
+
+    resp = comparison(rf, domain, "?search=ALPHA")
+    assert [row["library_name"] for row in resp.data["libraries"]] == ["Alpha"]
+    assert resp.data["libraries"][0]["metrics"]["Stars Count"] == "30"
+
+
+@pytest.mark.django_db
+def test_domain_comparison_paginates(rf, domain, ranked_libraries, django_assert_num_queries):
+    get_catalog()
+    # domain, count, page, values
+    with django_assert_num_queries(4):
+        resp = comparison(rf, domain, "?sort=Stars Count&order=desc&limit=2&offset=1")
+
+    assert [row["library_name"] for row in resp.data["libraries"]] == ["Delta", "Gamma"]
+    assert (resp.data["count"], resp.data["limit"], resp.data["offset"]) == (4, 2, 1)
+    assert {row["metrics"]["Stars Count"] for row in resp.data["libraries"]} == {12, 5}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "query",
+    ["?sort=Unknown", "?order=sideways", "?limit=-1", "?offset=x", "?range=Stars Count", "?range=Stars Count:low:"],
+)
+def test_domain_comparison_rejects_bad_parameters(rf, domain, metric_stars, query):
+    resp = comparison(rf, domain, query)
+
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    assert "error" in resp.data
 
 
 @pytest.mark.django_db
@@ -656,6 +779,39 @@ def test_library_metric_value_update_creates_value_and_evidence(rf, lib_a, metri
     ).count() == 0
 
 
+@pytest.mark.django_db
+def test_library_metric_value_update_uses_constant_queries(
+    rf, lib_a, metric_stars, metric_forks, user_factory, django_assert_num_queries
+):
+    user = user_factory("test@example.com", "testuser")
+    view = views_module.LibraryMetricValueUpdateView.as_view()
+    LibraryMetricValue.objects.create(library=lib_a, metric=metric_forks, value=1, evidence="old")
+
+    req = rf.post(
+        "/x",
+        {
+            "metrics": {
+                "Stars Count": 3,
+                "Stars Count_evidence": "e1",
+                "Stars Count_description": "d1",
+                "Forks Count": 4,
+                "Forks Count_evidence": "e2",
+                "Forks Count_description": "d2",
+            }
+        },
+        format="json",
+    )
+    force_authenticate(req, user=user)
+    get_catalog()
+    # library lookup, savepoint, upsert, release savepoint
+    with django_assert_num_queries(4):
+        resp = view(req, library_id=str(lib_a.library_ID))
+
+    assert resp.status_code == status.HTTP_200_OK
+    forks = LibraryMetricValue.objects.get(library=lib_a, metric=metric_forks)
+    assert (forks.value, forks.evidence, forks.description) == (4, "e2", "d2")
+
+
 @pytest.mark.django_db
 def test_library_metric_value_update_accepts_valid_date(rf, lib_a, metric_date, user_factory):
     view = views_module.LibraryMetricValueUpdateView.as_view()
@@ -800,7 +956,7 @@ def test_library_metric_value_update_rejects_bounded_int_out_of_range(
 
     (tmp_path / "api" / "database").mkdir(parents=True, exist_ok=True)
     (tmp_path / "api" / "database" / "rules.json").write_text(json.dumps(rules))
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     view = views_module.LibraryMetricValueUpdateView.as_view()
     user = user_factory("test@example.com", "testuser")
@@ -845,7 +1001,7 @@ def test_library_metric_value_update_accepts_free_int(
 
     (tmp_path / "api" / "database").mkdir(parents=True, exist_ok=True)
     (tmp_path / "api" / "database" / "rules.json").write_text(json.dumps(rules))
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     view = views_module.LibraryMetricValueUpdateView.as_view()
     user = user_factory("test@example.com", "testuser")
@@ -940,7 +1096,8 @@ def test_metric_value_bulk_update_success(rf, lib_a, metric_stars, metric_forks,
     resp = view(req)
 
     assert resp.status_code == status.HTTP_200_OK
-    assert resp.data["status"] == "Successfully updated 3 metric values."
+    assert resp.data["status"] == "Successfully updated 2 metric values."
+    assert [r["status"] for r in resp.data["results"]] == ["updated", "updated", "skipped"]
 
     stars = LibraryMetricValue.objects.get(library=lib_a, metric=metric_stars)
     assert stars.value == 99
@@ -949,6 +1106,34 @@ def test_metric_value_bulk_update_success(rf, lib_a, metric_stars, metric_forks,
     assert forks.value is None
 
 
+@pytest.mark.django_db
+def test_metric_value_bulk_update_reports_per_item_errors(
+    rf, lib_a, metric_stars, metric_forks, user_factory, django_assert_max_num_queries
+):
+    view = views_module.MetricValueBulkUpdateView.as_view()
+
+    updates = [
+        {"library_id": str(lib_a.library_ID), "metric_id": str(metric_stars.metric_ID), "value": 7},
+        {"library_id": str(lib_a.library_ID), "metric_id": str(metric_forks.metric_ID), "value": "abc"},
+        {"library_id": "not-a-uuid", "metric_id": str(metric_forks.metric_ID), "value": 1},
+    ]
+    user = user_factory("test@example.com", "testuser")
+    req = rf.post("/x", updates, format="json")
+    force_authenticate(req, user=user)
+    with django_assert_max_num_queries(6):
+        resp = view(req)
+
+    assert resp.status_code == status.HTTP_207_MULTI_STATUS
+    assert resp.data["updated"] == 1
+    assert resp.data["failed"] == 2
+    assert resp.data["error"] == "Forks Count must be a whole number."
+    assert [r["status"] for r in resp.data["results"]] == ["updated", "error", "error"]
+    assert resp.data["results"][2]["error"] == "Library not found."
+
+    assert LibraryMetricValue.objects.get(library=lib_a, metric=metric_stars).value == 7
+    assert not LibraryMetricValue.objects.filter(library=lib_a, metric=metric_forks).exists()
+
+
 @pytest.mark.django_db
 def test_metric_value_bulk_update_accepts_valid_date(rf, lib_a, metric_date, user_factory):
     view = views_module.MetricValueBulkUpdateView.as_view()
@@ -1093,7 +1278,7 @@ def test_metric_value_bulk_update_rejects_bounded_int_out_of_range(
 
     (tmp_path / "api" / "database").mkdir(parents=True, exist_ok=True)
     (tmp_path / "api" / "database" / "rules.json").write_text(json.dumps(rules))
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     view = views_module.MetricValueBulkUpdateView.as_view()
 
@@ -1138,7 +1323,7 @@ def test_metric_value_bulk_update_accepts_free_int(
 
     (tmp_path / "api" / "database").mkdir(parents=True, exist_ok=True)
     (tmp_path / "api" / "database" / "rules.json").write_text(json.dumps(rules))
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     view = views_module.MetricValueBulkUpdateView.as_view()
 
@@ -1172,7 +1357,8 @@ def test_metric_value_bulk_update_skips_gitstats_report_metric(rf, lib_a, metric
     resp = view(req)
 
     assert resp.status_code == status.HTTP_200_OK
-    assert resp.data["status"] == "Successfully updated 1 metric values."
+    assert resp.data["status"] == "Successfully updated 0 metric values."
+    assert resp.data["results"][0]["status"] == "skipped"
     assert LibraryMetricValue.objects.filter(library=lib_a, metric=metric_gitstats_report).count() == 0
 
 
@@ -1185,7 +1371,7 @@ def test_ahp_calculations_basic(rf, domain, lib_a, lib_b, monkeypatch, tmp_path,
     (tmp_path / "api" / "database" / "rules.json").write_text(json.dumps(rules))
     (tmp_path / "api" / "database" / "categories.json").write_text(json.dumps(categories))
 
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     m = Metric.objects.create(
         metric_name="Score",
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from api.database.metrics.catalog import get_catalog
+from api.database.metrics.models import Metric, MetricOrder
+from api.database.metrics.ordering import apply_display_order
+import api.utils.config as config_module
+
+
+@pytest.fixture()
+def categories(monkeypatch, tmp_path):
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
+    db_dir = tmp_path / "api" / "database"
+    db_dir.mkdir(parents=True)
+    (db_dir / "categories.json").write_text(json.dumps({"Categories": ["Visibility", "Installability"]}))
+    return db_dir / "categories.json"
+
+
+@pytest.fixture()
+def metrics():
+    return {
+        name: Metric.objects.create(metric_name=name, category=category, metric_key=key)
+        for name, category, key in (
+            ("Stars", "Visibility", "stars"),
+            ("Forks", "Visibility", "forks"),
+            ("Installer", "Installability", None),
+        )
+    }
+
+
+@pytest.mark.django_db
+def test_catalog_groups_metrics(categories, metrics):
+    apply_display_order(
+        {
+            "Visibility": [str(metrics["Forks"].metric_ID), str(metrics["Stars"].metric_ID)],
+            "Installability": [str(metrics["Installer"].metric_ID)],
+        }
+    )
+
+    catalog = get_catalog()
+
+    assert [m.metric_name for m in catalog.metrics] == ["Forks", "Stars", "Installer"]
+    assert [m.metric_name for m in catalog.for_category("Visibility")] == ["Forks", "Stars"]
+    assert catalog.for_category("Unknown") == []
+    assert catalog.by_key["stars"].metric_name == "Stars"
+    assert catalog.by_name["Installer"].category == "Installability"
+    assert catalog.get(metrics["Forks"].metric_ID).metric_name == "Forks"
+
+
+@pytest.mark.django_db
+def test_catalog_is_reused_until_definitions_change(
+    categories, metrics, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    catalog = get_catalog()
+    with django_assert_num_queries(0):
+        assert get_catalog() is catalog
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Metric.objects.create(metric_name="Issues", category="Visibility")
+        # Other processes must not see a new version before the rows commit
+        assert get_catalog() is catalog
+    updated = get_catalog()
+    assert updated is not catalog
+    assert "Issues" in updated.by_name
+
+    with django_capture_on_commit_callbacks(execute=True):
+        apply_display_order({"Visibility": [str(metrics["Stars"].metric_ID)]})
+        assert get_catalog() is updated
+    reordered = get_catalog()
+    assert reordered.metrics[0].metric_name == "Stars"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        MetricOrder.objects.create(category_order={})
+    assert get_catalog() is not reordered
+
+    with django_capture_on_commit_callbacks(execute=True):
+        metrics["Forks"].delete()
+    assert "Forks" not in get_catalog().by_name
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.database.metrics.models import Metric, MetricOrder
+from api.database.metrics.ordering import apply_display_order, display_positions
+import api.database.metrics.views as views_module
+import api.utils.config as config_module
+
+
+@pytest.fixture()
+def categories(monkeypatch, tmp_path):
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
+    db_dir = tmp_path / "api" / "database"
+    db_dir.mkdir(parents=True)
+    (db_dir / "categories.json").write_text(json.dumps({"Categories": ["Visibility", "Installability"]}))
+    return db_dir / "categories.json"
+
+
+@pytest.fixture()
+def metrics():
+    return {
+        name: Metric.objects.create(metric_name=name, category=category)
+        for name, category in (
+            ("Stars", "Visibility"),
+            ("Forks", "Visibility"),
+            ("Installer", "Installability"),
+            ("Unplaced", "Visibility"),
+        )
+    }
+
+
+def ids(*metrics):
+    return [str(m.metric_ID) for m in metrics]
+
+
+def test_display_positions_walk_categories_in_config_order():
+    order = {"Second": ["a"], "First": ["c", "b"], "Unknown": ["d"]}
+
+    assert display_positions(order, ["First", "Second"]) == {
+        "c": (0, 0),
+        "b": (0, 1),
+        "a": (1, 2),
+    }
+
+
+@pytest.mark.django_db
+def test_apply_display_order_writes_columns(categories, metrics):
+    placed = apply_display_order(
+        {
+            "Installability": ids(metrics["Installer"]),
+            "Visibility": ids(metrics["Forks"], metrics["Stars"]),
+        }
+    )
+
+    assert placed == 3
+    assert [m.metric_name for m in Metric.objects.in_display_order()] == [
+        "Forks",
+        "Stars",
+        "Installer",
+        "Unplaced",
+    ]
+    installer = Metric.objects.get(pk=metrics["Installer"].pk)
+    assert (installer.category_rank, installer.display_position) == (1, 2)
+    unplaced = Metric.objects.get(pk=metrics["Unplaced"].pk)
+    assert (unplaced.category_rank, unplaced.display_position) == (None, None)
+
+
+@pytest.mark.django_db
+def test_reorder_view_updates_display_position(categories, metrics):
+    user = get_user_model().objects.create_user(username="u", email="u@example.com", password="password123", role="admin")
+    req = APIRequestFactory().post(
+        "/x",
+        {"category_order": {"Visibility": ids(metrics["Unplaced"], metrics["Stars"])}},
+        format="json",
+    )
+    force_authenticate(req, user=user)
+
+    resp = views_module.MetricReorderView.as_view()(req)
+
+    assert resp.status_code == status.HTTP_200_OK
+    assert [m.metric_name for m in Metric.objects.in_display_order()][:2] == ["Unplaced", "Stars"]
+
+
+@pytest.mark.django_db
+def test_populate_metric_order_positions_only_keeps_saved_order(categories, metrics):
+    MetricOrder.objects.create(pk=1, category_order={"Visibility": ids(metrics["Stars"], metrics["Forks"])})
+
+    call_command("populate_metric_order", "--positions-only")
+
+    assert MetricOrder.objects.get(pk=1).category_order == {"Visibility": ids(metrics["Stars"], metrics["Forks"])}
+    assert [m.metric_name for m in Metric.objects.in_display_order()][:2] == ["Stars", "Forks"]
+
+    call_command("populate_metric_order")
+
+    # Alphabetical within category, categories in categories.json order
+    assert [m.metric_name for m in Metric.objects.in_display_order()] == ["Forks", "Stars", "Unplaced", "Installer"]
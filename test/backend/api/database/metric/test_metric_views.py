@@ -8,6 +8,7 @@ from rest_framework.test import force_authenticate
 
 from api.database.metrics.models import Metric
 import api.database.metrics.views as views_module
+import api.utils.config as config_module
 
 
 @pytest.fixture()
@@ -46,7 +47,7 @@ def test_load_auto_metric_definitions_reads_json(monkeypatch, tmp_path):
 
     (tmp_path / "api" / "database").mkdir(parents=True, exist_ok=True)
     (tmp_path / "api" / "database" / "auto_metrics.json").write_text(json.dumps(data))
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     result = views_module.load_auto_metric_definitions()
     assert result == data
@@ -77,7 +78,7 @@ def test_auto_metric_options_view_returns_grouped_options(rf, monkeypatch, tmp_p
 
     (tmp_path / "api" / "database").mkdir(parents=True, exist_ok=True)
     (tmp_path / "api" / "database" / "auto_metrics.json").write_text(json.dumps(data))
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     view = views_module.AutoMetricOptionsView.as_view()
     user = user_factory("test@example.com", "testuser")
@@ -106,7 +107,7 @@ def test_auto_metric_options_view_returns_grouped_options(rf, monkeypatch, tmp_p
 
 @pytest.mark.django_db
 def test_auto_metric_options_view_returns_404_when_file_missing(rf, monkeypatch, tmp_path, user_factory):
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     view = views_module.AutoMetricOptionsView.as_view()
     user = user_factory("test@example.com", "testuser")
@@ -122,7 +123,7 @@ def test_auto_metric_options_view_returns_404_when_file_missing(rf, monkeypatch,
 def test_auto_metric_options_view_returns_500_for_invalid_json(rf, monkeypatch, tmp_path, user_factory):
     (tmp_path / "api" / "database").mkdir(parents=True, exist_ok=True)
     (tmp_path / "api" / "database" / "auto_metrics.json").write_text("{bad json")
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     view = views_module.AutoMetricOptionsView.as_view()
     user = user_factory("test@example.com", "testuser")
@@ -148,7 +149,7 @@ def test_metric_rules_view_returns_json_data(rf, monkeypatch, tmp_path, user_fac
 
     (tmp_path / "api" / "database").mkdir(parents=True, exist_ok=True)
     (tmp_path / "api" / "database" / "rules.json").write_text(json.dumps(rules_data))
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     view = views_module.MetricRulesView.as_view()
     user = user_factory("test@example.com", "testuser")
@@ -162,7 +163,7 @@ def test_metric_rules_view_returns_json_data(rf, monkeypatch, tmp_path, user_fac
 
 @pytest.mark.django_db
 def test_metric_rules_view_returns_404_when_file_missing(rf, monkeypatch, tmp_path, user_factory):
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     view = views_module.MetricRulesView.as_view()
     user = user_factory("test@example.com", "testuser")
@@ -178,7 +179,7 @@ def test_metric_rules_view_returns_404_when_file_missing(rf, monkeypatch, tmp_pa
 def test_metric_rules_view_returns_500_for_invalid_json(rf, monkeypatch, tmp_path, user_factory):
     (tmp_path / "api" / "database").mkdir(parents=True, exist_ok=True)
     (tmp_path / "api" / "database" / "rules.json").write_text("{bad json")
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     view = views_module.MetricRulesView.as_view()
     user = user_factory("test@example.com", "testuser")
@@ -198,7 +199,7 @@ def test_metric_category_view_returns_json_data(rf, monkeypatch, tmp_path, user_
 
     (tmp_path / "api" / "database").mkdir(parents=True, exist_ok=True)
     (tmp_path / "api" / "database" / "categories.json").write_text(json.dumps(categories_data))
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     view = views_module.MetricCategoryView.as_view()
     user = user_factory("test@example.com", "testuser")
@@ -212,7 +213,7 @@ def test_metric_category_view_returns_json_data(rf, monkeypatch, tmp_path, user_
 
 @pytest.mark.django_db
 def test_metric_category_view_returns_404_when_file_missing(rf, monkeypatch, tmp_path, user_factory):
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     view = views_module.MetricCategoryView.as_view()
     user = user_factory("test@example.com", "testuser")
@@ -228,7 +229,7 @@ def test_metric_category_view_returns_404_when_file_missing(rf, monkeypatch, tmp
 def test_metric_category_view_returns_500_for_invalid_json(rf, monkeypatch, tmp_path, user_factory):
     (tmp_path / "api" / "database").mkdir(parents=True, exist_ok=True)
     (tmp_path / "api" / "database" / "categories.json").write_text("{bad json")
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     view = views_module.MetricCategoryView.as_view()
     user = user_factory("test@example.com", "testuser")
@@ -303,7 +304,7 @@ def test_metric_list_create_view_creates_automatic_metric_from_definition(rf, mo
 
     (tmp_path / "api" / "database").mkdir(parents=True, exist_ok=True)
     (tmp_path / "api" / "database" / "auto_metrics.json").write_text(json.dumps(auto_metrics))
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     view = views_module.MetricListCreateView.as_view()
     user = user_factory("test@example.com", "testuser")
@@ -345,7 +346,7 @@ def test_metric_list_create_view_rejects_automatic_metric_without_metric_key(rf,
 
     (tmp_path / "api" / "database").mkdir(parents=True, exist_ok=True)
     (tmp_path / "api" / "database" / "auto_metrics.json").write_text(json.dumps(auto_metrics))
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     view = views_module.MetricListCreateView.as_view()
     user = user_factory("test@example.com", "testuser")
@@ -378,7 +379,7 @@ def test_metric_list_create_view_rejects_invalid_metric_key(rf, monkeypatch, tmp
 
     (tmp_path / "api" / "database").mkdir(parents=True, exist_ok=True)
     (tmp_path / "api" / "database" / "auto_metrics.json").write_text(json.dumps(auto_metrics))
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     view = views_module.MetricListCreateView.as_view()
     user = user_factory("test@example.com", "testuser")
@@ -412,7 +413,7 @@ def test_metric_list_create_view_rejects_metric_key_with_wrong_source_type(rf, m
 
     (tmp_path / "api" / "database").mkdir(parents=True, exist_ok=True)
     (tmp_path / "api" / "database" / "auto_metrics.json").write_text(json.dumps(auto_metrics))
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     view = views_module.MetricListCreateView.as_view()
     user = user_factory("test@example.com", "testuser")
@@ -437,7 +438,7 @@ def test_metric_list_create_view_rejects_metric_key_with_wrong_source_type(rf, m
 def test_metric_list_create_view_returns_error_when_auto_metrics_file_missing_for_automatic_metric(
     rf, monkeypatch, tmp_path, user_factory
 ):
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     view = views_module.MetricListCreateView.as_view()
     user = user_factory("test@example.com", "testuser")
@@ -464,7 +465,7 @@ def test_metric_list_create_view_returns_error_when_auto_metrics_file_invalid_fo
 ):
     (tmp_path / "api" / "database").mkdir(parents=True, exist_ok=True)
     (tmp_path / "api" / "database" / "auto_metrics.json").write_text("{bad json")
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     view = views_module.MetricListCreateView.as_view()
     user = user_factory("test@example.com", "testuser")
@@ -552,7 +553,7 @@ def test_metric_retrieve_update_destroy_view_updates_automatic_metric_value_type
 
     (tmp_path / "api" / "database").mkdir(parents=True, exist_ok=True)
     (tmp_path / "api" / "database" / "auto_metrics.json").write_text(json.dumps(auto_metrics))
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     metric = Metric.objects.create(
         metric_name="Repository Forks",
@@ -596,7 +597,7 @@ def test_metric_retrieve_update_destroy_view_rejects_invalid_metric_key_on_updat
 
     (tmp_path / "api" / "database").mkdir(parents=True, exist_ok=True)
     (tmp_path / "api" / "database" / "auto_metrics.json").write_text(json.dumps(auto_metrics))
-    monkeypatch.setattr(views_module.settings, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
 
     metric = Metric.objects.create(
         metric_name="Repository Forks",
@@ -0,0 +1,95 @@
+from datetime import timedelta
+from unittest.mock import Mock
+
+import pytest
+from django.utils import timezone
+
+from api.database.domain.models import Domain
+from api.database.libraries.models import Library
+from api.database.library_metric_values.models import LibraryMetricValue
+from api.database.metrics.models import Metric
+from api.database.repository_cache.models import RepositoryAnalysis
+import api.database.repository_cache.services as cache_services
+import api.tasks as tasks_module
+
+SHA = "a" * 40
+
+
+@pytest.fixture()
+def domains():
+    return (
+        Domain.objects.create(domain_name="D1", description="desc"),
+        Domain.objects.create(domain_name="D2", description="desc"),
+    )
+
+
+@pytest.fixture()
+def stars():
+    return Metric.objects.create(
+        metric_name="Stars", metric_key="stars_count", value_type="int"
+    )
+
+
+def test_resolve_head_sha_returns_none_on_api_error(monkeypatch):
+    def boom(path, params=None):
+        raise RuntimeError("GitHub API error 409")
+
+    monkeypatch.setattr(cache_services, "github_get", boom)
+    assert cache_services.resolve_head_sha("org/repo") is None
+
+    monkeypatch.setattr(
+        cache_services,
+        "github_get",
+        lambda path, params=None: Mock(json=Mock(return_value=[{"sha": SHA}])),
+    )
+    assert cache_services.resolve_head_sha("org/repo") == SHA
+
+
+@pytest.mark.django_db
+def test_expired_entries_are_ignored_and_purged(monkeypatch):
+    monkeypatch.setattr(cache_services.settings, "REPOSITORY_CACHE_TTL", 3600)
+    entry = cache_services.store_analysis("org/repo", SHA, {"metric_data": {"a": 1}})
+    assert cache_services.get_cached_analysis("org/repo", SHA) == entry
+
+    RepositoryAnalysis.objects.filter(pk=entry.pk).update(
+        created_at=timezone.now() - timedelta(hours=2)
+    )
+    assert cache_services.get_cached_analysis("org/repo", SHA) is None
+    assert cache_services.purge_expired() == 1
+
+
+@pytest.mark.django_db
+def test_second_library_of_same_repo_is_filled_from_cache(monkeypatch, domains, stars):
+    monkeypatch.setattr(tasks_module, "resolve_head_sha", lambda slug: SHA)
+    analyzer = Mock()
+    analyzer.run_analysis_and_get_data.return_value = {
+        "metric_data": {"stars_count": 42},
+        "repo_size_kb": 10,
+    }
+    factory = Mock(return_value=analyzer)
+    monkeypatch.setattr(tasks_module, "RepoAnalyzer", factory)
+
+    first = Library.objects.create(
+        domain=domains[0], library_name="A", github_url="https://github.com/Org/Repo"
+    )
+    second = Library.objects.create(
+        domain=domains[1], library_name="A", github_url="https://github.com/org/repo.git"
+    )
+
+    r1 = tasks_module.analyze_repo_task.apply(
+        args=[str(first.library_ID), first.github_url]
+    ).get(propagate=True)
+    r2 = tasks_module.analyze_repo_task.apply(
+        args=[str(second.library_ID), second.github_url]
+    ).get(propagate=True)
+
+    assert r1["cached"] is False
+    assert r2["cached"] is True
+    assert factory.call_count == 1
+    assert RepositoryAnalysis.objects.get().repo_slug == "org/repo"
+
+    value = LibraryMetricValue.objects.get(library=second, metric=stars)
+    assert value.value == 42
+    second.refresh_from_db()
+    assert second.analysis_status == Library.ANALYSIS_SUCCESS
+    assert second.repo_size_kb == 10
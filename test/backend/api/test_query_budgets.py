@@ -0,0 +1,126 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.database.domain.models import Domain
+from api.database.libraries.models import Library
+from api.database.library_metric_values.bulk import upsert_metric_values
+from api.database.library_metric_values.models import LibraryMetricValue
+from api.database.metrics.models import Metric
+
+# Every endpoint must run in the same number of queries whatever the size of
+# the data behind it: a query added per domain, library, metric, value or
+# user fails here at the "large" size. Budgets are exact, so lowering one
+# means updating it here too.
+SIZES = {
+    "small": {"domains": 1, "libraries": 2, "metrics": 2, "users": 1},
+    "large": {"domains": 3, "libraries": 7, "metrics": 6, "users": 4},
+}
+
+CATEGORIES = ["Installability", "Maintainability", "Visibility/Transparency"]
+
+
+def seed(domains, libraries, metrics, users):
+    User = get_user_model()
+    admins = [
+        User.objects.create_user(
+            username=f"admin{i}", email=f"admin{i}@example.com", password=None, role="admin"
+        )
+        for i in range(users)
+    ]
+    metric_rows = [
+        Metric.objects.create(
+            metric_name=f"Metric {j}",
+            category=CATEGORIES[j % len(CATEGORIES)],
+            value_type="bool" if j % 2 else "int",
+            option_category="yes_no" if j % 2 else None,
+            rule="standard" if j % 2 else None,
+        )
+        for j in range(metrics)
+    ]
+    domain_rows, values = [], []
+    for d in range(domains):
+        domain = Domain.objects.create(domain_name=f"Domain {d}", category_weights={c: 1.0 for c in CATEGORIES})
+        domain.creators.set(admins)
+        domain_rows.append(domain)
+        for i in range(libraries):
+            lib = Library.objects.create(
+                domain=domain, library_name=f"Lib {d}-{i}", github_url=f"https://github.com/o/lib{d}-{i}"
+            )
+            values += [
+                LibraryMetricValue(library=lib, metric=m, value=("yes", "no")[i % 2] if m.option_category else i)
+                for m in metric_rows
+            ]
+    upsert_metric_values(values, ["value"])
+
+    domain = domain_rows[0]
+    return {
+        "domain": domain,
+        "libraries": list(Library.objects.filter(domain=domain)),
+        "metrics": metric_rows,
+        "admin": admins[0],
+        "superadmin": User.objects.create_user(
+            username="root", email="root@example.com", password=None, role="superadmin"
+        ),
+    }
+
+
+def bulk_edits(s):
+    return [
+        {"library_id": str(lib.pk), "metric_id": str(m.pk), "value": None}
+        for lib in s["libraries"]
+        for m in s["metrics"]
+    ]
+
+
+def library_edits(s):
+    return {"metrics": {m.metric_name: None for m in s["metrics"]}}
+
+
+# name: (method, url, payload, queries)
+ENDPOINTS = {
+    "domain-list": ("get", lambda s: reverse("domain-list-create"), None, 3),
+    "domain-detail": ("get", lambda s: reverse("domain-rud", args=[s["domain"].pk]), None, 3),
+    "domain-dashboard": ("get", lambda s: reverse("domain-dashboard", args=[s["domain"].pk]), None, 5),
+    "category-weights": ("get", lambda s: reverse("category-weights", args=[s["domain"].pk]), None, 1),
+    "library-list": ("get", lambda s: reverse("library-list-create"), None, 1),
+    "libraries-by-domain": ("get", lambda s: reverse("libraries-by-domain", args=[s["domain"].pk]), None, 2),
+    "values-comparison": ("get", lambda s: reverse("values-comparison", args=[s["domain"].pk]), None, 4),
+    "values-charts": ("get", lambda s: reverse("values-charts", args=[s["domain"].pk]), None, 4),
+    "values-ahp": ("get", lambda s: reverse("values-ahp", args=[s["domain"].pk]), None, 7),
+    "values-update": (
+        "post",
+        lambda s: reverse("values-update", args=[s["libraries"][0].pk]),
+        library_edits,
+        5,
+    ),
+    "values-bulk-update": ("post", lambda s: reverse("values-bulk-update"), bulk_edits, 5),
+    "metric-list": ("get", lambda s: reverse("metric-list-create"), None, 1),
+    "metric-all": ("get", lambda s: reverse("metric-all-flat"), None, 1),
+    "metric-detail": ("get", lambda s: reverse("metric-detail", args=[s["metrics"][0].pk]), None, 1),
+    "metric-reorder": ("get", lambda s: reverse("metric-reorder"), None, 1),
+    "users": ("get", lambda s: reverse("users") + "?include_domains=true", None, 2),
+    "user-domains": ("get", lambda s: reverse("user-domains", args=[s["admin"].pk]), None, 2),
+    "me": ("get", lambda s: reverse("me"), None, 0),
+    "profile": ("get", lambda s: reverse("profile"), None, 0),
+}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("name", ENDPOINTS)
+def test_endpoint_query_budget(name, size):
+    method, url, payload, budget = ENDPOINTS[name]
+    s = seed(**SIZES[size])
+    client = APIClient()
+    client.force_authenticate(user=s["superadmin"])
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = getattr(client, method)(url(s), payload and payload(s), format="json")
+
+    assert response.status_code < 300, response.content
+    queries = "\n".join(q["sql"] for q in ctx.captured_queries)
+    assert len(ctx.captured_queries) == budget, f"{name} at {size} size ran:\n{queries}"
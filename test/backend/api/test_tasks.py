@@ -9,6 +9,11 @@ from api.database.library_metric_values.models import LibraryMetricValue
 import api.tasks as tasks_module
 
 
+@pytest.fixture(autouse=True)
+def no_head_sha(monkeypatch):
+    monkeypatch.setattr(tasks_module, "resolve_head_sha", lambda slug: None)
+
+
 @pytest.fixture()
 def domain():
     return Domain.objects.create(domain_name="D1", description="desc", category_weights={})
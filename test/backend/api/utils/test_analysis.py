@@ -1,9 +1,14 @@
+from datetime import timedelta
+
 import pytest
 from unittest.mock import Mock
 
+from django.utils import timezone
+
 from api.database.domain.models import Domain
 from api.database.libraries.models import Library
 import api.utils.analysis as analysis_module
+from api.tasks import dispatch_deferred_analysis_task
 from api.utils.analysis import enqueue_library_analysis
 
 
@@ -15,7 +20,7 @@ def domain():
 @pytest.mark.django_db
 def test_library_analysis_missing_github_url(monkeypatch, domain):
     fake_analyze = Mock()
-    fake_analyze.delay = Mock()
+    fake_analyze.apply_async = Mock()
     monkeypatch.setattr(analysis_module, "analyze_repo_task", fake_analyze)
 
     fake_gitstats = Mock()
@@ -33,14 +38,14 @@ def test_library_analysis_missing_github_url(monkeypatch, domain):
     assert lib.analysis_task_id is None
     assert lib.gitstats_task_id is None
 
-    fake_analyze.delay.assert_not_called()
+    fake_analyze.apply_async.assert_not_called()
     fake_gitstats.apply_async.assert_not_called()
 
 
 @pytest.mark.django_db
 def test_library_analysis_with_github_url_queues_both_tasks_and_sets_ids(monkeypatch, domain):
     fake_analyze = Mock()
-    fake_analyze.delay = Mock(return_value=Mock(id="task-123"))
+    fake_analyze.apply_async = Mock(return_value=Mock(id="task-123"))
     monkeypatch.setattr(analysis_module, "analyze_repo_task", fake_analyze)
 
     fake_gitstats = Mock()
@@ -56,11 +61,15 @@ def test_library_analysis_with_github_url_queues_both_tasks_and_sets_ids(monkeyp
     result = enqueue_library_analysis(lib)
     assert result == {"analysis_task_id": "task-123", "gitstats_task_id": "git-456"}
 
-    fake_analyze.delay.assert_called_once_with(str(lib.library_ID), lib.github_url)
+    fake_analyze.apply_async.assert_called_once()
+    _, kwargs = fake_analyze.apply_async.call_args
+    assert kwargs["args"] == [str(lib.library_ID), lib.github_url]
+    assert kwargs["queue"] == "analysis_heavy"
+
     fake_gitstats.apply_async.assert_called_once()
     _, kwargs = fake_gitstats.apply_async.call_args
     assert kwargs["args"] == [str(lib.library_ID), lib.github_url]
-    assert kwargs["queue"] == "gitstats"
+    assert kwargs["queue"] == "gitstats_heavy"
 
     lib.refresh_from_db()
     assert lib.analysis_status == Library.ANALYSIS_PENDING
@@ -71,3 +80,139 @@ def test_library_analysis_with_github_url_queues_both_tasks_and_sets_ids(monkeyp
     assert lib.gitstats_task_id == "git-456"
     assert lib.gitstats_error is None
     assert lib.gitstats_report_path is None
+
+
+@pytest.mark.django_db
+def test_library_analysis_routes_small_repo_to_light_queues(monkeypatch, domain):
+    fake_analyze = Mock()
+    fake_analyze.apply_async = Mock(return_value=Mock(id="task-123"))
+    monkeypatch.setattr(analysis_module, "analyze_repo_task", fake_analyze)
+
+    fake_gitstats = Mock()
+    fake_gitstats.apply_async = Mock(return_value=Mock(id="git-456"))
+    monkeypatch.setattr(analysis_module, "analyze_repo_gitstats_task", fake_gitstats)
+
+    lib = Library.objects.create(
+        domain=domain,
+        library_name="Repo",
+        github_url="https://github.com/org/repo",
+        repo_size_kb=2048,
+    )
+
+    enqueue_library_analysis(lib)
+
+    _, kwargs = fake_analyze.apply_async.call_args
+    assert kwargs["queue"] == "analysis_light"
+    assert kwargs["soft_time_limit"] < kwargs["time_limit"]
+
+    _, kwargs = fake_gitstats.apply_async.call_args
+    assert kwargs["queue"] == "gitstats_light"
+
+
+@pytest.mark.django_db
+def test_domain_analysis_publishes_one_group_and_defers_over_cap(monkeypatch, domain):
+    fake_group = Mock()
+    monkeypatch.setattr(analysis_module, "group", fake_group)
+
+    libs = [
+        Library.objects.create(
+            domain=domain, library_name=name, github_url=f"https://github.com/o/{name}"
+        )
+        for name in ("A", "B", "C")
+    ]
+
+    result = analysis_module.enqueue_domain_analysis(domain, max_in_flight=2)
+
+    assert [q["library_id"] for q in result["queued"]] == [
+        str(libs[0].library_ID),
+        str(libs[1].library_ID),
+    ]
+    assert result["deferred"] == [str(libs[2].library_ID)]
+    assert result["total"] == 3
+
+    fake_group.assert_called_once()
+    (signatures,) = fake_group.call_args.args
+    assert len(signatures) == 4
+    assert signatures[0].options["task_id"] == result["queued"][0]["analysis_task_id"]
+    assert signatures[0].options["queue"] == "analysis_heavy"
+
+    deferred = Library.objects.get(pk=libs[2].pk)
+    assert deferred.analysis_status == Library.ANALYSIS_PENDING
+    assert deferred.analysis_task_id is None
+    assert deferred.analysis_deferred
+
+    Library.objects.filter(pk=libs[0].pk).update(
+        analysis_status=Library.ANALYSIS_SUCCESS,
+        gitstats_status=Library.GITSTATS_SUCCESS,
+    )
+    dispatched = analysis_module.dispatch_deferred_analysis(
+        domain.domain_ID, max_in_flight=2
+    )
+
+    assert [d["library_id"] for d in dispatched] == [str(libs[2].library_ID)]
+    deferred.refresh_from_db()
+    assert deferred.analysis_task_id == dispatched[0]["analysis_task_id"]
+    assert not deferred.analysis_deferred
+    assert fake_group.call_count == 2
+
+    assert (
+        analysis_module.dispatch_deferred_analysis(domain.domain_ID, max_in_flight=2)
+        == []
+    )
+
+
+@pytest.mark.django_db
+def test_sweep_dispatches_deferred_libraries_after_a_worker_died(monkeypatch, settings, domain):
+    fake_group = Mock()
+    monkeypatch.setattr(analysis_module, "group", fake_group)
+    settings.ANALYSIS_DOMAIN_MAX_IN_FLIGHT = 1
+
+    never_queued = Library.objects.create(domain=domain, library_name="A", github_url="https://github.com/o/a")
+    killed = Library.objects.create(
+        domain=domain,
+        library_name="B",
+        github_url="https://github.com/o/b",
+        analysis_status=Library.ANALYSIS_RUNNING,
+        analysis_task_id="dead",
+        analysis_started_at=timezone.now(),
+    )
+    deferred = Library.objects.create(
+        domain=domain, library_name="C", github_url="https://github.com/o/c", analysis_deferred=True
+    )
+
+    # The killed job still looks alive until its hard time limit has passed
+    assert dispatch_deferred_analysis_task.apply().get() == {"ok": True, "dispatched": 0}
+
+    Library.objects.filter(pk=killed.pk).update(analysis_started_at=timezone.now() - timedelta(days=1))
+    assert dispatch_deferred_analysis_task.apply().get() == {"ok": True, "dispatched": 1}
+
+    deferred.refresh_from_db()
+    never_queued.refresh_from_db()
+    assert deferred.analysis_task_id and not deferred.analysis_deferred
+    # Pending libraries nobody queued are left alone
+    assert never_queued.analysis_task_id is None
+    fake_group.assert_called_once()
+
+
+@pytest.mark.django_db
+def test_failed_dispatch_leaves_libraries_deferred(monkeypatch, domain):
+    fake_group = Mock()
+    fake_group.return_value.apply_async.side_effect = OSError("broker down")
+    monkeypatch.setattr(analysis_module, "group", fake_group)
+    lib = Library.objects.create(
+        domain=domain, library_name="A", github_url="https://github.com/o/a", analysis_deferred=True
+    )
+
+    with pytest.raises(OSError):
+        analysis_module.dispatch_deferred_analysis(domain.domain_ID, max_in_flight=1)
+
+    lib.refresh_from_db()
+    assert lib.analysis_deferred
+    assert lib.analysis_task_id is None and lib.gitstats_task_id is None
+
+    # The reservations were dropped, so the retry publishes both jobs again
+    fake_group.return_value.apply_async.side_effect = None
+    dispatched = analysis_module.dispatch_deferred_analysis(domain.domain_ID, max_in_flight=1)
+    assert [d["library_id"] for d in dispatched] == [str(lib.library_ID)]
+    (signatures,) = fake_group.call_args.args
+    assert len(signatures) == 2
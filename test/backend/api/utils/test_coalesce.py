@@ -0,0 +1,105 @@
+from unittest.mock import Mock
+
+import pytest
+from django.core.cache import cache
+
+from api.database.domain.models import Domain
+from api.database.libraries.models import Library
+import api.tasks as tasks_module
+import api.utils.analysis as analysis_module
+from api.utils import coalesce
+
+URL = "https://github.com/org/repo"
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture()
+def library():
+    domain = Domain.objects.create(domain_name="Test Domain", description="desc")
+    return Library.objects.create(domain=domain, library_name="Repo", github_url=URL)
+
+
+def test_queued_job_is_superseded_by_newer_request():
+    assert coalesce.reserve("analysis", "lib-1", URL, "old") == ("old", True)
+    assert coalesce.reserve("analysis", "lib-1", URL + ".git", "new") == ("new", True)
+
+    assert coalesce.claim("analysis", "lib-1", URL, "old") is False
+    assert coalesce.claim("analysis", "lib-1", URL, "new") is True
+
+
+def test_running_job_is_attached_to_until_released():
+    coalesce.reserve("gitstats", "lib-1", URL, "first")
+    coalesce.claim("gitstats", "lib-1", URL, "first")
+
+    assert coalesce.reserve("gitstats", "lib-1", URL, "second") == ("first", False)
+    assert coalesce.reserve("analysis", "lib-1", URL, "other") == ("other", True)
+
+    coalesce.release("gitstats", "lib-1", URL, "second")
+    assert coalesce.reserve("gitstats", "lib-1", URL, "third") == ("first", False)
+
+    coalesce.release("gitstats", "lib-1", URL, "first")
+    assert coalesce.reserve("gitstats", "lib-1", URL, "fourth") == ("fourth", True)
+
+
+def test_claim_without_reservation_or_task_id_runs():
+    assert coalesce.claim("analysis", "lib-1", URL, "unreserved") is True
+    assert coalesce.claim("analysis", "lib-2", URL, None) is True
+
+
+@pytest.mark.django_db
+def test_enqueue_attaches_to_running_jobs(monkeypatch, library):
+    fake_analyze = Mock()
+    monkeypatch.setattr(analysis_module, "analyze_repo_task", fake_analyze)
+    fake_gitstats = Mock()
+    monkeypatch.setattr(analysis_module, "analyze_repo_gitstats_task", fake_gitstats)
+
+    coalesce.claim("analysis", library.library_ID, URL, "running-analysis")
+    coalesce.claim("gitstats", library.library_ID, URL, "running-gitstats")
+
+    result = analysis_module.enqueue_library_analysis(library)
+
+    assert result == {
+        "analysis_task_id": "running-analysis",
+        "gitstats_task_id": "running-gitstats",
+    }
+    fake_analyze.apply_async.assert_not_called()
+    fake_gitstats.apply_async.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_enqueue_publishes_with_reserved_task_id(monkeypatch, library):
+    fake_analyze = Mock()
+    fake_analyze.apply_async.side_effect = lambda **kw: Mock(id=kw["task_id"])
+    monkeypatch.setattr(analysis_module, "analyze_repo_task", fake_analyze)
+    fake_gitstats = Mock()
+    fake_gitstats.apply_async.side_effect = lambda **kw: Mock(id=kw["task_id"])
+    monkeypatch.setattr(analysis_module, "analyze_repo_gitstats_task", fake_gitstats)
+
+    first = analysis_module.enqueue_library_analysis(library)
+    second = analysis_module.enqueue_library_analysis(library)
+
+    assert second["analysis_task_id"] != first["analysis_task_id"]
+    assert not coalesce.claim("analysis", library.library_ID, URL, first["analysis_task_id"])
+    assert coalesce.claim("analysis", library.library_ID, URL, second["analysis_task_id"])
+
+
+@pytest.mark.django_db
+def test_superseded_task_exits_without_work(monkeypatch, library):
+    analyzer = Mock()
+    monkeypatch.setattr(tasks_module, "RepoAnalyzer", analyzer)
+    coalesce.reserve("analysis", library.library_ID, URL, "newer")
+
+    result = tasks_module.analyze_repo_task.apply(
+        args=[str(library.library_ID), URL], task_id="older"
+    ).get()
+
+    assert result == {"ok": True, "skipped": True, "superseded": True}
+    analyzer.assert_not_called()
+    library.refresh_from_db()
+    assert library.analysis_status == Library.ANALYSIS_PENDING
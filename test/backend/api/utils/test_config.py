@@ -0,0 +1,68 @@
+import json
+import os
+
+import pytest
+
+import api.utils.config as config_module
+
+
+@pytest.fixture()
+def registry(monkeypatch, tmp_path):
+    monkeypatch.setattr(config_module.settings, "BASE_DIR", str(tmp_path))
+    (tmp_path / "api" / "database").mkdir(parents=True)
+    return config_module.ConfigRegistry(config_module.CONFIG_FILES)
+
+
+def write(tmp_path, name, data, mtime=None):
+    path = tmp_path / "api" / "database" / name
+    path.write_text(json.dumps(data))
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+    return path
+
+
+def test_parses_each_file_once(registry, tmp_path, monkeypatch):
+    write(tmp_path, "categories.json", {"Categories": ["A"]})
+    loads = []
+    real_loads = config_module.json.loads
+    monkeypatch.setattr(config_module.json, "loads", lambda raw: loads.append(raw) or real_loads(raw))
+
+    assert registry.get("categories") == {"Categories": ["A"]}
+    assert registry.get("categories") is registry.get("categories")
+    assert len(loads) == 1
+
+
+def test_reloads_when_file_changes(registry, tmp_path):
+    write(tmp_path, "rules.json", {"int": {}}, mtime=1_000_000_000)
+    first_version = registry.version("rules")
+
+    write(tmp_path, "rules.json", {"int": {"x": {}}}, mtime=2_000_000_000)
+
+    assert registry.get("rules") == {"int": {"x": {}}}
+    assert registry.version("rules") != first_version
+
+
+def test_combined_version_tolerates_missing_files(registry, tmp_path):
+    before = registry.version()
+    write(tmp_path, "auto_metrics.json", {"stars": {}})
+
+    assert registry.version() != before
+
+
+def test_missing_and_invalid_files_raise(registry, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        registry.get("rules")
+
+    (tmp_path / "api" / "database" / "rules.json").write_text("{invalid")
+    with pytest.raises(json.JSONDecodeError):
+        registry.get("rules")
+
+
+def test_live_config_follows_file(registry, tmp_path):
+    live = config_module.LiveConfig(registry, "auto_metrics")
+    write(tmp_path, "auto_metrics.json", {"stars": {"source": "github"}}, mtime=1_000_000_000)
+    assert dict(live) == {"stars": {"source": "github"}}
+
+    write(tmp_path, "auto_metrics.json", {"forks": {}}, mtime=2_000_000_000)
+    assert list(live) == ["forks"]
+    assert "stars" not in live
@@ -0,0 +1,183 @@
+import os
+import time
+import uuid
+
+import pytest
+from django.core.management import call_command
+
+from api.database.domain.models import Domain
+from api.database.libraries.models import Library
+from api.database.library_metric_values.models import LibraryMetricValue
+from api.database.metrics.models import Metric
+import api.utils.disk_budget as disk_budget_module
+
+
+@pytest.fixture()
+def domain():
+    return Domain.objects.create(domain_name="Test Domain", description="desc")
+
+
+@pytest.fixture()
+def dirs(monkeypatch, tmp_path):
+    work = tmp_path / "work"
+    serve = tmp_path / "serve"
+    work.mkdir()
+    serve.mkdir()
+    monkeypatch.setattr(disk_budget_module.settings, "GITSTATS_WORK_DIR", str(work))
+    monkeypatch.setattr(disk_budget_module.settings, "GITSTATS_SERVE_DIR", str(serve))
+    monkeypatch.setattr(disk_budget_module.settings, "GITSTATS_ORPHAN_MAX_AGE", 3600)
+    monkeypatch.setattr(disk_budget_module.settings, "GITSTATS_ORPHAN_GRACE", 600)
+    monkeypatch.setattr(disk_budget_module.settings, "GITSTATS_WORK_DIR_MAX_BYTES", 10**9)
+    monkeypatch.setattr(disk_budget_module.settings, "GITSTATS_SERVE_DIR_MAX_BYTES", 10**9)
+    return work, serve
+
+
+def make_report(serve, library_id, size, viewed_at=None):
+    report = serve / str(library_id) / "git_stats"
+    report.mkdir(parents=True)
+    index = report / "index.html"
+    index.write_bytes(b"x" * size)
+    if viewed_at is not None:
+        os.utime(index, (viewed_at, viewed_at))
+    return report
+
+
+def make_clone(work, library_id, size, age=0):
+    repo = work / str(library_id) / "repo"
+    repo.mkdir(parents=True)
+    (repo / "blob").write_bytes(b"x" * size)
+    if age:
+        past = time.time() - age
+        os.utime(work / str(library_id), (past, past))
+    return repo
+
+
+def test_directory_size_counts_nested_files(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "one").write_bytes(b"x" * 10)
+    (tmp_path / "two").write_bytes(b"x" * 5)
+
+    assert disk_budget_module.directory_size(str(tmp_path)) == 15
+    assert disk_budget_module.directory_size(str(tmp_path / "missing")) == 0
+
+
+@pytest.mark.django_db
+def test_sweep_removes_orphaned_and_stale_work_dirs(dirs, domain):
+    work, _ = dirs
+    idle = Library.objects.create(domain=domain, library_name="Idle")
+    active = Library.objects.create(
+        domain=domain, library_name="Active", gitstats_status=Library.GITSTATS_RUNNING
+    )
+    stale = Library.objects.create(
+        domain=domain, library_name="Stale", gitstats_status=Library.GITSTATS_RUNNING
+    )
+    just_claimed = Library.objects.create(domain=domain, library_name="Just claimed")
+    deleted_id = uuid.uuid4()
+
+    make_clone(work, idle.library_ID, 10, age=1200)
+    make_clone(work, active.library_ID, 10)
+    make_clone(work, stale.library_ID, 10, age=7200)
+    make_clone(work, deleted_id, 10)
+    make_clone(work, just_claimed.library_ID, 10)
+    (work / "not-a-library").mkdir()
+
+    summary = disk_budget_module.enforce_disk_budget()
+
+    reasons = {item["library_id"]: item["reason"] for item in summary["work_dirs_removed"]}
+    assert reasons == {
+        str(idle.library_ID): "not_running",
+        str(stale.library_ID): "stale",
+        str(deleted_id): "library_deleted",
+    }
+    assert sorted(os.listdir(work)) == sorted([str(active.library_ID), str(just_claimed.library_ID), "not-a-library"])
+    assert summary["work_dir_bytes"] == 20
+
+
+@pytest.mark.django_db
+def test_sweep_rereads_status_before_removing(dirs, domain):
+    work, _ = dirs
+    lib = Library.objects.create(domain=domain, library_name="Queued")
+    make_clone(work, lib.library_ID, 10, age=1200)
+
+    # Snapshot taken while queued; the job marks itself running during the walk
+    libraries = {str(lib.library_ID): Library.objects.get(pk=lib.pk)}
+    Library.objects.filter(pk=lib.pk).update(gitstats_status=Library.GITSTATS_RUNNING)
+
+    assert disk_budget_module.sweep_orphaned_work_dirs(libraries, 3600, 600) == []
+    assert os.listdir(work) == [str(lib.library_ID)]
+
+
+@pytest.mark.django_db
+def test_evicts_reports_of_deleted_libraries(dirs, domain):
+    _, serve = dirs
+    kept = Library.objects.create(domain=domain, library_name="Kept")
+    deleted_id = uuid.uuid4()
+
+    make_report(serve, kept.library_ID, 10)
+    make_report(serve, deleted_id, 10)
+
+    summary = disk_budget_module.enforce_disk_budget()
+
+    assert [e["library_id"] for e in summary["reports_evicted"]] == [str(deleted_id)]
+    assert os.listdir(serve) == [str(kept.library_ID)]
+
+
+@pytest.mark.django_db
+def test_evicts_least_recently_viewed_reports_until_under_budget(dirs, domain, monkeypatch):
+    _, serve = dirs
+    monkeypatch.setattr(disk_budget_module.settings, "GITSTATS_SERVE_DIR_MAX_BYTES", 250)
+    metric = Metric.objects.create(
+        metric_name="GitStats Report", metric_key="gitstats_report", value_type="text"
+    )
+
+    now = time.time()
+    libs = {}
+    for name, viewed in (("Old", now - 3000), ("Mid", now - 2000), ("New", now - 10)):
+        lib = Library.objects.create(
+            domain=domain,
+            library_name=name,
+            gitstats_status=Library.GITSTATS_SUCCESS,
+            gitstats_report_path=f"/gitstats/{name}/git_stats/index.html",
+        )
+        LibraryMetricValue.objects.create(
+            library=lib, metric=metric, value=lib.gitstats_report_path
+        )
+        make_report(serve, lib.library_ID, 100, viewed_at=viewed)
+        libs[name] = lib
+
+    summary = disk_budget_module.enforce_disk_budget()
+
+    assert [e["library_id"] for e in summary["reports_evicted"]] == [
+        str(libs["Old"].library_ID)
+    ]
+    assert summary["serve_dir_bytes"] == 200
+
+    old = Library.objects.get(pk=libs["Old"].pk)
+    assert old.gitstats_status == Library.GITSTATS_PENDING
+    assert old.gitstats_report_path is None
+    assert old.gitstats_error == disk_budget_module.EVICTED_REPORT_MESSAGE
+    assert LibraryMetricValue.objects.get(library=old, metric=metric).value is None
+
+    new = Library.objects.get(pk=libs["New"].pk)
+    assert new.gitstats_status == Library.GITSTATS_SUCCESS
+    assert new.gitstats_report_bytes == 100
+    assert new.disk_usage_measured_at is not None
+
+
+@pytest.mark.django_db
+def test_dry_run_reports_without_deleting(dirs, domain, monkeypatch):
+    work, serve = dirs
+    monkeypatch.setattr(disk_budget_module.settings, "GITSTATS_SERVE_DIR_MAX_BYTES", 0)
+    lib = Library.objects.create(
+        domain=domain, library_name="Lib", gitstats_status=Library.GITSTATS_SUCCESS
+    )
+    make_report(serve, lib.library_ID, 100)
+    make_clone(work, lib.library_ID, 10)
+
+    call_command("enforce_gitstats_disk_budget", "--dry-run")
+
+    assert os.path.isdir(serve / str(lib.library_ID))
+    assert os.path.isdir(work / str(lib.library_ID))
+    lib.refresh_from_db()
+    assert lib.gitstats_status == Library.GITSTATS_SUCCESS
+    assert lib.gitstats_report_bytes is None
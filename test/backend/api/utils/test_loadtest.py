@@ -0,0 +1,116 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from api.database.domain.models import Domain
+from api.utils.loadtest import LoadContext, compare, parse_mix, run_load, summarize
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    seen = []
+    bodies = []
+
+    def respond(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        if body:
+            Handler.bodies.append(json.loads(body))
+        Handler.seen.append((self.command, self.path, self.headers.get("Authorization")))
+        status = 500 if "ahp" in self.path else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    do_GET = do_POST = respond
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def server():
+    Handler.seen = []
+    Handler.bodies = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_parse_mix():
+    assert parse_mix("comparison=4, ahp=0.5,me") == {"comparison": 4.0, "ahp": 0.5, "me": 1.0}
+    for spec in ("", "nope=1", "ahp=x", "ahp=0"):
+        with pytest.raises(ValueError):
+            parse_mix(spec)
+
+
+def test_summarize_percentiles_and_fixed_histogram():
+    summary = summarize([float(ms) for ms in range(1, 101)], {200: 99, 500: 1}, errors=1, elapsed=2.0)
+
+    assert summary["requests"] == 100
+    assert summary["throughput_rps"] == 50.0
+    assert summary["statuses"] == {"200": 99, "500": 1}
+    assert summary["latency_ms"]["p50"] == 50.5
+    assert summary["latency_ms"]["p99"] == pytest.approx(99.01)
+    assert sum(summary["histogram"]["counts"]) == 100
+    assert len(summary["histogram"]["counts"]) == len(summary["histogram"]["edges_ms"]) + 1
+
+    assert summarize([], {}, 0, 1.0)["latency_ms"] is None
+
+
+def test_compare_reports_percentile_change():
+    def report(p50):
+        summary = summarize([p50] * 10, {200: 10}, 0, 1.0)
+        return {"total": summary, "endpoints": {"comparison": summary}}
+
+    rows = compare(report(10.0), report(15.0))
+
+    assert [row["name"] for row in rows] == ["total", "comparison"]
+    assert rows[1]["p50"] == (10.0, 15.0, 50.0)
+
+
+def test_run_load_drives_weighted_mix(server):
+    ctx = LoadContext(["d1", "d2"], login="u", password="p", token="t0k")
+
+    result = run_load(
+        server, ctx, parse_mix("comparison=3,ahp=1,login=1"), concurrency=3, duration=30, max_requests=60
+    )
+
+    assert result["total"]["requests"] == 60
+    assert set(result["endpoints"]) == {"comparison", "ahp", "login"}
+    assert result["endpoints"]["ahp"]["errors"] == result["endpoints"]["ahp"]["requests"] > 0
+    assert result["endpoints"]["comparison"]["errors"] == 0
+    assert result["total"]["errors"] == result["endpoints"]["ahp"]["errors"]
+    assert {path.split("/")[4] for method, path, _ in Handler.seen if "comparison" in path} == {"d1", "d2"}
+    assert ("POST", "/api/login/", "Bearer t0k") in Handler.seen
+
+
+@pytest.mark.django_db
+def test_command_uses_a_throwaway_non_admin_user(server):
+    Domain.objects.create(domain_name="Loaded")
+    User = get_user_model()
+    existing = User.objects.create_user(username="loadtest", email="ops@example.com", password="kept", role="admin")
+    args = ["loadtest", "--url", server, "--mix", "login=1", "--requests", "3", "--warmup", "0", "--concurrency", "1"]
+
+    call_command(*args, "--keep-user")
+    user = User.objects.exclude(pk=existing.pk).get()
+    assert user.username.startswith("loadtest-")
+    assert user.role == "user"
+    first = Handler.bodies[-1]["password"]
+    assert user.check_password(first)
+
+    call_command(*args)
+    assert Handler.bodies[-1]["login"] not in (user.username, existing.username)
+    assert Handler.bodies[-1]["password"] != first
+    # Only the run's own user is removed; other accounts are left as they were
+    assert set(User.objects.values_list("pk", flat=True)) == {existing.pk, user.pk}
+    existing.refresh_from_db()
+    assert existing.role == "admin" and existing.check_password("kept")
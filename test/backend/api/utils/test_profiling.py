@@ -0,0 +1,161 @@
+import time
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from api.tasks import rescore_metric_values_task
+from api.utils import profiling
+from api.utils.profiling import Profile, list_profiles, save_profile
+
+
+@pytest.fixture()
+def enabled(settings, tmp_path):
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_DIR = str(tmp_path)
+    settings.PROFILING_INTERVAL_MS = 1
+    settings.PROFILING_REQUEST_THRESHOLD_MS = 0
+    settings.PROFILING_TASK_THRESHOLD_S = 0
+    settings.PROFILING_MAX_PROFILES = 50
+    profiling._sampler["pid"] = None
+    yield tmp_path
+    profiling._sampler["pid"] = None
+
+
+def slow_step(seconds=0.05):
+    time.sleep(seconds)
+
+
+def client_for(role):
+    user = get_user_model().objects.create_user(username=role, email=f"{role}@example.com", password=None, role=role)
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def test_sampler_collects_folded_stacks(enabled):
+    sampler = profiling.get_sampler()
+    thread_id = profiling.threading.get_ident()
+    assert sampler.start(thread_id) is not None
+    # Nested profiles of the same thread are left to the outer one
+    assert sampler.start(thread_id) is None
+    slow_step()
+    profile = sampler.stop(thread_id)
+
+    assert profile.samples > 0
+    lines = profile.folded().splitlines()
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert any("slow_step (" in line and "test_profiling.py" in line for line in lines)
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == profile.samples
+
+
+def test_sampler_only_writes_registered_profiles_under_its_lock(enabled):
+    sampler = profiling.Sampler(interval=0)
+    thread_id = profiling.threading.get_ident()
+    profile = Profile()
+    sampler._targets[thread_id] = profile
+    sleeps = []
+
+    def current_frames():
+        # stop() must not be able to hand the profile back mid-sample
+        assert sampler._lock.locked()
+        return {thread_id: profiling.sys._getframe()}
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 2:
+            assert sampler.stop(thread_id) is profile
+
+    with mock.patch.object(profiling.sys, "_current_frames", current_frames), mock.patch.object(
+        profiling.time, "sleep", sleep
+    ):
+        sampler._run()
+
+    assert profile.samples == 1
+    assert sampler._thread is None
+
+
+def test_ring_buffer_keeps_newest(enabled, settings):
+    settings.PROFILING_MAX_PROFILES = 3
+    profile = Profile()
+    profile.stacks["main;work"] = 2
+    profile.samples = 2
+    ids = [save_profile(profile, "task", {"name": f"t{i}"}) for i in range(5)]
+
+    stored = list_profiles()
+    assert [p["id"] for p in stored] == ids[:1:-1]
+    assert sorted(p.name for p in enabled.iterdir()) == sorted(f"{i}{suffix}" for i in ids[2:] for suffix in (".folded", ".json"))
+    assert (enabled / f"{ids[-1]}.folded").read_text() == "main;work 2\n"
+
+
+@pytest.mark.django_db
+def test_slow_request_profiled(enabled, settings):
+    from api.database.domain.views import DomainListCreateView
+
+    original = DomainListCreateView.get_queryset
+
+    def slow_queryset(view):
+        slow_step()
+        return original(view)
+
+    client = client_for("user")
+    with mock.patch.object(DomainListCreateView, "get_queryset", slow_queryset):
+        assert client.get("/api/domain/").status_code == 200
+
+    settings.PROFILING_REQUEST_THRESHOLD_MS = 60_000
+    assert client.get("/api/domain/").status_code == 200
+
+    [meta] = list_profiles("request")
+    assert meta["name"] == "domain-list-create"
+    assert meta["method"] == "GET"
+    assert meta["path"] == "/api/domain/"
+    assert meta["status"] == 200
+    assert meta["duration_ms"] >= 50
+    assert meta["samples"] > 0
+    assert "slow_step" in (enabled / f"{meta['id']}.folded").read_text()
+
+
+@pytest.mark.django_db
+def test_long_task_profiled(enabled, settings):
+    with mock.patch("api.tasks.rescore_if_rules_changed", side_effect=lambda: slow_step() or 0):
+        rescore_metric_values_task.apply()
+
+    [meta] = list_profiles("task")
+    assert meta["name"] == rescore_metric_values_task.name
+    assert meta["state"] == "SUCCESS"
+    assert meta["duration_ms"] >= 50
+
+    settings.PROFILING_TASK_THRESHOLD_S = 60
+    with mock.patch("api.tasks.rescore_if_rules_changed", side_effect=lambda: slow_step() or 0):
+        rescore_metric_values_task.apply()
+    assert len(list_profiles("task")) == 1
+
+
+@pytest.mark.django_db
+def test_profiles_endpoints_are_superadmin_only(enabled, settings):
+    # Only the stored profile below, not the requests reading it
+    settings.PROFILING_REQUEST_THRESHOLD_MS = 60_000
+    profile = Profile()
+    profile.stacks["main;handler;query"] = 7
+    profile.samples = 7
+    profile_id = save_profile(profile, "request", {"name": "domain-list-create", "duration_ms": 1500.0})
+
+    assert client_for("admin").get("/api/profiles/").status_code == 403
+
+    client = client_for("superadmin")
+    response = client.get("/api/profiles/")
+    assert response.status_code == 200
+    assert response.data["enabled"] is True
+    assert [p["id"] for p in response.data["profiles"]] == [profile_id]
+    assert client.get("/api/profiles/?kind=task").data["profiles"] == []
+    assert client.get("/api/profiles/?kind=other").status_code == 400
+
+    response = client.get(f"/api/profiles/{profile_id}/")
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content) == b"main;handler;query 7\n"
+    assert f'filename="{profile_id}.folded"' in response["Content-Disposition"]
+
+    assert client.get("/api/profiles/1-request-000000000000/").status_code == 404
+    assert client.get("/api/profiles/..%2F..%2Fsettings/").status_code == 404
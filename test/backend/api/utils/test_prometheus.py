@@ -0,0 +1,157 @@
+import os
+import subprocess
+import sys
+import textwrap
+from unittest import mock
+
+import pytest
+from celery import current_app
+from django.contrib.auth import get_user_model
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+
+from api.database.domain.models import Domain
+from api.database.services import RepoAnalyzer
+from api.tasks import rescore_metric_values_task
+from api.utils import prometheus
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.fixture()
+def enabled(settings, monkeypatch):
+    settings.PROMETHEUS_ENABLED = True
+    settings.PROMETHEUS_METRICS_TOKEN = ""
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_ROOT", raising=False)
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+
+
+@pytest.mark.django_db
+def test_request_latency_and_queries_per_url_name(enabled):
+    user = get_user_model().objects.create_user(username="viewer", email="viewer@example.com", password=None)
+    Domain.objects.create(domain_name="Mesh")
+    client = APIClient()
+    client.force_authenticate(user)
+
+    labels = {"method": "GET", "url_name": "domain-list-create", "status": "2xx"}
+    before = sample("domainx_http_request_duration_seconds_count", **labels)
+    queries_before = sample("domainx_http_db_queries_sum", url_name="domain-list-create")
+
+    assert client.get("/api/domain/").status_code == 200
+
+    assert sample("domainx_http_request_duration_seconds_count", **labels) == before + 1
+    assert sample("domainx_http_db_queries_sum", url_name="domain-list-create") > queries_before
+
+    body = client.get("/metrics").content.decode()
+    assert 'domainx_http_request_duration_seconds_count{method="GET",status="2xx",url_name="domain-list-create"}' in body
+
+
+@pytest.mark.django_db
+def test_metrics_disabled_and_token(settings, enabled):
+    client = APIClient()
+    settings.PROMETHEUS_METRICS_TOKEN = "s3cret"
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code == 401
+
+    response = client.get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret")
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain")
+
+    settings.PROMETHEUS_ENABLED = False
+    assert client.get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret").status_code == 404
+
+
+@pytest.mark.django_db
+def test_task_duration_and_state(enabled):
+    name = rescore_metric_values_task.name
+    before = sample("domainx_celery_tasks_total", task=name, state="success")
+    duration_before = sample("domainx_celery_task_duration_seconds_count", task=name)
+
+    rescore_metric_values_task.apply()
+
+    assert sample("domainx_celery_tasks_total", task=name, state="success") == before + 1
+    assert sample("domainx_celery_task_duration_seconds_count", task=name) == duration_before + 1
+
+
+@pytest.mark.django_db
+def test_cache_hits_and_misses(enabled):
+    from api.database.library_metric_values.charts import get_charts
+
+    domain = Domain.objects.create(domain_name="Cached")
+    misses = sample("domainx_cache_requests_total", cache="domain_charts", result="miss")
+    hits = sample("domainx_cache_requests_total", cache="domain_charts", result="hit")
+
+    get_charts(domain)
+    get_charts(domain)
+
+    assert sample("domainx_cache_requests_total", cache="domain_charts", result="miss") == misses + 1
+    assert sample("domainx_cache_requests_total", cache="domain_charts", result="hit") == hits + 1
+
+
+def test_queue_depth_reads_the_broker(enabled):
+    with current_app.connection_for_write() as conn:
+        queue = conn.SimpleQueue("email")
+        queue.put({"probe": 1})
+        try:
+            body = prometheus.scrape().decode()
+        finally:
+            queue.clear()
+
+    assert 'domainx_celery_queue_depth{queue="email"} 1.0' in body
+    assert 'domainx_celery_queue_depth{queue="analysis_heavy"} 0.0' in body
+
+
+def test_queue_depth_skipped_when_broker_is_down(enabled):
+    with mock.patch.object(current_app, "connection_for_read", side_effect=OSError("refused")):
+        body = prometheus.scrape().decode()
+    assert "domainx_celery_queue_depth{" not in body
+    assert "domainx_clones_in_flight" in body
+
+
+def test_clones_in_flight_during_clone(tmp_path, settings, enabled):
+    seen = []
+
+    def fake_run(cmd, **kwargs):
+        seen.append(REGISTRY.get_sample_value("domainx_clones_in_flight"))
+        os.makedirs(cmd[-1])
+
+    analyzer = RepoAnalyzer("https://github.com/octo/demo")
+    with mock.patch("api.database.services.subprocess.run", side_effect=fake_run):
+        analyzer._clone_repo_to_dir(str(tmp_path / "on"))
+        settings.PROMETHEUS_ENABLED = False
+        analyzer._clone_repo_to_dir(str(tmp_path / "off"))
+
+    assert seen == [1.0, 0.0]
+    assert REGISTRY.get_sample_value("domainx_clones_in_flight") == 0.0
+
+
+def test_cache_lookups_not_counted_when_disabled(settings):
+    settings.PROMETHEUS_ENABLED = False
+    before = sample("domainx_cache_requests_total", cache="metric_catalog", result="hit")
+
+    prometheus.cache_lookup("metric_catalog", True)
+
+    assert sample("domainx_cache_requests_total", cache="metric_catalog", result="hit") == before
+
+
+def test_scrape_sums_processes_of_every_service(tmp_path, enabled, monkeypatch):
+    worker = textwrap.dedent(
+        """
+        from prometheus_client import Counter, Gauge
+        Counter("domainx_celery_tasks", "", ["task", "state"]).labels("api.tasks.t", "success").inc(2)
+        Gauge("domainx_clones_in_flight", "", multiprocess_mode="livesum").inc()
+        """
+    )
+    for service in ("celery_analysis", "celery_gitstats", "celery_gitstats"):
+        path = tmp_path / service
+        path.mkdir(exist_ok=True)
+        env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(path)}
+        subprocess.run([sys.executable, "-c", worker], env=env, check=True)
+
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_ROOT", str(tmp_path))
+    body = prometheus.scrape().decode()
+
+    assert 'domainx_celery_tasks_total{state="success",task="api.tasks.t"} 6.0' in body
+    assert "domainx_clones_in_flight 3.0" in body
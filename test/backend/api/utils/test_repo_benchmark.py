@@ -0,0 +1,66 @@
+import subprocess
+
+import pytest
+import requests
+
+import api.services.github_http as gh
+import api.utils.repo_benchmark as repo_benchmark
+from api.database.services import RepoAnalyzer
+from api.utils.repo_benchmark import FakeGitHub, build_fixture_repo, pointed_at, run_benchmark
+
+
+@pytest.fixture()
+def fixture_repo(tmp_path):
+    return build_fixture_repo(str(tmp_path / "repos"), "tiny", commits=12, files=10, lines=8)
+
+
+def test_build_fixture_repo_writes_history_and_branches(fixture_repo):
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=fixture_repo["path"], capture_output=True, text=True, check=True).stdout
+
+    assert git("rev-list", "--count", "main").strip() == "12"
+    assert sorted(git("branch", "--format=%(refname:short)").split()) == sorted(fixture_repo["branches"])
+    blobs = git("ls-tree", "-r", "--name-only", "main").split()
+    assert len(blobs) == 10
+    assert "assets/image_9.png" in blobs
+
+
+def test_fake_github_answers_analyzer_api_calls(fixture_repo, tmp_path):
+    with FakeGitHub([fixture_repo]) as server, pointed_at(server, str(tmp_path / "repos")):
+        metrics = RepoAnalyzer("https://github.com/benchmark/tiny")._get_github_api_metrics()
+
+    assert metrics["commit_count"] == 12
+    assert metrics["branch_count"] == len(fixture_repo["branches"])
+    assert 0 < metrics["commits_last_5_years"] < 12
+    assert (metrics["text_files"], metrics["binary_files"]) == (9, 1)
+    assert metrics["closed_prs_count"] == 6
+    assert server.requests == 8
+    assert gh.API_BASE == "https://api.github.com"
+
+
+def test_fake_github_rate_limits_per_resource(fixture_repo):
+    with FakeGitHub([fixture_repo], rate_limit=2) as server:
+        statuses = [requests.get(f"{server.url}/repos/benchmark/tiny").status_code for _ in range(3)]
+        limited = requests.get(f"{server.url}/repos/benchmark/tiny")
+        search = requests.get(f"{server.url}/search/issues", params={"q": "repo:benchmark/tiny is:issue is:open"})
+        graphql = requests.post(f"{server.url}/graphql", json={"variables": {"owner": "benchmark", "name": "tiny"}})
+
+    assert statuses == [200, 200, 403]
+    assert limited.headers["X-RateLimit-Remaining"] == "0"
+    assert search.json()["total_count"] == 1
+    assert graphql.json()["data"]["repository"]["defaultBranchRef"]["target"]["history"]["totalCount"] == 12
+    assert server.rate_limited == 2
+
+
+def test_run_benchmark_times_each_stage(monkeypatch):
+    monkeypatch.setitem(repo_benchmark.FIXTURE_SIZES, "small", (5, 4, 5))
+    monkeypatch.setattr(RepoAnalyzer, "_run_scc", lambda self, repo_dir: {"code_lines_scc": 1})
+
+    result = run_benchmark(sizes=["small"], repeat=2)["small"]
+
+    stages = result["stages"]
+    assert [stages[s]["runs"] for s in ("api", "clone", "scc", "gitstats_clone", "gitstats")] == [2] * 5
+    assert stages["api"]["errors"] == stages["clone"]["errors"] == 0
+    assert result["api_requests"] == 16
+    assert result["metrics"]["commit_count"] == 5
+    assert RepoAnalyzer.clone_base == "https://github.com"
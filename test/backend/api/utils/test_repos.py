@@ -0,0 +1,23 @@
+import pytest
+
+from api.utils.repos import repo_slug
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://github.com/Org/Repo",
+        "https://github.com/org/repo.git",
+        "http://github.com/org/repo/",
+        "github.com/org/repo",
+        "git@github.com:org/repo.git",
+        "https://github.com/org/repo/tree/main",
+    ],
+)
+def test_repo_slug_normalises_github_urls(url):
+    assert repo_slug(url) == "org/repo"
+
+
+def test_repo_slug_falls_back_to_url():
+    assert repo_slug("https://example.com/") == "https://example.com"
+    assert repo_slug(None) == ""
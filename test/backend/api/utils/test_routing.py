@@ -0,0 +1,79 @@
+import pytest
+
+from api.database.domain.models import Domain
+from api.database.libraries.models import Library
+import api.utils.routing as routing_module
+from api.utils.routing import plan_library_analysis
+
+GB = 1024**3
+
+
+@pytest.fixture(autouse=True)
+def routing_settings(monkeypatch):
+    monkeypatch.setattr(routing_module.settings, "ANALYSIS_HEAVY_REPO_BYTES", GB)
+    monkeypatch.setattr(routing_module.settings, "ANALYSIS_UNKNOWN_SIZE_TIER", "heavy")
+    monkeypatch.setattr(
+        routing_module.settings,
+        "ANALYSIS_TIME_LIMITS",
+        {
+            "analysis": {"base": 600, "per_gb": 1200, "max": 7200},
+            "gitstats": {"base": 1800, "per_gb": 10800, "max": 28800},
+        },
+    )
+    monkeypatch.setattr(routing_module.settings, "ANALYSIS_HARD_TIME_LIMIT_GRACE", 1800)
+
+
+@pytest.fixture()
+def domain():
+    return Domain.objects.create(domain_name="Routing", description="desc")
+
+
+def make_library(domain, **kwargs):
+    return Library.objects.create(
+        domain=domain,
+        library_name="Repo",
+        github_url="https://github.com/org/repo",
+        **kwargs,
+    )
+
+
+@pytest.mark.django_db
+def test_unknown_size_goes_heavy_with_maximum_limits(domain):
+    plan = plan_library_analysis(make_library(domain))
+
+    assert plan["tier"] == "heavy"
+    assert plan["size_bytes"] is None
+    assert plan["analysis"] == {
+        "queue": "analysis_heavy",
+        "soft_time_limit": 7200,
+        "time_limit": 9000,
+    }
+    assert plan["gitstats"] == {
+        "queue": "gitstats_heavy",
+        "soft_time_limit": 28800,
+        "time_limit": 30600,
+    }
+
+
+@pytest.mark.django_db
+def test_small_repo_goes_light_with_scaled_limits(domain):
+    plan = plan_library_analysis(make_library(domain, repo_size_kb=512 * 1024))
+
+    assert plan["tier"] == "light"
+    assert plan["size_bytes"] == GB // 2
+    assert plan["analysis"]["queue"] == "analysis_light"
+    assert plan["analysis"]["soft_time_limit"] == 600 + 600
+    assert plan["gitstats"]["queue"] == "gitstats_light"
+    assert plan["gitstats"]["soft_time_limit"] == 1800 + 5400
+
+
+@pytest.mark.django_db
+def test_last_clone_size_wins_over_github_size_and_limits_are_capped(domain):
+    lib = make_library(domain, repo_size_kb=10, repo_clone_bytes=5 * GB)
+
+    plan = plan_library_analysis(lib)
+
+    assert plan["tier"] == "heavy"
+    assert plan["size_bytes"] == 5 * GB
+    assert plan["analysis"]["soft_time_limit"] == 600 + 5 * 1200
+    assert plan["gitstats"]["soft_time_limit"] == 28800
@@ -0,0 +1,83 @@
+import re
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+import api.utils.server_timing as server_timing
+from api.database.domain.models import Domain
+from api.utils.server_timing import EDGES_MS, RollingHistogram
+
+
+@pytest.fixture()
+def enabled(settings):
+    settings.SERVER_TIMING_ENABLED = True
+    server_timing._histograms.clear()
+    yield
+    server_timing._histograms.clear()
+
+
+def timings(response):
+    return {
+        name: (float(dur), desc)
+        for name, dur, desc in re.findall(r'([\w.]+);dur=([\d.]+)(?:;desc="([^"]*)")?', response["Server-Timing"])
+    }
+
+
+def test_rolling_histogram_percentiles_and_expiry():
+    histogram = RollingHistogram(window=120)
+    for ms in [3] * 90 + [40] * 9 + [20000]:
+        histogram.observe(ms, queries=2, db_ms=1.0, now=1000.0)
+
+    summary = histogram.snapshot(now=1000.0)
+    assert summary["count"] == 100
+    assert (summary["p50_ms"], summary["p95_ms"], summary["p99_ms"]) == (5, 50, 50)
+    assert summary["histogram"]["counts"][0] == 90
+    assert summary["histogram"]["counts"][len(EDGES_MS)] == 1
+    assert summary["mean_queries"] == 2
+
+    histogram.observe(7, queries=0, db_ms=0.0, now=1050.0)
+    assert histogram.snapshot(now=1050.0)["count"] == 101
+    assert histogram.snapshot(now=1150.0)["count"] == 1
+    assert histogram.snapshot(now=1300.0) is None
+
+
+@pytest.mark.django_db
+def test_header_reports_db_render_and_total(enabled):
+    Domain.objects.create(domain_name="D1", description="d", category_weights={})
+
+    response = APIClient().get("/api/domain/", HTTP_ORIGIN="http://localhost:3000")
+
+    parts = timings(response)
+    assert {"db", "render", "app", "total"} <= set(parts)
+    assert parts["db"][1] == "3 queries"
+    assert parts["total"][0] >= parts["db"][0]
+    assert response["Timing-Allow-Origin"] == "http://localhost:3000"
+
+    (stats,) = server_timing.endpoint_stats()
+    assert stats["endpoint"] == "GET /api/domain/"
+    assert (stats["count"], stats["mean_queries"]) == (1, 3)
+
+
+@pytest.mark.django_db
+def test_disabled_middleware_is_not_installed(settings):
+    settings.SERVER_TIMING_ENABLED = False
+
+    response = APIClient().get("/api/domain/")
+
+    assert "Server-Timing" not in response
+
+
+@pytest.mark.django_db
+def test_stats_endpoint_is_admin_only(enabled):
+    User = get_user_model()
+    client = APIClient()
+    client.get("/api/nothing-here/")
+
+    client.force_authenticate(User.objects.create_user(username="u", email="u@x.com", password=None, role="user"))
+    assert client.get("/api/server-timing/").status_code == 403
+
+    client.force_authenticate(User.objects.create_user(username="a", email="a@x.com", password=None, role="admin"))
+    body = client.get("/api/server-timing/").json()
+    assert body["enabled"] is True
+    assert {s["endpoint"] for s in body["endpoints"]} >= {"GET unmatched", "GET /api/server-timing/"}
@@ -0,0 +1,69 @@
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from api.database.domain.models import Domain
+from api.database.libraries.models import Library
+from api.database.library_metric_values.models import LibraryMetricValue
+from api.database.library_metric_values.rescoring import stale_metrics
+from api.database.metrics.catalog import get_catalog
+from api.database.metrics.models import Metric
+from api.utils.synthetic import generate_dataset
+
+
+def snapshot():
+    return (
+        sorted(Metric.objects.values_list("metric_ID", "metric_name", "value_type", "rule")),
+        sorted(Library.objects.values_list("library_ID", "library_name")),
+        sorted(LibraryMetricValue.objects.values_list("value_ID", "library_id", "metric_id", "value")),
+    )
+
+
+@pytest.mark.django_db
+def test_same_seed_generates_same_rows():
+    summary = generate_dataset(domains=2, libraries=3, metrics=40, fill=0.5, seed=7)
+    first = snapshot()
+
+    assert summary["libraries"] == 6 and summary["metrics"] == 40
+    assert 0 < summary["values"] < 6 * 40
+    assert LibraryMetricValue.objects.count() == summary["values"]
+
+    Domain.objects.all().delete()
+    Metric.objects.all().delete()
+    generate_dataset(domains=2, libraries=3, metrics=40, fill=0.5, seed=7)
+    assert snapshot() == first
+
+    generate_dataset(domains=2, libraries=3, metrics=40, fill=0.5, seed=8, prefix="Other")
+    assert LibraryMetricValue.objects.count() > summary["values"]
+
+
+@pytest.mark.django_db
+def test_generated_values_are_typed_and_scored():
+    generate_dataset(domains=1, libraries=4, metrics=60)
+
+    scored = [m for m in Metric.objects.all() if m.scoring_dict]
+    assert scored
+    for metric in scored:
+        assert set(metric.scoring_dict) >= set(
+            LibraryMetricValue.objects.filter(metric=metric).values_list("value", flat=True)
+        )
+    assert not stale_metrics(LibraryMetricValue.objects.all(), get_catalog().metrics)
+    assert not LibraryMetricValue.objects.filter(metric__value_type="date", value_date=None).exists()
+    assert not LibraryMetricValue.objects.filter(metric__value_type="int", value_number=None).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_command_rebuilds_deferred_indexes_and_refuses_existing_prefix(capsys):
+    call_command("generate_synthetic_data", "--libraries", "5", "--metrics", "10", "--fill", "0.8", "--defer-indexes")
+    assert "Created 1 domains, 5 libraries, 10 metrics" in capsys.readouterr().out
+
+    # Ordering by a typed column still works after the rebuild
+    assert LibraryMetricValue.objects.order_by("metric", "value_number").exists()
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, LibraryMetricValue._meta.db_table)
+    assert {index.name for index in LibraryMetricValue._meta.indexes} <= set(constraints)
+
+    with pytest.raises(CommandError, match="another --prefix"):
+        call_command("generate_synthetic_data", "--libraries", "1", "--metrics", "1")
+    with pytest.raises(CommandError, match="--fill"):
+        call_command("generate_synthetic_data", "--fill", "2")
@@ -12,3 +12,12 @@ def django_test_setup():
     os.environ.setdefault("DB_PASSWORD", "test_password")
 
     django.setup()
+
+
+@pytest.fixture(autouse=True)
+def clear_shared_cache(django_test_setup):
+    # Database changes roll back between tests but the cache does not, so
+    # versioned in-process caches would otherwise outlive the rows they hold
+    from django.core.cache import cache
+
+    cache.clear()